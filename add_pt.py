@@ -6,19 +6,18 @@
 
 
 from ram_concept.enums import ElevationReference
-from ram_concept.enums import GeneratedBy
-from ram_concept.enums import SpanSet
 from ram_concept.jack import DefaultJack
 from ram_concept.jack import Jack
-from ram_concept.line_segment_2D import LineSegment2D
 from ram_concept.model import Model
-from ram_concept.point_2D import Point2D
 from ram_concept.pt_system import PTSystem
 from ram_concept.pt_systems import PTSystems
 from ram_concept.tendon_layer import TendonLayer
 from ram_concept.tendon_segment import DefaultTendonSegment
 from ram_concept.tendon_segment import TendonSegment
 
+from tendon_layout import TendonRun
+from tendon_layout import add_tendon_layout
+
 
 def add_pt(model: Model):
     """Adds post-tensioning to the 16m x 16m structure """
@@ -57,86 +56,17 @@ def add_pt(model: Model):
     default_jack.use_pt_system_defaults = True
 
     # BANDED "LONGITUDE" TENDONS
-    longitude_tendon_layer = cad_manager.tendon_layer(SpanSet.LONGITUDE, GeneratedBy.USER)
     x_coords = [0.1, 4, 8, 12, 16 - 0.1]  # x-coordinates for the profile points
 
-    # CENTER LONGITUDE TENDONS
-    default_tendon_segment.strand_count = 20
-    profiles = [0.1, 0.04, .140, 0.04, 0.1]  # profile values for the profile points
-
-    for i_segment in range(0,4):
-        # this logic just for ensuring tendons go high to low
-        even = (i_segment % 2) == 0
-        if even:
-            i = i_segment
-            j = i_segment + 1
-        else: # odd
-            i = i_segment + 1
-            j = i_segment
-
-        x0 = x_coords[i]
-        x1 = x_coords[j]
-        y = 8
-        tendon_segment = longitude_tendon_layer.add_tendon_segment(LineSegment2D(Point2D(x0,y),Point2D(x1,y)))
-        tendon_segment.elevation_value_1 = profiles[i]
-        tendon_segment.elevation_value_2 = profiles[j]
-
-    # jack
-    jack = longitude_tendon_layer.add_jack(Point2D(0.1,8))
-
-    # TOP LONGITUDE TENDONS
-    default_tendon_segment.strand_count = 10
-    profiles = [0.3, 0.04, .360, 0.04, 0.3]  # profile values for the profile points
-
-    for i_segment in range(0,4):
-        # this logic just for ensuring tendons go high to low
-        even = (i_segment % 2) == 0
-        if even:
-            i = i_segment
-            j = i_segment + 1
-        else: # odd
-            i = i_segment + 1
-            j = i_segment
-
-        x0 = x_coords[i]
-        x1 = x_coords[j]
-        y = 15.75
-        tendon_segment = longitude_tendon_layer.add_tendon_segment(LineSegment2D(Point2D(x0,y),Point2D(x1,y)))
-        tendon_segment.elevation_value_1 = profiles[i]
-        tendon_segment.elevation_value_2 = profiles[j]
-
-    # jack
-    jack = longitude_tendon_layer.add_jack(Point2D(0.1,15.75))
-
     # UNIFORM "LATITUDE" TENDONS
-    latitude_tendon_layer = cad_manager.tendon_layer(SpanSet.LATITUDE, GeneratedBy.USER)
     y_coords = [0.1, 4, 8, 12, 16 - 0.1]  # y-coordinates for the profile points
-    profiles = [0.1, 0.04, .160, 0.04, 0.3]  # profile values for the profile points
-
-    default_tendon_segment.strand_count = 3
-
-    # loop over tendons
-    x = 0.5
-    while x < 16:
-        # loop over tendon segments
-        for i_segment in range(0,4):
-            # this logic just for ensuring tendons go high to low
-            even = (i_segment % 2) == 0
-            if even:
-                i = i_segment
-                j = i_segment + 1
-            else: # odd
-                i = i_segment + 1
-                j = i_segment
-
-            y0 = y_coords[i]
-            y1 = y_coords[j]
-            tendon_segment = latitude_tendon_layer.add_tendon_segment(LineSegment2D(Point2D(x,y0),Point2D(x,y1)))
-            tendon_segment.elevation_value_1 = profiles[i]
-            tendon_segment.elevation_value_2 = profiles[j]
-
-        jack = latitude_tendon_layer.add_jack(Point2D(x, 0.1))
-        
-        # onto next tendon
-        x += 1
-    
+
+    # one row per run of tendons: layer, profile point coordinates, profile values, strands, offset, count and spacing
+    # (every tendon runs high to low, with a jack at its first profile point)
+    runs = [
+        TendonRun("longitude", x_coords, [0.1, 0.04, .140, 0.04, 0.1], 20, 8),          # center longitude tendons
+        TendonRun("longitude", x_coords, [0.3, 0.04, .360, 0.04, 0.3], 10, 15.75),      # top longitude tendons
+        TendonRun("latitude", y_coords, [0.1, 0.04, .160, 0.04, 0.3], 3, 0.5, 16, 1),   # latitude tendons, x = 0.5 to 15.5
+    ]
+
+    add_tendon_layout(model, runs)
@@ -0,0 +1,456 @@
+
+# Record/replay harness for the RAM Concept API.
+#
+# Recording wraps the Concept object (and everything reached from it) in proxies that log each attribute read,
+# method call and attribute set with its result to a gzipped JSON-lines file. Replaying serves those results
+# in-process without RAM Concept, optionally sleeping a fixed latency per call to mimic the server.
+#
+#   python api_replay.py record <model.cpt> <log.jsonl.gz>             (needs RAM Concept)
+#   python api_replay.py replay <log.jsonl.gz> [latency seconds]       (runs anywhere)
+#
+# start_concept() can be used in place of Concept.start_concept(): it records when RAM2TD_RECORD is set to a log
+# path ("{pid}" in the path is replaced by the process id, for run_levels.py workers) and replays when
+# RAM2TD_REPLAY is set (RAM2TD_REPLAY_LATENCY adds seconds per call). Replaying works without the ram_concept package installed
+# (install_stand_in_modules() provides stand-ins for its imports).
+#
+# When profiling is on (see profiling.py), start_concept also measures the server calls of every span: the Concept
+# is wrapped in a counting proxy that counts each property read, method call and property set on an API object,
+# or, when replaying, the replayed calls are counted.
+
+import enum
+import gzip
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import sys
+import time
+import types
+from collections import deque
+
+from profiling import profiler
+
+
+RECORD_ENVIRONMENT_VARIABLE = "RAM2TD_RECORD"
+REPLAY_ENVIRONMENT_VARIABLE = "RAM2TD_REPLAY"
+
+# values the API builds locally (geometry and reactions); reading them is not a server call
+VALUE_TYPES = {"Point2D", "Point3D", "LineSegment2D", "Polygon2D", "Reaction"}
+
+
+class ReplayError(Exception):
+    """Raised when a replayed call raised on the server, or was never recorded."""
+
+
+class ReplayEnum:
+    """Stand-in for a RAM Concept enum value, equal to any value with the same name."""
+
+    def __init__(self, type_name, name):
+        self.type_name = type_name
+        self.name = name
+
+    def __eq__(self, other):
+        return getattr(other, "name", other) == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return self.type_name + "." + self.name
+
+
+def _is_plain(value):
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def _call_key(object_id, op, name, args=None):
+    return json.dumps([object_id, op, name, args], separators=(",", ":"))
+
+
+######################################################################      RECORDING     ##################################################################
+
+class Recorder:
+    """Writes the log of one recording session."""
+
+    def __init__(self, log_path, header=None):
+        self.file = gzip.open(log_path, "wt", encoding="utf-8")
+        self.file.write(json.dumps({"header": header or {}}) + "\n")
+        self.next_id = 0
+
+    def wrap(self, target):
+        proxy = RecordingProxy(self, target, self.next_id)
+        self.next_id += 1
+        return proxy
+
+    def encode_arg(self, value):
+        if isinstance(value, RecordingProxy):
+            return {"$ref": object.__getattribute__(value, "_id")}
+        if _is_plain(value):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self.encode_arg(item) for item in value]
+        if isinstance(value, (enum.Enum, ReplayEnum)):
+            return {"$enum": getattr(value, "type_name", type(value).__name__), "name": value.name}
+        # values built by the caller, such as Point2D(0, 0)
+        return {"$obj": type(value).__name__, "attrs": {key: self.encode_arg(item) for key, item in sorted(vars(value).items()) if not key.startswith("_")}}
+
+    def encode_result(self, value):
+        """Encode a value returned by the server, wrapping API objects so their use is recorded too."""
+
+        if _is_plain(value):
+            return value, value
+        if isinstance(value, (list, tuple)):
+            pairs = [self.encode_result(item) for item in value]
+            return [encoded for encoded, item in pairs], [item for encoded, item in pairs]
+        if isinstance(value, enum.Enum):
+            return {"$enum": type(value).__name__, "name": value.name}, value
+        proxy = self.wrap(value)
+        return {"$ref": object.__getattribute__(proxy, "_id"), "type": type(value).__name__}, proxy
+
+    def log(self, object_id, op, name, args, result):
+        self.file.write(json.dumps([object_id, op, name, args, result], separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class RecordingProxy:
+    """Forwards everything to the real object and logs what came back."""
+
+    def __init__(self, recorder, target, object_id):
+        object.__setattr__(self, "_recorder", recorder)
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_id", object_id)
+
+    def __getattr__(self, name):
+        recorder = object.__getattribute__(self, "_recorder")
+        target = object.__getattribute__(self, "_target")
+        object_id = object.__getattribute__(self, "_id")
+
+        try:
+            value = getattr(target, name)
+        except Exception as error:
+            recorder.log(object_id, "get", name, None, {"$raise": type(error).__name__, "message": str(error)})
+            raise
+
+        if callable(value) and not isinstance(value, (type, enum.Enum)):
+            recorder.log(object_id, "get", name, None, {"$method": 1})
+            return RecordingMethod(recorder, object_id, name, value)
+
+        encoded, result = recorder.encode_result(value)
+        recorder.log(object_id, "get", name, None, encoded)
+        return result
+
+    def __setattr__(self, name, value):
+        recorder = object.__getattribute__(self, "_recorder")
+        real_value = object.__getattribute__(value, "_target") if isinstance(value, RecordingProxy) else value
+        setattr(object.__getattribute__(self, "_target"), name, real_value)
+        recorder.log(object.__getattribute__(self, "_id"), "set", name, recorder.encode_arg(value), None)
+
+
+class RecordingMethod:
+    def __init__(self, recorder, object_id, name, method):
+        self.recorder = recorder
+        self.object_id = object_id
+        self.name = name
+        self.method = method
+
+    def __call__(self, *args):
+        encoded_args = self.recorder.encode_arg(list(args))
+        real_args = [object.__getattribute__(arg, "_target") if isinstance(arg, RecordingProxy) else arg for arg in args]
+        try:
+            value = self.method(*real_args)
+        except Exception as error:
+            self.recorder.log(self.object_id, "call", self.name, encoded_args, {"$raise": type(error).__name__, "message": str(error)})
+            raise
+
+        encoded, result = self.recorder.encode_result(value)
+        self.recorder.log(self.object_id, "call", self.name, encoded_args, encoded)
+        return result
+
+
+######################################################################      COUNTING     ##################################################################
+
+class CallCounter:
+    """Number of server calls made through its CountingProxy objects, with one proxy per API object."""
+
+    def __init__(self):
+        self.calls = 0
+        self.proxies = {}
+
+    def wrap(self, value):
+        """value itself when it is plain data or a local value (see VALUE_TYPES), otherwise its CountingProxy."""
+
+        if _is_plain(value) or isinstance(value, (dict, enum.Enum, ReplayEnum, CountingProxy)) or type(value).__name__ in VALUE_TYPES:
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.wrap(item) for item in value)
+
+        # the same proxy every time, so API objects can still be compared and looked up by identity
+        entry = self.proxies.get(id(value))
+        if entry is None:
+            entry = self.proxies[id(value)] = (value, CountingProxy(self, value))
+        return entry[1]
+
+
+def _unwrap(value):
+    if isinstance(value, CountingProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+
+class CountingProxy:
+    """Forwards everything to the API object and counts the server calls made on it."""
+
+    def __init__(self, counter, target):
+        object.__setattr__(self, "_counter", counter)
+        object.__setattr__(self, "_target", target)
+
+    def __getattr__(self, name):
+        counter = object.__getattribute__(self, "_counter")
+        value = getattr(object.__getattribute__(self, "_target"), name)
+        if callable(value) and not isinstance(value, (type, enum.Enum)):
+            return CountingMethod(counter, value)
+        counter.calls += 1
+        return counter.wrap(value)
+
+    def __setattr__(self, name, value):
+        counter = object.__getattribute__(self, "_counter")
+        setattr(object.__getattribute__(self, "_target"), name, _unwrap(value))
+        counter.calls += 1
+
+
+class CountingMethod:
+    def __init__(self, counter, method):
+        self.counter = counter
+        self.method = method
+
+    def __call__(self, *args):
+        self.counter.calls += 1
+        return self.counter.wrap(self.method(*_unwrap(args)))
+
+
+######################################################################      REPLAYING     ##################################################################
+
+class Player:
+    """Serves the results of a recorded log, looked up by (object, operation, name, arguments)."""
+
+    def __init__(self, log_path, latency=0.0):
+        self.latency = latency
+        self.results = {}
+        self.calls = 0
+
+        with gzip.open(log_path, "rt", encoding="utf-8") as file:
+            self.header = json.loads(file.readline())["header"]
+            for line in file:
+                object_id, op, name, args, result = json.loads(line)
+                if op == "set":
+                    continue
+                self.results.setdefault(_call_key(object_id, op, name, args), deque()).append(result)
+
+    def root(self):
+        """Proxy for the first object wrapped when recording (the Concept)."""
+        return ReplayProxy(self, 0)
+
+    def result(self, object_id, op, name, args=None):
+        key = _call_key(object_id, op, name, args)
+        results = self.results.get(key)
+        if not results:
+            if op == "get":
+                raise AttributeError(name)
+            raise ReplayError("Call not recorded: " + key)
+
+        # repeated calls are served in recorded order, then the last result is reused
+        result = results.popleft() if len(results) > 1 else results[0]
+
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.decode(result)
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "$ref" in value:
+            return ReplayProxy(self, value["$ref"])
+        if "$enum" in value:
+            return ReplayEnum(value["$enum"], value["name"])
+        if "$raise" in value:
+            if value["$raise"] == "AttributeError":
+                raise AttributeError(value["message"])
+            raise ReplayError(value["$raise"] + ": " + value["message"])
+        return value
+
+    def encode_arg(self, value):
+        if isinstance(value, ReplayProxy):
+            return {"$ref": object.__getattribute__(value, "_id")}
+        if _is_plain(value):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self.encode_arg(item) for item in value]
+        if isinstance(value, (enum.Enum, ReplayEnum)):
+            return {"$enum": getattr(value, "type_name", type(value).__name__), "name": value.name}
+        return {"$obj": type(value).__name__, "attrs": {key: self.encode_arg(item) for key, item in sorted(vars(value).items()) if not key.startswith("_")}}
+
+
+class ReplayProxy:
+    """Stands in for a recorded API object."""
+
+    def __init__(self, player, object_id):
+        object.__setattr__(self, "_player", player)
+        object.__setattr__(self, "_id", object_id)
+
+    def __getattr__(self, name):
+        player = object.__getattribute__(self, "_player")
+        object_id = object.__getattribute__(self, "_id")
+
+        key = _call_key(object_id, "get", name)
+        recorded = player.results.get(key)
+        if recorded and isinstance(recorded[0], dict) and "$method" in recorded[0]:
+            return lambda *args: player.result(object_id, "call", name, player.encode_arg(list(args)))
+        return player.result(object_id, "get", name)
+
+    def __setattr__(self, name, value):
+        # sets only change the model, whose recorded answers are already known
+        pass
+
+
+######################################################################      STAND-IN MODULES     ##################################################################
+
+class _StandInType(type):
+    """Class whose attributes are enum stand-ins, e.g. ReactionContext.STANDARD."""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return ReplayEnum(cls.__name__, name)
+
+
+class _StandInModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stand_in = _StandInType(name, (), {})
+        setattr(self, name, stand_in)
+        return stand_in
+
+
+class _StandInFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, fullname, path, target=None):
+        if fullname == "ram_concept" or fullname.startswith("ram_concept."):
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return _StandInModule(spec.name)
+
+    def exec_module(self, module):
+        module.__path__ = []
+
+
+def install_stand_in_modules():
+    """Make "from ram_concept.x import Y" work without the ram_concept package (it is used if installed)."""
+
+    try:
+        import ram_concept
+    except ImportError:
+        sys.meta_path.append(_StandInFinder())
+
+
+######################################################################      ENTRY POINTS     ##################################################################
+
+_recorders = []
+
+
+def start_concept(headless=True):
+    """Concept.start_concept() that records or replays depending on RAM2TD_RECORD / RAM2TD_REPLAY."""
+
+    replay_path = os.environ.get(REPLAY_ENVIRONMENT_VARIABLE)
+    if replay_path:
+        player = Player(replay_path, float(os.environ.get("RAM2TD_REPLAY_LATENCY", 0)))
+        if profiler.enabled:
+            profiler.count_calls(lambda: player.calls)
+        return player.root()
+
+    from ram_concept.concept import Concept
+    concept = Concept.start_concept(headless=headless)
+
+    # calls are counted on the real objects, so recording does not add to them
+    if profiler.enabled:
+        counter = CallCounter()
+        profiler.count_calls(lambda: counter.calls)
+        concept = counter.wrap(concept)
+
+    record_path = os.environ.get(RECORD_ENVIRONMENT_VARIABLE)
+    if record_path:
+        recorder = Recorder(record_path.format(pid=os.getpid()))
+        _recorders.append(recorder)
+        return recorder.wrap(concept)
+    return concept
+
+
+def close_recordings():
+    """Finish the log files of every recording started in this process."""
+    while _recorders:
+        _recorders.pop().close()
+
+
+def takedown_session(concept, model_path, settings, include_pt=False):
+    """The server work of one takedown, in a fixed order so recording and replay make the same calls.
+
+    Sidecar caches are not used, so every call reaches the (recorded) server. Returns the takedown list.
+    """
+
+    from element_table import snapshot_elements
+    from get_reactions import get_reactions
+    from get_tendon_profiles import get_tendon_profiles
+    from run_model import set_api_units
+
+    model = concept.open_file(model_path)
+    set_api_units(model)
+    model.calc_all()
+    element_table = snapshot_elements(model.cad_manager.element_layer)
+    takedown_tbl = get_reactions(model, element_table, settings=settings, labels=True)
+    if include_pt:
+        get_tendon_profiles(model)
+    return takedown_tbl
+
+
+def record(model_path, log_path, include_pt=False):
+    from get_reactions import get_settings
+    from ram_concept.concept import Concept
+
+    settings = get_settings()
+    recorder = Recorder(log_path, {"model_path": model_path, "settings": settings, "include_pt": include_pt})
+    concept = Concept.start_concept(headless=True)
+    try:
+        return takedown_session(recorder.wrap(concept), model_path, settings, include_pt)
+    finally:
+        recorder.close()
+        concept.shut_down()
+
+
+def replay(log_path, latency=0.0):
+    """Replay a recorded takedown; returns (takedown list, seconds, server calls served)."""
+
+    install_stand_in_modules()
+    player = Player(log_path, latency)
+    header = player.header
+
+    start = time.perf_counter()
+    takedown_tbl = takedown_session(player.root(), header["model_path"], header["settings"], header.get("include_pt", False))
+    return takedown_tbl, time.perf_counter() - start, player.calls
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "record":
+        takedown_tbl = record(sys.argv[2], sys.argv[3])
+        print(str(len(takedown_tbl)) + " rows recorded to " + sys.argv[3])
+    else:
+        latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+        takedown_tbl, seconds, calls = replay(sys.argv[2], latency)
+        print(json.dumps({"rows": len(takedown_tbl), "seconds": seconds, "calls": calls}))
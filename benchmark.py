@@ -0,0 +1,138 @@
+
+# Scaling benchmark: model build, reaction extraction and tendon reporting at increasing numbers of supports.
+#
+# Runs against the in-memory stand-in backend (standin_concept.py) unless the real RAM Concept API is installed,
+# with an optional per-call latency to mimic the RAM Concept server. Every run appends one JSON line per size to
+# the results file (by default ~/.ram2takedown/benchmark_results.jsonl, outside the repo), so timings can be
+# compared between commits:
+#
+#   python benchmark.py [sizes (comma separated)] [latency in seconds] [results file]
+#   python benchmark.py compare [results file]
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import standin_concept
+standin_concept.install()
+
+from ram_concept.concept import Concept
+
+from generate_model import generate_model
+from generate_model import grid_for_supports
+from get_reactions import get_reactions
+from get_tendon_profiles import get_tendon_profiles
+
+
+SIZES = [10, 100, 1000, 10000]
+RESULTS_PATH = os.path.join(os.path.expanduser("~"), ".ram2takedown", "benchmark_results.jsonl")
+
+# the generated model has the standard combos and a Trib loading, and every support is below max_height
+SETTINGS = {"start_level": 1, "end_level": 1, "loading_type": "RESIDENTIAL", "max_height": 1000, "model_filepath": "",
+            "name_DL": "All Dead LC", "name_LL": "Live+Soil (total Live Load reactions)", "name_trib": "Trib"}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.realpath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+@contextlib.contextmanager
+def phase(phases, name):
+    """Time a phase and count the stand-in server calls made in it."""
+
+    calls = standin_concept.CALLS
+    start = time.perf_counter()
+    yield
+    phases[name] = {"seconds": time.perf_counter() - start, "calls": standin_concept.CALLS - calls}
+
+
+def run_size(concept, supports):
+    columns_x, columns_y = grid_for_supports(supports)
+    phases = {}
+
+    with phase(phases, "build"):
+        model, num_supports = generate_model(concept, columns_x, columns_y)
+
+    with phase(phases, "analysis"):
+        model.calc_all()
+
+    with phase(phases, "reactions"):
+        takedown_tbl = get_reactions(model, settings=SETTINGS)
+
+    # the report itself is not what is being timed, only producing it
+    with phase(phases, "tendon report"):
+        with contextlib.redirect_stdout(io.StringIO()) as report:
+            get_tendon_profiles(model)
+
+    return {"supports": num_supports, "grid": [columns_x, columns_y], "rows": len(takedown_tbl),
+            "report_lines": report.getvalue().count("\n"), "phases": phases}
+
+
+def run_benchmark(sizes=SIZES, latency=0.0, results_path=RESULTS_PATH):
+    """Run every size and append the results to results_path; returns the results."""
+
+    standin_concept.set_latency(latency)
+    concept = Concept.start_concept(headless=True)
+
+    run = {"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+           "backend": "stand-in" if concept.__class__ is standin_concept.Concept else "ram_concept", "latency": latency}
+
+    results = []
+    try:
+        for supports in sizes:
+            result = dict(run, size=supports, **run_size(concept, supports))
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        concept.shut_down()
+
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, "a") as file:
+        for result in results:
+            file.write(json.dumps(result) + "\n")
+    return results
+
+
+def format_result(result):
+    return "{0:>6} supports  ".format(result["supports"]) + "  ".join(
+        "{0} {1:8.3f}s {2:>8} calls".format(name, totals["seconds"], totals["calls"]) for name, totals in result["phases"].items())
+
+
+def compare(results_path=RESULTS_PATH):
+    """Print, for every size, each phase's time in the latest run against the first run with the same backend and latency."""
+
+    with open(results_path) as file:
+        results = [json.loads(line) for line in file if line.strip()]
+
+    first = {}
+    latest = {}
+    for result in results:
+        key = (result["backend"], result["latency"], result["size"])
+        first.setdefault(key, result)
+        latest[key] = result
+
+    for key, result in latest.items():
+        baseline = first[key]
+        print("{0} latency {1}s, {2} supports: commit {3} vs {4}".format(*key, result["commit"], baseline["commit"]))
+        for name, totals in result["phases"].items():
+            before = baseline["phases"].get(name, {}).get("seconds")
+            change = "" if not before else "  ({0:+.0%})".format(totals["seconds"] / before - 1)
+            print("    {0:<14} {1:8.3f}s{2}".format(name, totals["seconds"], change))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        compare(*sys.argv[2:3])
+    else:
+        sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else SIZES
+        latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+        run_benchmark(sizes, latency, *sys.argv[3:4])
@@ -0,0 +1,104 @@
+
+import numpy as np
+
+from ram_concept.result_layers import ReactionContext
+
+from profiling import profiler
+
+
+# order of the reaction components along the last axis of every reaction array
+REACTION_COMPONENTS = ["x", "y", "z", "rot_x", "rot_y", "rot_z"]
+
+# combos every set of local combo factors must hold, and the name the trib loading is evaluated under alongside them
+REQUIRED_COMBOS = ["DL", "LL"]
+TRIB_COMBO = "Trib"
+
+
+class BaseReactions:
+    """Reactions of every column and wall group under each base loading, read from the server once.
+
+    column_reactions is (columns x loadings x 6) and wall_reactions is (walls x loadings x 6),
+    with the loadings in the order of loading_names and the components in REACTION_COMPONENTS order.
+    """
+
+    def __init__(self, loading_names, column_reactions, wall_reactions):
+        self.loading_names = loading_names
+        self.column_reactions = column_reactions
+        self.wall_reactions = wall_reactions
+
+
+def reaction_vector(reaction):
+    return [getattr(reaction, component) for component in REACTION_COMPONENTS]
+
+
+def fetch_base_reactions(loadings, column_elements, wall_groups):
+    """Query the reaction of every column element and wall group for each loading in loadings."""
+
+    column_reactions = np.zeros((len(column_elements), len(loadings), 6))
+    wall_reactions = np.zeros((len(wall_groups), len(loadings), 6))
+
+    with profiler.span("base reactions"):
+        for j, loading in enumerate(loadings):
+            for i, column_element in enumerate(column_elements):
+                column_reactions[i, j] = reaction_vector(loading.column_reaction(column_element, ReactionContext.STANDARD))
+            for i, wall_element_group in enumerate(wall_groups):
+                wall_reactions[i, j] = reaction_vector(loading.wall_group_reaction(wall_element_group, ReactionContext.STANDARD))
+        profiler.calls(len(loadings) * (len(column_elements) + len(wall_groups)))
+
+    return BaseReactions([loading.name for loading in loadings], column_reactions, wall_reactions)
+
+
+def check_combo_factors(combo_factors):
+    """Raise LookupError with a message for every required combo combo_factors is missing, and for a combo named TRIB_COMBO."""
+
+    problems = ["Local combo " + name + " not found in combo factors." for name in REQUIRED_COMBOS if name not in combo_factors]
+    if TRIB_COMBO in combo_factors:
+        problems.append("Local combo name " + TRIB_COMBO + " is kept for the trib loading, rename that combo.")
+    if problems:
+        raise LookupError(" ".join(problems))
+
+
+def referenced_loadings(combo_factors):
+    """Names of all the base loadings used by combo_factors, in first-use order."""
+    names = []
+    for factors in combo_factors.values():
+        for loading_name in factors:
+            if loading_name not in names:
+                names.append(loading_name)
+    return names
+
+
+def factor_matrix(combo_factors, loading_names):
+    """Build the (combos x loadings) factor matrix for combo_factors.
+
+    combo_factors maps each combo name to a {loading name: factor} dict; loadings that are not
+    listed get a factor of zero. Returns the combo names (matrix row order) and the matrix.
+    """
+
+    combo_names = list(combo_factors)
+    column_of = {name: j for j, name in enumerate(loading_names)}
+    factors = np.zeros((len(combo_names), len(loading_names)))
+
+    for i, combo_name in enumerate(combo_names):
+        for loading_name, factor in combo_factors[combo_name].items():
+            factors[i, column_of[loading_name]] = factor
+
+    return combo_names, factors
+
+
+def combine(reactions, factors):
+    """Combine (elements x loadings x 6) base reactions into (elements x combos x 6) combo reactions."""
+    return np.einsum("elk,cl->eck", reactions, factors)
+
+
+def evaluate_combos(base: BaseReactions, combo_factors):
+    """Evaluate every combo in combo_factors from the base reactions.
+
+    Returns {combo name: (column reactions, wall reactions)}, each (elements x 6).
+    Only linear combinations are supported; envelopes and pattern maxima still need the model combos.
+    """
+
+    combo_names, factors = factor_matrix(combo_factors, base.loading_names)
+    column_combos = combine(base.column_reactions, factors)
+    wall_combos = combine(base.wall_reactions, factors)
+    return {name: (column_combos[:, i], wall_combos[:, i]) for i, name in enumerate(combo_names)}
@@ -0,0 +1,155 @@
+
+# Cumulative takedown: DL, LL and Trib summed down the building through the stacked supports (see stacking.py).
+#
+# The load on each support is its own reaction plus whatever the supports above deliver to it. Between two levels
+# that delivery is a sparse distribution matrix from the upper supports to the lower ones:
+#   matched       all of the upper support's load goes to the support below it
+#   offset,       (a transfer: a column landing on a slab or beam) the load is shared between the nearest
+#   unsupported    TRANSFER_SUPPORTS supports below within TRANSFER_RADIUS, by inverse distance
+# Loads with no support below within TRANSFER_RADIUS are reported as lost.
+#
+# Evaluating the building is one sparse matrix-vector product per level pair, so re-running after one level's
+# takedown changes (set_level_loads) costs next to nothing.
+
+import numpy as np
+
+from stacking import MATCHED
+from stacking import LevelMatch
+from stacking import segment_distance
+from takedown_table import TakedownTable
+
+
+LOAD_FIELDS = ["DL", "LL", "Trib"]
+
+# ft
+TRANSFER_RADIUS = 30.0
+TRANSFER_SUPPORTS = 4
+
+# ft, distances below this count as this when weighting a transfer
+MIN_TRANSFER_DISTANCE = 0.5
+
+
+class TransferMatrix:
+    """Sparse matrix (coordinate format) taking the loads of the upper supports to the lower supports."""
+
+    def __init__(self, rows, columns, weights, shape):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype="f8")
+        self.shape = shape
+
+    def dot(self, loads):
+        """Loads delivered to each lower support, for loads of shape (upper supports, load fields)."""
+
+        delivered = np.zeros((self.shape[0], loads.shape[1]))
+        for j in range(loads.shape[1]):
+            delivered[:, j] = np.bincount(self.rows, weights=self.weights * loads[self.columns, j], minlength=self.shape[0])
+        return delivered
+
+    __matmul__ = dot
+
+    def delivered_fraction(self):
+        """Fraction of each upper support's load that reaches a support below (0 where it is lost)."""
+        return np.bincount(self.columns, weights=self.weights, minlength=self.shape[1])
+
+
+def transfer_matrix(match: LevelMatch, transfer_radius=TRANSFER_RADIUS, transfer_supports=TRANSFER_SUPPORTS):
+    """TransferMatrix from the supports of match.upper to those of match.lower."""
+
+    upper, lower = match.upper, match.lower
+    rows, columns, weights = [], [], []
+
+    matched = np.flatnonzero((match.status == MATCHED) & (match.support >= 0))
+    rows.append(match.support[matched])
+    columns.append(matched)
+    weights.append(np.ones(len(matched)))
+
+    # transfers: few per level, so each is shared out against every support below
+    for row in np.flatnonzero(match.status != MATCHED):
+        distance = segment_distance(upper.x[row], upper.y[row], lower.x1, lower.y1, lower.x2, lower.y2)
+        nearest = np.argsort(distance, kind="stable")[:transfer_supports]
+        nearest = nearest[distance[nearest] <= transfer_radius]
+        if len(nearest) == 0:
+            continue
+        inverse_distance = 1 / np.maximum(distance[nearest], MIN_TRANSFER_DISTANCE)
+        rows.append(nearest)
+        columns.append(np.full(len(nearest), row))
+        weights.append(inverse_distance / inverse_distance.sum())
+
+    return TransferMatrix(np.concatenate(rows), np.concatenate(columns), np.concatenate(weights), (len(lower), len(upper)))
+
+
+def level_loads(supports):
+    """(supports, LOAD_FIELDS) array of a level's own reactions."""
+    return np.column_stack([supports.table.column(field) for field in LOAD_FIELDS]) if len(supports) else np.zeros((0, len(LOAD_FIELDS)))
+
+
+class CumulativeTakedown:
+    """Running sums of the loads down every stack of supports, from [LevelMatch] as returned by stacking.stack_levels."""
+
+    def __init__(self, matches, transfer_radius=TRANSFER_RADIUS, transfer_supports=TRANSFER_SUPPORTS):
+        # levels from the top down
+        self.supports = [match.upper for match in matches] + [matches[-1].lower] if matches else []
+        self.levels = [supports.level for supports in self.supports]
+        self.transfers = [transfer_matrix(match, transfer_radius, transfer_supports) for match in matches]
+        self.loads = [level_loads(supports) for supports in self.supports]
+        self.totals = None
+        self.lost = None
+
+    def set_level_loads(self, level, takedown_tbl):
+        """Replace one level's own reactions with a new takedown of the same supports, in the same order."""
+
+        index = self.levels.index(level)
+        table = takedown_tbl if isinstance(takedown_tbl, TakedownTable) else TakedownTable.from_rows(takedown_tbl)
+        if len(table) != len(self.supports[index]):
+            raise ValueError("Level " + str(level) + " has " + str(len(table)) + " supports, " + str(len(self.supports[index])) + " were stacked.")
+
+        self.loads[index] = np.column_stack([table.column(field) for field in LOAD_FIELDS])
+        self.totals = None
+
+    def accumulate(self, values):
+        """Running sums down the stacks of any per-support values: [(supports, n) array] per level from the top down.
+
+        Returns the sums and, per level below the top, the total that found no support on that level.
+        """
+
+        totals = []
+        lost = []
+        for index, level_values in enumerate(values):
+            if index == 0:
+                totals.append(level_values.copy())
+                continue
+            transfer = self.transfers[index - 1]
+            above = totals[-1]
+            totals.append(level_values + transfer @ above)
+            lost.append(((1 - transfer.delivered_fraction())[:, None] * above).sum(axis=0))
+        return totals, lost
+
+    def floors(self):
+        """[(supports,) array] of the number of floors each support carries, its own included (fractional below transfers)."""
+        totals, lost = self.accumulate([np.ones((len(supports), 1)) for supports in self.supports])
+        return [level_floors[:, 0] for level_floors in totals]
+
+    def evaluate(self):
+        """[(supports, LOAD_FIELDS) array] of the accumulated loads of each level, from the top down."""
+
+        if self.totals is None:
+            self.totals, self.lost = self.accumulate(self.loads)
+        return self.totals
+
+    def cumulative_tables(self):
+        """[(level, TakedownTable)] with each level's DL, LL and Trib replaced by the accumulated loads."""
+
+        tables = []
+        for supports, totals in zip(self.supports, self.evaluate()):
+            table = TakedownTable(supports.table.array.copy(), supports.table.units, supports.table.labels)
+            for j, field in enumerate(LOAD_FIELDS):
+                table.array[field] = totals[:, j]
+            tables.append((supports.level, table))
+        return tables
+
+    def lost_loads(self):
+        """[(level, {field: load})] of the loads from the level above that found no support on each level."""
+
+        self.evaluate()
+        return [(level, dict(zip(LOAD_FIELDS, lost.tolist()))) for level, lost in zip(self.levels[1:], self.lost)]
@@ -0,0 +1,169 @@
+
+import hashlib
+import json
+import os
+
+from ram_concept.element_layer import ElementLayer
+
+from profiling import profiler
+
+
+# bump when the layout of the saved table changes so old sidecars are rebuilt
+TABLE_VERSION = 2
+
+
+class ElementTable:
+    """Column element and wall element group properties, read from the server once.
+
+    All values are kept in API units; unit conversion is left to the takedown.
+    The element objects themselves are kept alongside so reactions can still be queried.
+    """
+
+    def __init__(self):
+        self.column_elements = []
+        self.columns = []       # [x, y, height, b, d] per column element
+        self.wall_groups = []
+        self.walls = []         # [name, centroid x, centroid y, total length, thickness, height, reaction angle] per wall element group
+        self.fingerprint = None
+        self.mesh_key = None
+
+    def to_dict(self):
+        return {"version": TABLE_VERSION, "fingerprint": self.fingerprint, "mesh_key": self.mesh_key,
+                "columns": self.columns, "walls": self.walls}
+
+
+def table_fingerprint(columns, walls):
+    """Hash of the element properties, used to tell whether two snapshots describe the same mesh."""
+    data = json.dumps([columns, walls], separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def wall_group_index(wall_elements, group_names):
+    """{group name: [thickness, height]} of the first wall element of each named wall element group.
+
+    The scan stops as soon as every group has been found, so the remaining element names are never read.
+    """
+
+    wall_index = {}
+    remaining = set(group_names)
+    scanned = 0
+    for wall_element in wall_elements:
+        if not remaining:
+            break
+        scanned += 1
+        group_name = wall_element.name
+        if group_name in remaining:
+            wall_index[group_name] = [wall_element.thickness, wall_element.height]
+            remaining.discard(group_name)
+
+    profiler.calls(scanned + 2 * len(wall_index))
+    return wall_index
+
+
+def snapshot_elements(element_layer: ElementLayer, column_elements=None, wall_groups=None):
+    """Read every column element and wall element group property into a new ElementTable."""
+
+    if column_elements is None:
+        column_elements = element_layer.column_elements_below
+    if wall_groups is None:
+        wall_groups = element_layer.wall_element_groups_below
+
+    table = ElementTable()
+    table.column_elements = column_elements
+    table.wall_groups = wall_groups
+
+    with profiler.span("column properties"):
+        for column_element in column_elements:
+            location = column_element.location
+            table.columns.append([location.x, location.y, column_element.height, column_element.b, column_element.d])
+        profiler.calls(4 * len(column_elements))
+
+    with profiler.span("wall group names"):
+        group_names = [wall_element_group.name for wall_element_group in wall_groups]
+        profiler.calls(len(wall_groups))
+
+    # thickness and height are only available on the wall elements
+    with profiler.span("wall group index"):
+        wall_index = wall_group_index(element_layer.wall_elements_below, group_names)
+        profiler.calls(1)
+
+    with profiler.span("wall group properties"):
+        for wall_element_group, group_name in zip(wall_groups, group_names):
+            centroid = wall_element_group.centroid
+            thickness, height = wall_index[group_name]
+            table.walls.append([group_name, centroid.x, centroid.y, wall_element_group.total_length, thickness, height, wall_element_group.reaction_angle])
+        profiler.calls(3 * len(wall_groups))
+
+    table.fingerprint = table_fingerprint(table.columns, table.walls)
+    return table
+
+
+def _load_table(cache_path):
+    if cache_path is None or not os.path.isfile(cache_path):
+        return None
+    try:
+        with open(cache_path, "r") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != TABLE_VERSION:
+        return None
+    return data
+
+
+def _save_table(table, cache_path):
+    with open(cache_path, "w") as file:
+        json.dump(table.to_dict(), file)
+
+
+def _spot_check(data, column_elements, wall_groups):
+    """Compare a saved table against the live mesh without reading every element."""
+
+    if len(data["columns"]) != len(column_elements) or len(data["walls"]) != len(wall_groups):
+        return False
+
+    # the first and last elements are enough to catch a remesh, which renumbers everything
+    for index in {0, len(column_elements) - 1} if column_elements else ():
+        location = column_elements[index].location
+        if [location.x, location.y] != data["columns"][index][:2]:
+            return False
+    for index in {0, len(wall_groups) - 1} if wall_groups else ():
+        if wall_groups[index].name != data["walls"][index][0]:
+            return False
+    return True
+
+
+def get_element_table(element_layer: ElementLayer, cache_path=None, mesh_key=None, refresh=False):
+    """Return the ElementTable for element_layer, reusing the table saved at cache_path while the mesh is unchanged.
+
+    mesh_key is a string that changes with the structure (such as model_fingerprint.content_hash); a saved table
+    with another key is not reused. A remesh can renumber the elements without changing the key, so the saved table
+    is always spot checked against the live mesh as well.
+    Pass refresh=True after generate_mesh() to force a new snapshot.
+    """
+
+    # these two lists are needed for the reaction queries anyway, so they are always read
+    with profiler.span("element lists"):
+        column_elements = element_layer.column_elements_below
+        wall_groups = element_layer.wall_element_groups_below
+        profiler.calls(2)
+
+    data = None if refresh else _load_table(cache_path)
+    if data is not None:
+        reuse = (mesh_key is None or data["mesh_key"] == mesh_key) and _spot_check(data, column_elements, wall_groups)
+
+        if reuse:
+            table = ElementTable()
+            table.column_elements = column_elements
+            table.wall_groups = wall_groups
+            table.columns = data["columns"]
+            table.walls = data["walls"]
+            table.fingerprint = data["fingerprint"]
+            table.mesh_key = mesh_key
+            return table
+
+    table = snapshot_elements(element_layer, column_elements, wall_groups)
+    table.mesh_key = mesh_key
+    if cache_path is not None:
+        _save_table(table, cache_path)
+    return table
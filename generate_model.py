@@ -0,0 +1,249 @@
+
+# Parametric version of the add_structure / add_loads / add_pt walkthrough model, for models of any size.
+#
+# A floor is a grid of columns_x by columns_y columns at span spacing, with optional wall runs along the bottom
+# and left edges, beams along every column line in x, area/line/point loads and banded (x) / uniform (y) tendons:
+#
+#  c-------c-------c
+#  |       |       |
+#  w       c       c        c  column        w  wall run (replaces the columns it runs through)
+#  w       |       |        -  beam
+#  wwwwwwwwwwwwwwwww
+#
+# The API is used in SI units with positive signs, as in the walkthrough.
+
+import math
+
+from ram_concept.beam import BeamBehavior
+from ram_concept.concept import Concept
+from ram_concept.enums import ElevationReference
+from ram_concept.line_segment_2D import LineSegment2D
+from ram_concept.model import DesignCode
+from ram_concept.model import Model
+from ram_concept.model import StructureType
+from ram_concept.point_2D import Point2D
+from ram_concept.polygon_2D import Polygon2D
+from ram_concept.slab_area import SlabAreaBehavior
+
+from add_materials import add_materials
+from tendon_layout import TendonRun
+from tendon_layout import add_tendon_layout
+
+
+# support offset from the slab edge, as in add_structure
+EDGE_OFFSET = 0.15
+
+
+def grid_for_supports(supports):
+    """Column grid (columns_x, columns_y) as close to square as possible with at least the given number of supports."""
+
+    columns_x = max(2, math.ceil(math.sqrt(supports)))
+    columns_y = max(2, math.ceil(supports / columns_x))
+    return columns_x, columns_y
+
+
+def grid_coordinates(count, span):
+    """Column line coordinates, pulled in from the slab edges by EDGE_OFFSET."""
+
+    coordinates = [i * span for i in range(count)]
+    coordinates[0] += EDGE_OFFSET
+    coordinates[-1] -= EDGE_OFFSET
+    return coordinates
+
+
+def add_grid_structure(model: Model, columns_x, columns_y, span=8.0, walls=True, beams=True):
+    """Adds the slab, columns, wall runs and beams and returns the number of supports (columns + walls)."""
+
+    concrete_45 = model.concretes.concrete("45 MPa")
+
+    cad_manager = model.cad_manager
+    structure_layer = cad_manager.structure_layer
+
+    length_x = (columns_x - 1) * span
+    length_y = (columns_y - 1) * span
+    xs = grid_coordinates(columns_x, span)
+    ys = grid_coordinates(columns_y, span)
+
+    # SLAB
+
+    default_slab_area = cad_manager.default_slab_area
+    default_slab_area.thickness = 0.2
+    default_slab_area.toc = 0.0
+    default_slab_area.behavior = SlabAreaBehavior.TWO_WAY_SLAB
+    default_slab_area.concrete = concrete_45
+    default_slab_area.priority = 1
+    default_slab_area.r_axis = 0.0
+
+    structure_layer.add_slab_area(Polygon2D([Point2D(0,0), Point2D(length_x,0), Point2D(length_x,length_y), Point2D(0,length_y)]))
+
+    # WALL RUNS ALONG THE BOTTOM AND LEFT EDGES, ONE WALL PER SPAN
+
+    default_wall = cad_manager.default_wall
+    default_wall.below_slab = True
+    default_wall.compressible = True
+    default_wall.concrete = concrete_45
+    default_wall.height = 3
+    default_wall.fixed_near = False
+    default_wall.fixed_far = False
+    default_wall.shear_wall = True
+    default_wall.thickness = 0.2
+    default_wall.use_specified_LLR_parameters = False
+
+    num_walls = 0
+    if walls:
+        for i in range(columns_x - 1):
+            structure_layer.add_wall(LineSegment2D(Point2D(xs[i], ys[0]), Point2D(xs[i + 1], ys[0])))
+        for j in range(columns_y - 1):
+            structure_layer.add_wall(LineSegment2D(Point2D(xs[0], ys[j]), Point2D(xs[0], ys[j + 1])))
+        num_walls = columns_x + columns_y - 2
+
+    # COLUMNS (EXCEPT WHERE THE WALL RUNS ARE)
+
+    default_column = cad_manager.default_column
+    default_column.angle = 0.0
+    default_column.below_slab = True
+    default_column.compressible = True
+    default_column.concrete = concrete_45
+    default_column.b = 0.3
+    default_column.d = 0.3
+    default_column.height = 3.0
+    default_column.i_factor = 1.0
+    default_column.fixed_near = True
+    default_column.fixed_far = True
+    default_column.roller = False
+    default_column.use_specified_LLR_parameters = False
+
+    num_columns = 0
+    for i, x in enumerate(xs):
+        for j, y in enumerate(ys):
+            if walls and (i == 0 or j == 0):
+                continue
+            structure_layer.add_column(Point2D(x, y))
+            num_columns += 1
+
+    # BEAMS ALONG THE COLUMN LINES IN X
+
+    default_beam = cad_manager.default_beam
+    default_beam.thickness = 0.4
+    default_beam.toc = 0.0
+    default_beam.behavior = BeamBehavior.STANDARD_BEAM
+    default_beam.concrete = concrete_45
+    default_beam.priority = 2
+    default_beam.mesh_as_slab = True
+    default_beam.width = 0.5
+
+    if beams:
+        for y in ys:
+            structure_layer.add_beam(LineSegment2D(Point2D(0, y), Point2D(length_x, y)))
+
+    return num_columns + num_walls
+
+
+def add_grid_loads(model: Model, columns_x, columns_y, span=8.0):
+    """Adds perimeter line loads, uniform dead/live/trib area loads and a point live load at every bay centre."""
+
+    cad_manager = model.cad_manager
+    dead_ldg = cad_manager.force_loading_layer("Other Dead Loading")
+    live_ldg = cad_manager.force_loading_layer("Live (Reducible) Loading")
+
+    # the trib loading is optional, it is found by name as in get_reactions
+    trib_ldgs = [loading for loading in cad_manager.force_loading_layers if "trib" in loading.name.lower()]
+
+    length_x = (columns_x - 1) * span
+    length_y = (columns_y - 1) * span
+    corners = [Point2D(0,0), Point2D(length_x,0), Point2D(length_x,length_y), Point2D(0,length_y)]
+
+    # PERIMETER DEAD LOAD
+
+    default_line_load = cad_manager.default_line_load
+    default_line_load.elevation = 0
+    default_line_load.set_load_values(0,0,-10000,0,0) # negative Fz load is downward
+
+    for corner_pt1, corner_pt2 in zip(corners, corners[1:] + corners[:1]):
+        dead_ldg.add_line_load(LineSegment2D(corner_pt1, corner_pt2))
+
+    # UNIFORM AREA LOADS
+
+    whole_slab_polygon = Polygon2D(corners)
+    for loading, Fz in [(dead_ldg, -2000), (live_ldg, -5000)] + [(trib_ldg, -1) for trib_ldg in trib_ldgs]:
+        area_load = loading.add_area_load(whole_slab_polygon)
+        area_load.elevation = 0
+        area_load.set_load_values(0,0,Fz,0,0)
+
+    # POINT LIVE LOAD IN EVERY BAY
+
+    default_point_load = cad_manager.default_point_load
+    default_point_load.elevation = 0
+    default_point_load.set_load_values(0,0,-50000,0,0)
+
+    for i in range(columns_x - 1):
+        for j in range(columns_y - 1):
+            live_ldg.add_point_load(Point2D((i + 0.5) * span, (j + 0.5) * span))
+
+
+def _profile_points(coordinates):
+    """Profile point coordinates (supports and mid-spans) and their elevations, high over supports and low at mid-span."""
+
+    points = [coordinates[0]]
+    profiles = [0.1]
+    for a, b in zip(coordinates, coordinates[1:]):
+        points += [(a + b) / 2, b]
+        profiles += [0.04, 0.14]
+    profiles[-1] = 0.1
+    return points, profiles
+
+
+def add_grid_pt(model: Model, columns_x, columns_y, span=8.0, band_strands=20, uniform_strands=3, uniform_spacing=1.0):
+    """Adds banded tendons along every column line in x and uniform tendons at uniform_spacing in y."""
+
+    cad_manager = model.cad_manager
+    pt_13mm = model.pt_systems.pt_system("13mm Bonded")
+
+    default_tendon_segment = cad_manager.default_tendon_segment
+    default_tendon_segment.pt_system = pt_13mm
+    default_tendon_segment.auto_locate_profile_2 = False
+    default_tendon_segment.elevation_reference_1 = ElevationReference.ABOVE_SOFFIT
+    default_tendon_segment.elevation_reference_2 = ElevationReference.ABOVE_SOFFIT
+    default_tendon_segment.harped = False
+    default_tendon_segment.inflection_ratio = 0.1
+
+    default_jack = cad_manager.default_jack
+    default_jack.use_pt_system_defaults = True
+
+    xs = grid_coordinates(columns_x, span)
+    ys = grid_coordinates(columns_y, span)
+
+    # BANDED "LONGITUDE" TENDONS ALONG THE COLUMN LINES
+
+    coordinates, profiles = _profile_points(xs)
+    runs = [TendonRun("longitude", coordinates, profiles, band_strands, y) for y in ys]
+
+    # UNIFORM "LATITUDE" TENDONS, FROM HALF A SPACING IN TO THE LAST COLUMN LINE
+
+    coordinates, profiles = _profile_points(ys)
+    count = int(math.ceil((xs[-1] - uniform_spacing / 2) / uniform_spacing))
+    runs.append(TendonRun("latitude", coordinates, profiles, uniform_strands, uniform_spacing / 2, count, uniform_spacing))
+
+    add_tendon_layout(model, runs)
+
+
+def generate_model(concept: Concept, columns_x, columns_y, span=8.0, walls=True, beams=True, loads=True, pt=True, mesh=True):
+    """New model with a columns_x by columns_y floor; returns (model, number of supports)."""
+
+    model = concept.new_model()
+    model.setup_new_model(DesignCode.ACI318_14SI, StructureType.ELEVATED)
+
+    # the walkthrough units and signs
+    model.units.set_SI_API_units()
+    model.signs.set_positive_signs()
+
+    add_materials(model)
+    supports = add_grid_structure(model, columns_x, columns_y, span, walls, beams)
+    if loads:
+        add_grid_loads(model, columns_x, columns_y, span)
+    if pt:
+        add_grid_pt(model, columns_x, columns_y, span)
+    if mesh:
+        model.generate_mesh()
+
+    return model, supports
@@ -18,10 +18,24 @@ from ram_concept.point_2D import Point2D
 from ram_concept.point_3D import Point3D
 from ram_concept.result_layers import ReactionContext
 
-import time
+import numpy as np
 import openpyxl
 import sys
 
+from element_table import ElementTable
+from element_table import get_element_table
+from loading_registry import LoadingRegistry
+from combo_engine import TRIB_COMBO
+from combo_engine import check_combo_factors
+from combo_engine import evaluate_combos
+from combo_engine import fetch_base_reactions
+from combo_engine import referenced_loadings
+from profiling import profiler
+from takedown_table import TAKEDOWN_UNITS
+from takedown_table import TakedownTable
+from trib_area import LOCAL_TRIB
+from trib_area import local_trib_reactions
+
 def lb_to_kip(value):
     return value / 1000
 
@@ -30,251 +44,313 @@ def in_to_ft(value):
 
 
 
-def get_reactions(model: Model):
-      
+def get_settings(argv=None):
+    """Takedown settings from the VBA userform (or the debugging values), as a dict.
 
-    ######################################################################      VARIABLES     ##################################################################
+    argv can be given to read the VBA arguments from a list other than sys.argv.
+    """
 
     run_from_VBA = False
 
-    if run_from_VBA:
+    if run_from_VBA or argv is not None:
         ### Get variables from VBA
-        start_level, end_level, loading_type, max_height, model_filepath, name_DL, name_LL, name_trib = [sys.argv[i] for i in range(2,10)]
+        if argv is None:
+            argv = sys.argv
+        start_level, end_level, loading_type, max_height, model_filepath, name_DL, name_LL, name_trib = [argv[i] for i in range(2,10)]
     else:
         ### for debugging without VBA
         start_level, end_level, loading_type, max_height, model_filepath, name_DL, name_LL, name_trib = 4, 4, "RESIDENTIAL", 11, "H:\Internal Innovation\RAM to Takedown\RAM\Dining Hall 2.cpt", "All Dead LC", "Live+Soil (total Live Load reactions)", "Trib"
 
+    return {"start_level": start_level, "end_level": end_level, "loading_type": loading_type, "max_height": max_height,
+            "model_filepath": model_filepath, "name_DL": name_DL, "name_LL": name_LL, "name_trib": name_trib}
 
-    # Cast number types
-    start_level = int(start_level)
-    end_level = int(end_level)
-    max_height = float(max_height)
 
-    # Create results list
-    takedown_list = []
 
-    ######################################################################      COMBO DATA     ##################################################################
+def row_labels(kind, index, group_name=None):
+    """[kind, id] appended to a row when labels are requested: columns are C1, C2... in element order, walls use their group name."""
+    if kind == "column":
+        return ["column", "C" + str(index + 1)]
+    return ["wall", group_name]
 
-    cad_manager = model.cad_manager
-    element_layer = cad_manager.element_layer
-    
-    # get all the loadings
-    loadings = cad_manager.force_loading_layers
 
-    # get all the load combos
-    load_combos = cad_manager.load_combo_layers
 
-    # combine the load combo layers and the loading layers, as we want reactions for both
-    loadings_and_combos = loadings + load_combos
+def walls_within_height(element_table: ElementTable, max_height):
+    """[(wall element group, wall)] for the walls no taller than max_height (ft); reactions are only read for these."""
+    return [(wall_element_group, wall) for wall_element_group, wall in zip(element_table.wall_groups, element_table.walls) if in_to_ft(wall[5]) <= max_height]
 
-    #set load combo names from userform
-    # name_DL = "All Dead LC"
-    # name_LL = "Live+Soil (total Live Load reactions)"
-    # name_trib = "Trib"
 
-    #name_DL = cmb_dead
-    #name_LL = cmb_live
-    #name_trib = cmb_trib
+def takedown_columns(element_table: ElementTable, walls, reactions, labels=False, combos=None):
+    """TakedownTable (in takedown units) of every column and the given walls, filled a column at a time.
 
-    # get relevant load combo objects from list of loading layers
-    
-    combo_dead = "Dead load combo not found in model."
-    combo_live = "Live load combo not found in model."
-    combo_trib = "Trib load case not found in model."
-    
-    combo_list = [combo_dead, combo_live, combo_trib]
-
-    # Match combo names with combo layer in model
-    for combo in load_combos:
-        combo_name = combo.name
-        if combo_name == name_DL:
-            combo_dead = combo
-        elif combo_name == name_LL:
-            combo_live = combo
-    
-    for combo in loadings:
-        if combo.name == name_trib or "trib" in combo.name.lower():
-            combo_trib = combo
-
-    # Check if any combo was not found
-    if type(combo_dead) == str:
-        return combo_dead
-    elif type(combo_live) == str:
-        return combo_live
-    elif type(combo_trib) == str:
-        return combo_trib
-    
+    walls is a list as returned by walls_within_height and reactions the DL, LL and Trib reactions (API units)
+    of the columns followed by the walls. combos, if given, is {combo name: reactions} (API units, same order)
+    kept in the table's combos.
+    """
 
-    ######################################################################      COLUMN DATA     ##################################################################
-    
-    # loop through column elements, add column data to list
-    for column_element in element_layer.column_elements_below:
-        # reaction = loading_or_combo.column_reaction(column_element, ReactionContext.STANDARD)
-        # location = column_element.location
-        # print("{0:7.2f} {1:7.2f} {2:9.2g} {3:9.2g} {4:9.2g} {5:9.2g} {6:9.2g} {7:9.2g} {8:9.2g}".format(location.x, location.y, reaction.x, reaction.y, reaction.z, reaction.rot_x, reaction.rot_y, column_element.b, column_element.d))
+    columns = np.array(element_table.columns, dtype="f8").reshape(-1, 5)                                  # x, y, height, b, d
+    wall_values = np.array([wall[1:] for wall_element_group, wall in walls], dtype="f8").reshape(-1, 6)   # x, y, length, thickness, height, angle
 
-        t1 = time.time()
+    DL, LL, trib = reactions
+    table = TakedownTable.from_columns({
+        "x": np.concatenate([columns[:, 0], wall_values[:, 0]]),
+        "y": np.concatenate([columns[:, 1], wall_values[:, 1]]),
+        "DL": DL,
+        "LL": LL,
+        "H": np.concatenate([columns[:, 2], wall_values[:, 4]]),
+        "b": np.concatenate([columns[:, 3], wall_values[:, 3]]),
+        "d": np.concatenate([columns[:, 4], wall_values[:, 2]]),
+        "Trib": trib,
+        "angle": np.concatenate([np.zeros(len(columns)), wall_values[:, 5]]),
+    }, kinds=["column"] * len(columns) + ["wall"] * len(walls),
+       ids=[row_labels("column", i)[1] for i in range(len(columns))] + [wall[0] for wall_element_group, wall in walls],
+       labels=labels, combos=combos)
 
-        location = column_element.location
+    # API units to ft and kip, once per column
+    return table.to_units(TAKEDOWN_UNITS)
 
-        # get column reactions from 3 combos
-        rxn_DL = combo_dead.column_reaction(column_element, ReactionContext.STANDARD).z
-        rxn_LL = combo_live.column_reaction(column_element, ReactionContext.STANDARD).z
-        rxn_trib = combo_trib.column_reaction(column_element, ReactionContext.STANDARD).z
 
-        t2 = time.time()
-        #print("Combo time: " + str(t2-t1))
+def local_combo_takedown(registry: LoadingRegistry, combo_trib, element_table: ElementTable, combo_factors, max_height, labels=False, model: Model = None):
+    """TakedownTable with DL and LL combined locally from the base loadings (see combo_engine.py).
 
-        # Compile list of current column's data, convert to desired units
-        col_data = [in_to_ft(location.x), in_to_ft(location.y), lb_to_kip(rxn_DL), lb_to_kip(rxn_LL), in_to_ft(column_element.height), column_element.b, column_element.d, lb_to_kip(rxn_trib)]
+    combo_factors must hold "DL" and "LL" as {loading name: factor} dicts (see combo_engine.check_combo_factors); any other combos in it are
+    evaluated from the same reactions at no extra server cost. The z reaction of every combo in combo_factors
+    is returned in the table's combos (see takedown_table.py), by combo name. The Trib loading is fetched alongside,
+    or, when combo_trib is None, the tributary areas are calculated locally from the model (see trib_area.py).
+    Raises LookupError naming every loading the combos use that is not in the model.
+    """
 
-        t3 = time.time()
-        #print("Col_data time: " + str(t3-t2))
+    # loading names as the model spells them, which is how the base reactions are labelled
+    combo_factors = registry.model_factors(combo_factors)
+    if combo_trib is not None:
+        combo_factors[TRIB_COMBO] = {registry.name(combo_trib): 1.0}
 
-        # add current column data list to full takedown list
-        takedown_list.append(col_data)
-     #   print(len(takedown_list))
+    # only fetch the loadings the combos actually use
+    loading_names = referenced_loadings(combo_factors)
+    loadings = registry.loadings_named(loading_names)
 
-        t4 = time.time()
-        #print("Takedown time: " + str(t4-t3))
+    # apply the height limit before querying any wall reactions
+    walls = walls_within_height(element_table, max_height)
 
-      #  print()
-      #  print()
+    base = fetch_base_reactions(loadings, element_table.column_elements, [wall_element_group for wall_element_group, wall in walls])
+    combos = evaluate_combos(base, combo_factors)
 
+    # z component of each combo, columns then walls
+    combo_reactions = {name: np.concatenate([column_reactions[:, 2], wall_reactions[:, 2]]) for name, (column_reactions, wall_reactions) in combos.items()}
+    reactions = [combo_reactions["DL"], combo_reactions["LL"]]
+    if combo_trib is not None:
+        reactions.append(combo_reactions.pop(TRIB_COMBO))
+    else:
+        reactions.append(np.concatenate(local_trib_reactions(model, element_table, walls)))
 
-    ######################################################################      WALL DATA     ##################################################################
+    return takedown_columns(element_table, walls, reactions, labels, combo_reactions)
 
-    
 
 
-    #wall_group_numbers = ["#" + str(i) for i in range(1,len(element_layer.wall_element_groups_below)+1)]
-    
-    """     ### Method 1
+def get_reactions(model: Model, element_table: ElementTable = None, combo_factors=None, settings=None, on_row=None, labels=False, registry: LoadingRegistry = None):
+    """Build the takedown list for the model: one [x, y, DL, LL, H, b, d, Trib] row per column and wall.
 
-    wall_thickness_dict = {}
+    Returns the "... not found in model." messages instead when combos or loadings are missing.
+    on_row, if given, is called with each row as soon as it is computed. See iter_reactions for the other arguments.
+    """
 
-    t5 = time.time()
+    takedown_list = []
+    try:
+        for col_data in iter_reactions(model, element_table, combo_factors, settings, labels, registry):
+            if on_row is not None:
+                on_row(col_data)
+            takedown_list.append(col_data)
+    except LookupError as error:
+        return str(error)
 
-    i = 1
-    for wall_element in element_layer.wall_elements_below:
-        #print(wall_element.name == "(#1)")
-        elem_name = "(#" + str(i) + ")"
-        if wall_element.name == elem_name:
-            wall_thickness_dict[elem_name] = [wall_element.thickness, wall_element.height/12]
-            i += 1
-    
-    t6 = time.time()
-    print("Wall search time: " + str(t6-t5)) """
+    return takedown_list
 
 
-    ### Method 2
 
-    wall_thickness_dict = {}
-    t6 = time.time()
+def get_takedown_table(model: Model, element_table: ElementTable = None, combo_factors=None, settings=None, labels=False, registry: LoadingRegistry = None):
+    """The takedown as a TakedownTable (see takedown_table.py), built in bulk; for large runs that do not stream rows.
 
-    for wall_element in element_layer.wall_elements_below:
-        if not wall_element.name in wall_thickness_dict:
-            wall_thickness_dict[wall_element.name] = [wall_element.thickness, wall_element.height/12]
+    The table is used like the list get_reactions returns, and holds the same values.
+    Returns the "... not found in model." messages instead when combos or loadings are missing.
+    See iter_reactions for the arguments.
+    """
 
-    t7 = time.time()
-    #print("Build wall dict 2: " + str(t7-t6))
-    #username = input("Continue?")
-    
+    try:
+        element_table, registry, combo_dead, combo_live, combo_trib, max_height = prepare_takedown(model, element_table, combo_factors, settings, registry)
+        if combo_factors is not None:
+            return local_combo_takedown(registry, combo_trib, element_table, combo_factors, max_height, labels, model)
+    except LookupError as error:
+        return str(error)
+
+    walls = walls_within_height(element_table, max_height)
+    num_columns = len(element_table.column_elements)
+
+    # DL, LL and Trib reactions, columns then walls, read straight into one array
+    reactions = np.zeros((3, num_columns + len(walls)))
+    combos = [combo_dead, combo_live, combo_trib]
+    if combo_trib is None:
+        reactions[2] = np.concatenate(local_trib_reactions(model, element_table, walls))
+        combos = combos[:2]
+
+    with profiler.span("column loop"):
+        for i, column_element in enumerate(element_table.column_elements):
+            for j, combo in enumerate(combos):
+                reactions[j, i] = combo.column_reaction(column_element, ReactionContext.STANDARD).z
+        profiler.calls(len(combos) * num_columns)
+
+    with profiler.span("wall loop"):
+        for i, (wall_element_group, wall) in enumerate(walls):
+            for j, combo in enumerate(combos):
+                reactions[j, num_columns + i] = combo.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
+        profiler.calls(len(combos) * len(walls))
+
+    return takedown_columns(element_table, walls, reactions, labels)
+
+
+
+def prepare_takedown(model: Model, element_table: ElementTable = None, combo_factors=None, settings=None, registry: LoadingRegistry = None):
+    """(element table, registry, dead combo, live combo, trib loading, max height) for a takedown of the model.
+
+    The trib loading is None when the trib name is LOCAL_TRIB (tributary areas calculated locally, see trib_area.py).
+    See iter_reactions for the arguments. Raises LookupError with the "... not found in model." message of every missing combo or loading.
+    """
+
+    ######################################################################      VARIABLES     ##################################################################
+
+    if settings is None:
+        settings = get_settings()
+
+    start_level, end_level, loading_type, max_height, model_filepath, name_DL, name_LL, name_trib = [settings[key] for key in
+        ["start_level", "end_level", "loading_type", "max_height", "model_filepath", "name_DL", "name_LL", "name_trib"]]
+
+
+    # Cast number types
+    start_level = int(start_level)
+    end_level = int(end_level)
+    max_height = float(max_height)
+
+    ######################################################################      COMBO DATA     ##################################################################
+
+    # local combos must give DL and LL, and leave the trib combo's name free
+    if combo_factors is not None:
+        check_combo_factors(combo_factors)
+
+    cad_manager = model.cad_manager
+    element_layer = cad_manager.element_layer
     
-    """ ### Method 3
-    wall_thickness_dict = {}
-    t7 = time.time()
+    # the loading and combo names are read once per model, pass the registry in to reuse it
+    if registry is None:
+        registry = LoadingRegistry.from_model(model)
 
-    wall_group_numbers = ["(#" + str(i) + ")" for i in range(1,len(element_layer.wall_element_groups_below)+1)]
+    #set load combo names from userform
+    # name_DL = "All Dead LC"
+    # name_LL = "Live+Soil (total Live Load reactions)"
+    # name_trib = "Trib"     (or LOCAL_TRIB to calculate the tributary areas locally)
+
+    # get relevant load combo objects, raises LookupError naming everything missing (dead and live combos are not needed when they are combined locally)
+    with profiler.span("combo lookup"):
+        combo_dead, combo_live, combo_trib = registry.resolve(name_DL, name_LL, name_trib, combos_needed=combo_factors is None,
+                                                              trib_needed=str(name_trib).casefold() != LOCAL_TRIB)
     
-    for wall_element in element_layer.wall_elements_below:                                      # Loop through wall elements
-        elem_name = wall_element.name
-        if elem_name in wall_group_numbers:                                                     # If element name is still in wall_group_numbers:
-            wall_height = wall_element.height/12
-            if wall_height <= hLimit:                                                               # If element height is within limit
-                wall_thickness_dict[elem_name] = [wall_element.thickness, wall_height]                  # Add to dictionary
-            wall_group_numbers.remove(elem_name)                                                    # Remove element name from wall_group_numbers
 
-    t8 = time.time()
-    print("Build wall dict 3: " + str(t8-t7)) """
- 
+    ######################################################################      ELEMENT DATA     ##################################################################
 
+    # read all column and wall element properties from the server once, the loops below only use this local table
+    if element_table is None:
+        element_table = get_element_table(element_layer)
 
-    #wall_element_dict = {}
-    #for wall_element in element_layer.wall_elements_below:
-    #    wall_element_dict[wall_element.name] = [wall_element.thickness, wall_element.height/12]
-    #
-    #t8 = time.time()
-    #print("Wall dict time: " + str(t8-t7))
+    return element_table, registry, combo_dead, combo_live, combo_trib, max_height
 
 
 
-    #print(element_layer.wall_elements_below)
-    #
-    #username = input("Continue?")
-    #print("answer: " + username) 
+def iter_reactions(model: Model, element_table: ElementTable = None, combo_factors=None, settings=None, labels=False, registry: LoadingRegistry = None):
+    """Yield the takedown rows of the model one at a time, columns first, then walls.
 
+    settings is a dict as returned by get_settings(), which is read when it is not given.
+    element_table can be passed in to reuse a snapshot of the element properties (see element_table.py),
+    and registry to reuse the model's loading and combo lookup (see loading_registry.py).
+    When combo_factors is given, DL and LL are combined locally from the base loadings instead of
+    being read from the model's load combos (see local_combo_takedown).
+    With labels set, each row also ends with the element kind and id (see row_labels).
+    Raises LookupError with the "... not found in model." message of every missing combo or loading.
+    """
+      
 
-    t9 = time.time()
+    element_table, registry, combo_dead, combo_live, combo_trib, max_height = prepare_takedown(model, element_table, combo_factors, settings, registry)
 
-    #### loop through wall element groups, add wall data to list
-    for wall_element_group in element_layer.wall_element_groups_below:
-       
-       # OLD WALL THICKNESS SEARCH
-        # loop through wall elements to find one in this wall element group and get thickness and height
-        #for wall_element in element_layer.wall_elements_below:
-        #    if wall_element.name == wall_element_group.name:
-        #        b = wall_element.thickness
-        #        h = wall_element.height
-        #      #  print("Wall element name: " + str(wall_element.name))
-        #      #  print("Thickness: " + str(b) + " , Height: " + str(h))
-        #        break
 
+    ######################################################################      LOCAL COMBOS     ##################################################################
 
-        # Check is wall met height limit and therefore is in wall thickness dict
-        #if wall_element_group.name in wall_thickness_dict:
+    # one batch of base loading reactions, then every combo is a matrix product
+    if combo_factors is not None:
+        for row in local_combo_takedown(registry, combo_trib, element_table, combo_factors, max_height, labels, model):
+            yield row.tolist()
+        return
 
-        # NEW WALL THICKNESS SET
-        group_name = wall_element_group.name
-        b = wall_thickness_dict[group_name][0]
-        h = wall_thickness_dict[group_name][1]
 
+    walls = walls_within_height(element_table, max_height)
 
-        if h <= max_height:
-        
-            # reaction = loading_or_combo.wall_group_reaction(wall_element_group, ReactionContext.STANDARD)
-            #name = wall_element_group.name
-            #centroid = wall_element_group.centroid
-            #angle = wall_element_group.reaction_angle
-            #length = wall_element_group.total_length
-            #area = wall_element_group.total_area
+    # local tributary areas, for every column and wall at once
+    if combo_trib is None:
+        column_trib, wall_trib = local_trib_reactions(model, element_table, walls)
 
-            rxn_DL = combo_dead.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
-            rxn_LL = combo_live.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
-            rxn_trib = combo_trib.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
 
-            centroid = wall_element_group.centroid
-            d = wall_element_group.total_length
-         #   print("d: " + str(d))
-            
-            
-            # compile wall data into list
-            col_data = [in_to_ft(centroid.x), in_to_ft(centroid.y), lb_to_kip(rxn_DL), lb_to_kip(rxn_LL), h, b, d, lb_to_kip(rxn_trib)]
-            #col_data = [ '%.3f' % elem for elem in col_data]
+    ######################################################################      COLUMN DATA     ##################################################################
+    
+    # loop through column elements, add column data to list
+    for index, (column_element, (x, y, height, b, d)) in enumerate(zip(element_table.column_elements, element_table.columns)):
+        # reaction = loading_or_combo.column_reaction(column_element, ReactionContext.STANDARD)
+        # location = column_element.location
+        # print("{0:7.2f} {1:7.2f} {2:9.2g} {3:9.2g} {4:9.2g} {5:9.2g} {6:9.2g} {7:9.2g} {8:9.2g}".format(location.x, location.y, reaction.x, reaction.y, reaction.z, reaction.rot_x, reaction.rot_y, column_element.b, column_element.d))
 
-            # add current wall data list to full takedown list
-            takedown_list.append(col_data)
+        with profiler.span("column loop"):
+            # get column reactions from 3 combos
+            rxn_DL = combo_dead.column_reaction(column_element, ReactionContext.STANDARD).z
+            rxn_LL = combo_live.column_reaction(column_element, ReactionContext.STANDARD).z
+            if combo_trib is not None:
+                rxn_trib = combo_trib.column_reaction(column_element, ReactionContext.STANDARD).z
+                profiler.calls(3)
+            else:
+                rxn_trib = column_trib[index]
+                profiler.calls(2)
 
+            # Compile list of current column's data, convert to desired units
+            col_data = [in_to_ft(x), in_to_ft(y), lb_to_kip(rxn_DL), lb_to_kip(rxn_LL), in_to_ft(height), b, d, lb_to_kip(rxn_trib)]
 
-    t10 = time.time()
-    #print("Wall calcs: " + str(t10-t9))
+        # hand current column data list to the caller
+        yield col_data + row_labels("column", index) if labels else col_data
 
-    #print(len(takedown_list))
 
+    ######################################################################      WALL DATA     ##################################################################
 
+    
+
+
+    #### loop through the wall element groups within the height limit, add wall data to list
+    for index, (wall_element_group, (group_name, x, y, d, b, height, angle)) in enumerate(walls):
+
+        # reaction = loading_or_combo.wall_group_reaction(wall_element_group, ReactionContext.STANDARD)
+        #name = wall_element_group.name
+        #centroid = wall_element_group.centroid
+        #angle = wall_element_group.reaction_angle
+        #length = wall_element_group.total_length
+        #area = wall_element_group.total_area
+
+        with profiler.span("wall loop"):
+            rxn_DL = combo_dead.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
+            rxn_LL = combo_live.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
+            if combo_trib is not None:
+                rxn_trib = combo_trib.wall_group_reaction(wall_element_group, ReactionContext.STANDARD).z
+                profiler.calls(3)
+            else:
+                rxn_trib = wall_trib[index]
+                profiler.calls(2)
+
+            # compile wall data into list
+            col_data = [in_to_ft(x), in_to_ft(y), lb_to_kip(rxn_DL), lb_to_kip(rxn_LL), in_to_ft(height), b, d, lb_to_kip(rxn_trib)]
+
+        # hand current wall data list to the caller
+        yield col_data + row_labels("wall", None, group_name) if labels else col_data
 
-    # RETURN 
-    return takedown_list
 
 
 
@@ -13,8 +13,175 @@ from ram_concept.tendon_segment import TendonSegment
 from ram_concept.model import Model
 from ram_concept.point_2D import Point2D
 
-def get_tendon_profiles(model: Model):
-    """Determine the reactions for the 16m x 16m structure """
+import numpy as np
+
+from profiling import profiler
+
+
+# one row per point along a tendon segment, in layer, segment and ratio order
+TENDON_FIELDS = ["layer", "segment", "ratio", "x", "y", "z", "strands"]
+TENDON_DTYPE = np.dtype([("layer", "U64"), ("segment", "i8"), ("ratio", "f8"), ("x", "f8"), ("y", "f8"), ("z", "f8"), ("strands", "f8")])
+
+# points per segment, at equal ratios from end to end (11 gives the 10th points)
+POINTS_PER_SEGMENT = 11
+
+# points per segment read when sampling to a tolerance; the points kept are chosen from these
+ADAPTIVE_GRID_POINTS = 101
+
+
+def segment_ratios(points=POINTS_PER_SEGMENT):
+    """The ratios along a segment of points equally spaced points, both ends included."""
+    return [i / (points - 1) for i in range(points)] if points > 1 else [0.0]
+
+
+def tendon_segment_data(tendon_layer: TendonLayer, fractions):
+    """(numbers, end points, elevations, strand counts) of every tendon segment of the layer, each read from the server once.
+
+    end points is (segments x 4) [x1, y1, x2, y2] and elevations is (segments x fractions).
+    """
+
+    numbers = []
+    end_points = []
+    elevations = []
+    strands = []
+
+    with profiler.span("tendon segments"):
+        tendon_segments = tendon_layer.tendon_segments
+        for tendon_segment in tendon_segments:
+            numbers.append(tendon_segment.number)
+            location = tendon_segment.location
+            end_points.append([location.start_point.x, location.start_point.y, location.end_point.x, location.end_point.y])
+            elevations.append(tendon_segment.elevations_along_segment(fractions))
+            strands.append(tendon_segment.strand_count)
+        profiler.calls(1 + 4 * len(tendon_segments))
+
+    return numbers, np.array(end_points, dtype="f8").reshape(-1, 4), np.array(elevations, dtype="f8").reshape(-1, len(fractions)), strands
+
+
+def points_along_segments(end_points, fractions):
+    """x and y (segments x fractions) of the points at each fraction along every segment, all at once."""
+
+    fractions = np.asarray(fractions, dtype="f8")
+    x = end_points[:, 0:1] + fractions * (end_points[:, 2:3] - end_points[:, 0:1])
+    y = end_points[:, 1:2] + fractions * (end_points[:, 3:4] - end_points[:, 1:2])
+    return x, y
+
+
+def simplify_profiles(fractions, elevations, tolerance):
+    """(segments x fractions) mask of the points to keep so that straight lines between them stay within tolerance
+    of every elevation (segments x fractions); the ends of each segment are always kept.
+
+    As in Douglas-Peucker, the point furthest from the line between each pair of neighbouring kept points is added
+    until none is further than tolerance, so points gather where the profile curves (high and low points,
+    inflections) and straight runs keep only their ends. Every interval of every segment is split in the same pass.
+    """
+
+    fractions = np.asarray(fractions, dtype="f8")
+    count = len(fractions)
+    kept = np.zeros(elevations.shape, dtype=bool)
+    kept[:, [0, -1]] = True
+    rows = np.arange(len(elevations))
+
+    while len(rows):
+        # nearest kept point on either side of every point
+        index = np.arange(count)
+        left = np.maximum.accumulate(np.where(kept[rows], index, 0), axis=1)
+        right = np.minimum.accumulate(np.where(kept[rows], index, count - 1)[:, ::-1], axis=1)[:, ::-1]
+
+        z = elevations[rows]
+        z_left = np.take_along_axis(z, left, axis=1)
+        z_right = np.take_along_axis(z, right, axis=1)
+        span = fractions[right] - fractions[left]
+        weight = np.divide(fractions - fractions[left], span, out=np.zeros(span.shape), where=span > 0)
+        deviation = np.abs(z - (z_left + weight * (z_right - z_left)))
+
+        # the furthest point of each interval that is out of tolerance
+        row, point = np.nonzero(deviation > tolerance)
+        interval = left[row, point]
+        order = np.lexsort((-deviation[row, point], interval, row))
+        row, point, interval = row[order], point[order], interval[order]
+        furthest = np.ones(len(row), dtype=bool)
+        furthest[1:] = (row[1:] != row[:-1]) | (interval[1:] != interval[:-1])
+
+        kept[rows[row[furthest]], point[furthest]] = True
+        rows = rows[np.unique(row)]
+
+    return kept
+
+
+def layer_profile_table(tendon_layer: TendonLayer, fractions, tolerance=None):
+    """Array of TENDON_DTYPE with the points at fractions along every tendon segment of the layer.
+
+    With a tolerance, only the points needed to draw each profile within tolerance are kept (see simplify_profiles).
+    """
+
+    # one read per segment, then the plan positions of every point are interpolated locally
+    numbers, end_points, elevations, strands = tendon_segment_data(tendon_layer, fractions)
+    x, y = points_along_segments(end_points, fractions)
+
+    kept = np.ones(elevations.shape, dtype=bool) if tolerance is None else simplify_profiles(fractions, elevations, tolerance)
+    counts = kept.sum(axis=1)
+
+    table = np.zeros(counts.sum(), dtype=TENDON_DTYPE)
+    table["layer"] = tendon_layer.name
+    table["segment"] = np.repeat(np.array(numbers, dtype="i8"), counts)
+    table["ratio"] = np.broadcast_to(np.asarray(fractions, dtype="f8"), kept.shape)[kept]
+    table["x"] = x[kept]
+    table["y"] = y[kept]
+    table["z"] = elevations[kept]
+    table["strands"] = np.repeat(np.array(strands, dtype="f8"), counts)
+    return table
+
+
+def iter_tendon_profiles(model: Model, points=POINTS_PER_SEGMENT, tolerance=None):
+    """Yield (layer name, array of TENDON_DTYPE) for each tendon layer drawn by the user, one layer at a time.
+
+    With a tolerance (elevation, API units) the points are chosen from at least ADAPTIVE_GRID_POINTS per segment
+    to follow each profile within it, rather than taking points equally spaced points.
+    """
+
+    fractions = segment_ratios(points if tolerance is None else max(points, ADAPTIVE_GRID_POINTS))
+    for tendon_layer in model.cad_manager.tendon_layers:
+        if tendon_layer.generated_by == GeneratedBy.PROGRAM:
+            continue
+        yield tendon_layer.name, layer_profile_table(tendon_layer, fractions, tolerance)
+
+
+def tendon_profile_table(model: Model, points=POINTS_PER_SEGMENT, tolerance=None):
+    """Array of TENDON_DTYPE with the points along every tendon segment of every user tendon layer (see iter_tendon_profiles)."""
+    tables = [table for layer_name, table in iter_tendon_profiles(model, points, tolerance)]
+    return np.concatenate(tables) if tables else np.zeros(0, dtype=TENDON_DTYPE)
+
+
+def format_tendon_layer(layer_name, table):
+    """The fixed-width report of one tendon layer's profile table: a header, then a block of points per segment."""
+
+    header = layer_name + "  TENDON SEGMENT POSITIONS"
+    lines = [header, "*" * len(header), " #    ratio     x       y        z   ", "-------------------------------------"]
+
+    segments = table["segment"].tolist()
+    for index, row in enumerate(zip(segments, table["ratio"].tolist(), table["x"].tolist(), table["y"].tolist(), table["z"].tolist())):
+        lines.append("{0:>3}   {1:4.2f}  {2:7.3g} {3:7.3g} {4:7.3g}".format(*row))
+        if index + 1 == len(segments) or segments[index + 1] != row[0]:
+            lines.append("") # space between tendon segments
+
+    # space between tendon layers
+    lines += ["", ""]
+    return "\n".join(lines) + "\n"
+
+
+def format_tendon_profiles(table):
+    """The fixed-width report of a profile table (see format_tendon_layer), layer by layer."""
+
+    layer_starts = np.flatnonzero(table["layer"][1:] != table["layer"][:-1]) + 1
+    return "".join(format_tendon_layer(block["layer"][0], block) for block in np.split(table, layer_starts) if len(block))
+
+
+def get_tendon_profiles(model: Model, points=POINTS_PER_SEGMENT, report=True, tolerance=None):
+    """Profile table (array of TENDON_DTYPE, see tendon_profile_table) of the model's tendons.
+
+    With report set, each layer's fixed-width report is also printed as soon as the layer is read.
+    """
 
     # The structure created is a simple 16m x 16m square, with 8m spans:
 
@@ -26,38 +193,10 @@ def get_tendon_profiles(model: Model):
     #  w               w
     #  wwwwwwwwwwwwwwwww
 
-    cad_manager = model.cad_manager
-    
-    # get all the tendon_layers
-    tendon_layers = cad_manager.tendon_layers
+    tables = []
+    for layer_name, table in iter_tendon_profiles(model, points, tolerance):
+        if report:
+            print(format_tendon_layer(layer_name, table), end="")
+        tables.append(table)
 
-    # we'll report tendons at 10th points
-    fractional_locations = [i * 0.1 for i in range(11)]
-
-    # report on all the tendon layers
-    for tendon_layer in tendon_layers:
-        if tendon_layer.generated_by == GeneratedBy.PROGRAM:
-            continue
-        
-        # report header
-        header = tendon_layer.name + "  TENDON SEGMENT POSITIONS"
-        print(header)
-        print("*" * len(header))
-        print(" #    ratio     x       y        z   ")
-        print("-------------------------------------")
-
-        tendon_segments = tendon_layer.tendon_segments
-        for tendon_segment in tendon_segments:
-            number = tendon_segment.number
-            location = tendon_segment.location
-            elevations = tendon_segment.elevations_along_segment(fractional_locations)
-            for index in range(11):
-                fraction = fractional_locations[index]
-                point_location = location.point_along_segment(fraction)
-                elevation = elevations[index]
-                print("{0:>3}   {1:4.2f}  {2:7.3g} {3:7.3g} {4:7.3g}".format(number, fraction, point_location.x, point_location.y, elevation))
-            print() # space between tendon segments
-
-        # space between tendon layers
-        print()
-        print()
\ No newline at end of file
+    return np.concatenate(tables) if tables else np.zeros(0, dtype=TENDON_DTYPE)
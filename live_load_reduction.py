@@ -0,0 +1,114 @@
+
+# Live load reduction (ASCE 7 4.7) of the accumulated takedown.
+#
+# Each support's tributary area is taken from its accumulated Trib reaction (the Trib loading is a uniform
+# TRIB_LOAD psf load), and the reduced live load is
+#   L = L0 (0.25 + 15 / sqrt(K_LL A_T))       for K_LL A_T >= 400 ft2
+# limited to ONE_FLOOR_LIMIT L0 for supports carrying one floor and MULTI_FLOOR_LIMIT L0 for two or more.
+# The rules for each occupancy (the loading type from the takedown userform) can make live loads unreducible
+# or, for heavy loads and garages, only reducible for supports carrying two or more floors, by at most 20 %.
+#
+# Every support of every level is reduced in one array operation.
+
+import numpy as np
+
+from cumulative import CumulativeTakedown
+from trib_area import TRIB_LOAD
+
+# live load element factor K_LL by support kind
+ELEMENT_FACTORS = {"column": 4, "wall": 1}
+
+MIN_INFLUENCE_AREA = 400.0     # ft2
+HEAVY_LIVE_LOAD = 100.0        # psf, live loads above this are treated as heavy
+
+LLR_DTYPE = np.dtype([("kind", "U6"), ("id", "U32"), ("area", "f8"), ("floors", "f8"), ("factor", "f8"), ("LL", "f8"), ("LL_reduced", "f8")])
+
+
+class OccupancyRule:
+    """How live loads of one occupancy may be reduced.
+
+    reducible            False for occupancies whose live loads are never reduced (e.g. assembly)
+    one_floor_reducible  False when only supports carrying two or more floors may be reduced
+    one_floor_limit      smallest factor for supports carrying one floor
+    multi_floor_limit    smallest factor for supports carrying two or more floors
+    """
+
+    def __init__(self, reducible=True, one_floor_reducible=True, one_floor_limit=0.5, multi_floor_limit=0.4):
+        self.reducible = reducible
+        self.one_floor_reducible = one_floor_reducible
+        self.one_floor_limit = one_floor_limit
+        self.multi_floor_limit = multi_floor_limit
+
+
+STANDARD_RULE = OccupancyRule()
+HEAVY_RULE = OccupancyRule(one_floor_reducible=False, multi_floor_limit=0.8)
+NO_REDUCTION = OccupancyRule(reducible=False)
+
+# loading type (as entered on the takedown userform) -> rule; other loading types use STANDARD_RULE
+OCCUPANCY_RULES = {
+    "RESIDENTIAL": STANDARD_RULE,
+    "OFFICE": STANDARD_RULE,
+    "RETAIL": STANDARD_RULE,
+    "SCHOOL": STANDARD_RULE,
+    "HOSPITAL": STANDARD_RULE,
+    "STORAGE": HEAVY_RULE,
+    "PARKING": HEAVY_RULE,
+    "GARAGE": HEAVY_RULE,
+    "ASSEMBLY": NO_REDUCTION,
+    "ROOF": NO_REDUCTION,
+}
+
+
+def occupancy_rule(loading_type, live_load=None):
+    """Rule for the loading type; a live load over HEAVY_LIVE_LOAD psf is always heavy."""
+
+    rule = OCCUPANCY_RULES.get(str(loading_type).upper(), STANDARD_RULE)
+    if rule.reducible and live_load is not None and live_load > HEAVY_LIVE_LOAD:
+        return HEAVY_RULE
+    return rule
+
+
+def reduction_factors(area, floors, kinds, rule: OccupancyRule):
+    """Live load reduction factor of each support from its tributary area (ft2), floors carried and kind."""
+
+    element_factor = np.full(len(area), float(ELEMENT_FACTORS["column"]))
+    for kind, factor in ELEMENT_FACTORS.items():
+        element_factor[kinds == kind] = factor
+    influence_area = element_factor * area
+
+    factor = np.where(influence_area >= MIN_INFLUENCE_AREA, 0.25 + 15 / np.sqrt(np.maximum(influence_area, MIN_INFLUENCE_AREA)), 1.0)
+    factor = np.minimum(factor, 1.0)
+
+    # supports carrying any part of a second floor count as multi-floor
+    multi_floor = floors > 1 + 1e-9
+    factor = np.maximum(factor, np.where(multi_floor, rule.multi_floor_limit, rule.one_floor_limit))
+
+    if not rule.reducible:
+        return np.ones(len(area))
+    if not rule.one_floor_reducible:
+        factor[~multi_floor] = 1.0
+    return factor
+
+
+def reduce_live_loads(cumulative: CumulativeTakedown, loading_type, live_load=None, trib_load=TRIB_LOAD):
+    """[(level, array of LLR_DTYPE)] with the unreduced and reduced accumulated LL of every support, from the top down.
+
+    live_load is the unreduced live load in psf, if known (see occupancy_rule).
+    """
+
+    totals = cumulative.evaluate()
+    floors = cumulative.floors()
+    rule = occupancy_rule(loading_type, live_load)
+
+    # every level at once
+    sizes = [len(supports) for supports in cumulative.supports]
+    reduction = np.zeros(sum(sizes), dtype=LLR_DTYPE)
+    reduction["kind"] = np.concatenate([supports.table.column("kind") for supports in cumulative.supports])
+    reduction["id"] = np.concatenate([supports.table.column("id") for supports in cumulative.supports])
+    reduction["area"] = np.concatenate([level_totals[:, 2] for level_totals in totals]) * 1000 / trib_load
+    reduction["floors"] = np.concatenate(floors)
+    reduction["LL"] = np.concatenate([level_totals[:, 1] for level_totals in totals])
+    reduction["factor"] = reduction_factors(reduction["area"], reduction["floors"], reduction["kind"], rule)
+    reduction["LL_reduced"] = reduction["factor"] * reduction["LL"]
+
+    return list(zip(cumulative.levels, np.split(reduction, np.cumsum(sizes)[:-1])))
@@ -0,0 +1,170 @@
+
+# Bulk import of area, line and point loads from a CSV file or an Excel sheet.
+#
+# One load per row, with a header row naming these columns (in any order, names are not case sensitive):
+#   layer       force loading layer name, e.g. "Other Dead Loading"
+#   kind        "area", "line" or "point"
+#   points      "x1 y1; x2 y2; ..." - one point for a point load, two or more for line loads (one line load per
+#               pair of consecutive points, so a polyline of partitions can be one row), three or more for an area load
+#   elevation   load elevation
+#   Fx, Fy, Fz, Mx, My   load values, as in set_load_values (missing or empty cells are 0)
+#
+# Loads with the same kind, elevation and values share one property set: the cad manager's default load of that
+# kind is set once per set and every load of it is then added with a single call each, into whichever layers
+# the rows name. Values are in the model's API units and signs (see run_model.set_api_units).
+
+import csv
+import os
+
+import openpyxl
+
+from ram_concept.line_segment_2D import LineSegment2D
+from ram_concept.model import Model
+from ram_concept.point_2D import Point2D
+from ram_concept.polygon_2D import Polygon2D
+
+from loading_registry import LoadingRegistry
+from profiling import profiler
+
+
+LOAD_FIELDS = ["layer", "kind", "points", "elevation", "Fx", "Fy", "Fz", "Mx", "My"]
+VALUE_FIELDS = ["Fx", "Fy", "Fz", "Mx", "My"]
+
+# load kind -> (default load of the cad manager, fewest points)
+LOAD_KINDS = {
+    "area": ("default_area_load", 3),
+    "line": ("default_line_load", 2),
+    "point": ("default_point_load", 1),
+}
+
+
+class LoadRecord:
+    """One row of a load table: layer name, kind, [(x, y)] points, elevation and (Fx, Fy, Fz, Mx, My)."""
+
+    def __init__(self, layer, kind, points, elevation=0.0, values=(0.0, 0.0, 0.0, 0.0, 0.0)):
+        self.layer = layer
+        self.kind = kind
+        self.points = points
+        self.elevation = elevation
+        self.values = tuple(values)
+
+    def property_set(self):
+        return (self.kind, self.elevation, self.values)
+
+
+def parse_points(text):
+    """[(x, y)] from "x1 y1; x2 y2; ..." (commas may separate the coordinates too)."""
+    points = []
+    for point in str(text).split(";"):
+        if point.strip():
+            x, y = point.replace(",", " ").split()
+            points.append((float(x), float(y)))
+    return points
+
+
+def _number(value):
+    return 0.0 if value is None or str(value).strip() == "" else float(value)
+
+
+def load_record(row, row_number):
+    """LoadRecord from a {field: cell value} row; raises ValueError naming the row when it is not a valid load."""
+
+    kind = str(row.get("kind") or "").strip().lower()
+    if kind not in LOAD_KINDS:
+        raise ValueError("Row " + str(row_number) + ": load kind must be area, line or point, not \"" + str(row.get("kind")) + "\".")
+    try:
+        points = parse_points(row.get("points") or "")
+        elevation = _number(row.get("elevation"))
+        values = [_number(row.get(field)) for field in VALUE_FIELDS]
+    except ValueError:
+        raise ValueError("Row " + str(row_number) + ": points and load values must be numbers.")
+    if len(points) < LOAD_KINDS[kind][1] or (kind == "point" and len(points) > 1):
+        raise ValueError("Row " + str(row_number) + ": wrong number of points for a " + kind + " load.")
+
+    return LoadRecord(str(row.get("layer") or "").strip(), kind, points, elevation, values)
+
+
+def read_rows(path, sheet_name=None):
+    """Every row of a .csv file, or of a sheet of an Excel workbook (the first sheet when sheet_name is not given), as lists of cells."""
+
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="") as file:
+            return list(csv.reader(file))
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name is not None else wb.worksheets[0]
+        return [list(row) for row in ws.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def field_rows(rows, fields):
+    """[(row number, {field: cell})] of every non-blank row below the header row; header names are matched to fields ignoring case."""
+
+    if not rows:
+        return []
+    names = {field.casefold(): field for field in fields}
+    header = [names.get(str(name).strip().casefold()) if name is not None else None for name in rows[0]]
+    return [(row_number, {name: cell for name, cell in zip(header, cells) if name is not None})
+            for row_number, cells in enumerate(rows[1:], 2)
+            if not all(cell is None or str(cell).strip() == "" for cell in cells)]
+
+
+def read_load_table(path, sheet_name=None):
+    """[LoadRecord] of every row of a load table in a .csv file or an Excel workbook."""
+    return [load_record(row, row_number) for row_number, row in field_rows(read_rows(path, sheet_name), LOAD_FIELDS)]
+
+
+def group_loads(records):
+    """{(kind, elevation, values): [LoadRecord]} in first-use order, so each property set is applied once."""
+    groups = {}
+    for record in records:
+        groups.setdefault(record.property_set(), []).append(record)
+    return groups
+
+
+def add_load_records(model: Model, records, registry: LoadingRegistry = None):
+    """Add every load in records to its force loading layer and return the number of loads added.
+
+    Layer names are matched as in the takedown (exactly, or else ignoring case) through registry, which is read
+    from the model when not given. Raises LookupError naming every layer that is not in the model, before any load is added.
+    """
+
+    cad_manager = model.cad_manager
+    if registry is None:
+        registry = LoadingRegistry.from_model(model)
+
+    layer_names = list(dict.fromkeys(record.layer for record in records))
+    layers = dict(zip(layer_names, registry.loadings_named(layer_names)))
+
+    count = 0
+    with profiler.span("add loads"):
+        for (kind, elevation, values), group in group_loads(records).items():
+            # one property set per group, every load of the group then takes it from the default
+            default_load = getattr(cad_manager, LOAD_KINDS[kind][0])
+            default_load.elevation = elevation
+            default_load.set_load_values(*values)
+            profiler.calls(3)
+
+            for record in group:
+                layer = layers[record.layer]
+                points = [Point2D(x, y) for x, y in record.points]
+                if kind == "area":
+                    layer.add_area_load(Polygon2D(points))
+                    count += 1
+                elif kind == "line":
+                    for start_point, end_point in zip(points, points[1:]):
+                        layer.add_line_load(LineSegment2D(start_point, end_point))
+                        count += 1
+                else:
+                    layer.add_point_load(points[0])
+                    count += 1
+        profiler.calls(count)
+
+    return count
+
+
+def import_loads(model: Model, path, sheet_name=None):
+    """Add the loads of a CSV or Excel load table (see read_load_table) to the model; returns the number added."""
+    return add_load_records(model, read_load_table(path, sheet_name))
@@ -0,0 +1,145 @@
+
+# Loading and load combo lookup for a model.
+#
+# A LoadingRegistry reads the loading and load combo layers (and their names and loading types) from the server
+# once; every lookup after that is local. Build one per open model and pass it to get_reactions for every level
+# or request taken from that model.
+
+from ram_concept.model import Model
+
+from profiling import profiler
+
+
+# a loading whose name contains this is taken as the trib loading when no loading has the requested trib name
+TRIB_KEYWORD = "trib"
+
+DEAD_NOT_FOUND = "Dead load combo not found in model."
+LIVE_NOT_FOUND = "Live load combo not found in model."
+TRIB_NOT_FOUND = "Trib load case not found in model."
+
+
+def _index(layers, names):
+    """{name: layer} and {case-folded name: layer}; the first layer wins when names repeat."""
+
+    by_name = {}
+    by_folded_name = {}
+    for layer, name in zip(layers, names):
+        by_name.setdefault(name, layer)
+        by_folded_name.setdefault(name.casefold(), layer)
+    return by_name, by_folded_name
+
+
+class LoadingRegistry:
+    """The loading and load combo layers of one model, indexed by name, case-folded name and loading type/cause."""
+
+    def __init__(self, loadings, load_combos):
+        with profiler.span("loading registry"):
+            self.loadings = list(loadings)
+            self.load_combos = list(load_combos)
+            self.loading_names = [loading.name for loading in self.loadings]
+            self.combo_names = [combo.name for combo in self.load_combos]
+            profiler.calls(len(self.loadings) + len(self.load_combos))
+            self.names = {id(layer): name for layer, name in zip(self.loadings + self.load_combos, self.loading_names + self.combo_names)}
+
+            self.loadings_by_name, self.loadings_by_folded_name = _index(self.loadings, self.loading_names)
+            self.combos_by_name, self.combos_by_folded_name = _index(self.load_combos, self.combo_names)
+
+            self.loadings_by_type = {}
+            self.loadings_by_cause = {}
+            for loading in self.loadings:
+                loading_type = loading.loading_type
+                self.loadings_by_type.setdefault(loading_type, []).append(loading)
+                self.loadings_by_cause.setdefault(loading_type.cause, []).append(loading)
+            profiler.calls(2 * len(self.loadings))
+
+    @classmethod
+    def from_model(cls, model: Model):
+        cad_manager = model.cad_manager
+        with profiler.span("loading lists"):
+            loadings = cad_manager.force_loading_layers
+            load_combos = cad_manager.load_combo_layers
+            profiler.calls(2)
+        return cls(loadings, load_combos)
+
+    def loading(self, name):
+        """The loading named name, matched exactly or else ignoring case; None if there is none."""
+        if name in self.loadings_by_name:
+            return self.loadings_by_name[name]
+        return self.loadings_by_folded_name.get(str(name).casefold())
+
+    def combo(self, name):
+        """The load combo named name, matched exactly or else ignoring case; None if there is none."""
+        if name in self.combos_by_name:
+            return self.combos_by_name[name]
+        return self.combos_by_folded_name.get(str(name).casefold())
+
+    def name(self, layer):
+        """Name of a loading or load combo of this registry, without asking the server."""
+        return self.names[id(layer)]
+
+    def trib_loading(self, name):
+        """The loading named name, or else the first loading with TRIB_KEYWORD in its name; None if there is none."""
+
+        loading = self.loading(name)
+        if loading is not None:
+            return loading
+        for loading, loading_name in zip(self.loadings, self.loading_names):
+            if TRIB_KEYWORD in loading_name.casefold():
+                return loading
+        return None
+
+    def of_type(self, loading_type):
+        return self.loadings_by_type.get(loading_type, [])
+
+    def of_cause(self, cause):
+        return self.loadings_by_cause.get(cause, [])
+
+    def loadings_named(self, names):
+        """The loadings with the given names, in order. Raises LookupError naming every loading that is missing."""
+
+        missing = [name for name in names if self.loading(name) is None]
+        if missing:
+            raise LookupError(" ".join("Loading " + name + " not found in model." for name in missing))
+        return [self.loading(name) for name in names]
+
+    def model_factors(self, combo_factors):
+        """combo_factors ({combo name: {loading name: factor}}) with every loading spelled as in the model.
+
+        Loadings are matched ignoring case like everywhere else, but the reactions fetched for them are labelled
+        with the model's names, so the factors must use those too. Factors of two spellings of one loading are added.
+        Raises LookupError naming every loading that is missing, as loadings_named does.
+        """
+
+        names = list(dict.fromkeys(name for factors in combo_factors.values() for name in factors))
+        model_names = {name: self.name(loading) for name, loading in zip(names, self.loadings_named(names))}
+
+        renamed = {}
+        for combo_name, factors in combo_factors.items():
+            renamed[combo_name] = {}
+            for name, factor in factors.items():
+                renamed[combo_name][model_names[name]] = renamed[combo_name].get(model_names[name], 0.0) + factor
+        return renamed
+
+    def resolve(self, name_DL, name_LL, name_trib, combos_needed=True, trib_needed=True):
+        """(dead combo, live combo, trib loading) for the takedown.
+
+        The dead and live combos are None when combos_needed is False (DL and LL combined locally),
+        the trib loading when trib_needed is False (tributary areas calculated locally).
+        Raises LookupError with the "... not found in model." message of everything missing, all at once.
+        """
+
+        combo_dead = self.combo(name_DL) if combos_needed else None
+        combo_live = self.combo(name_LL) if combos_needed else None
+        combo_trib = self.trib_loading(name_trib) if trib_needed else None
+
+        missing = []
+        if combos_needed and combo_dead is None:
+            missing.append(DEAD_NOT_FOUND)
+        if combos_needed and combo_live is None:
+            missing.append(LIVE_NOT_FOUND)
+        if trib_needed and combo_trib is None:
+            missing.append(TRIB_NOT_FOUND)
+        if missing:
+            raise LookupError(" ".join(missing))
+
+        return combo_dead, combo_live, combo_trib
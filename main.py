@@ -20,18 +20,27 @@ if(os.environ.get("RAM_CONCEPT_DEVELOPER") != None):
 from pathlib import Path
 
 # RAM Concept API imports
-from ram_concept.concept import Concept
 from ram_concept.model import DesignCode
 from ram_concept.model import Model
 from ram_concept.model import StructureType
 
 # Walkthrough imports
+from api_replay import close_recordings
+from api_replay import start_concept
 from add_loads import add_loads
 from add_materials import add_materials
 from add_pt import add_pt
 from add_structure import add_structure
-from get_reactions import get_reactions
-from get_tendon_profiles import get_tendon_profiles
+from get_reactions import get_settings
+from profiling import enable_profiling
+from profiling import profiler
+from profiling import write_profile
+from run_model import format_takedown
+from run_model import print_row
+from run_model import run_model
+from takedown_cache import TakedownCache
+from takedown_output import write_takedown
+from write_excel import write_levels
 
 
 run_from_VBA = False
@@ -45,6 +54,7 @@ if run_from_VBA:
     #print(generate_mesh)
 else:    
     ## for debugging without VBA
+    workbook_path = "H:\Internal Innovation\RAM to Takedown\Run Python from VBA_20230402_save userform values.xlsm"
     model_path = "H:\Internal Innovation\03. RAM to Takedown\RAM Models\Dining Hall 2.cpt"
     #model_path = "H:\Internal Innovation\RAM to Takedown\RAM\D4 L5 update_added ladder platform_SCK_NMS_BKM_Deflection Plot.cpt"
     #model_path = "H:\Internal Innovation\RAM to Takedown\RAM\_221338_20221121_P1 TAKEDOWN_SDB_RWR.cpt"
@@ -60,97 +70,107 @@ else:
 # SET include_pt BELOW TO False TO AVOID USING A PT LICENSE
 include_pt = False
 
-# STARTUP RAM CONCEPT AND CREATE A FILE
+# SET tendon_format BELOW TO "csv" OR "npy" TO WRITE THE TENDON PROFILES NEXT TO THE MODEL INSTEAD OF PRINTING THEM
+# (see tendon_output.py for the columns of both formats)
+tendon_format = None
 
-# The first thing to do is always to start a RAM Concept process to act as a server.
-# In production, you will normally want to use a headless server, but for debugging you might want to run RAM Concept with a GUI.
-#concept = Concept.start_concept(headless=True)
-concept = Concept.start_concept(headless=False)
+# SET tendon_tolerance BELOW TO AN ELEVATION TOLERANCE (API UNITS) TO REPORT ONLY THE TENDON POINTS NEEDED TO FOLLOW EACH PROFILE
+# WITHIN IT, INSTEAD OF THE 10TH POINTS (see get_tendon_profiles.py)
+tendon_tolerance = None
 
-# You'll either want to open a file or create a new one.
-#model = concept.new_model()
-model = concept.open_file(model_path)
+# SET local_combos BELOW TO COMBINE DL AND LL FROM THE BASE LOADINGS INSTEAD OF THE MODEL'S LOAD COMBOS
+# (one batch of reaction queries for any number of combos, see combo_engine.py)
+#local_combos = {"DL": {"Self-Dead Loading": 1.0, "Other Dead Loading": 1.0}, "LL": {"Live (Reducible) Loading": 1.0}}
+local_combos = None
 
-# If this is a new file/model, you will want to initialize it for the desired code, structure type and unit system.
-# The bare-bones file/model created by new_model() is extremely minimal (almost useless)
-#model.setup_new_model(DesignCode.ACI318_14SI, StructureType.ELEVATED)
+# SET stream_rows BELOW TO True TO PRINT EACH ROW ON ITS OWN LINE AS SOON AS IT IS READ
+# (VBA can start filling the sheet before the model is saved and RAM Concept shuts down)
+stream_rows = False
 
-# SETUP / SAVE UNITS AND SIGNS
+# SET output_format BELOW TO "csv" OR "npy" TO WRITE THE TAKEDOWN NEXT TO THE MODEL AND PRINT THE FILE PATH INSTEAD
+# (see takedown_output.py for the columns of both formats)
+# OR TO "workbook" TO WRITE IT STRAIGHT INTO THE AutoTD SHEET (the workbook must be closed in Excel, so not when run from its
+# own macro; a message is printed instead when it is open, see write_excel.py)
+output_format = "string"
 
-# Set the units to something appropriate for the user (if this was an existing file you would assume the units are ok)
-units = model.units
-#units.set_SI_user_units()
+# SET shard_workers BELOW TO 2 OR MORE TO READ THE REACTIONS OF A LARGE LEVEL WITH THAT MANY EXTRA RAM CONCEPT SERVERS AT ONCE
+# (each takes a license seat; levels with few supports still use one server, see sharded_reactions.py)
+shard_workers = 1
 
-# Save the units, as you are about to change them and want to restore them before saving the file
-saved_units = units.get_units() 
+# SET profile_path BELOW TO A FILE PATH TO WRITE A JSON TIMING REPORT OF THIS RUN (or set the RAM2TD_PROFILE environment variable)
+profile_path = None
+if profile_path is not None:
+    enable_profiling()
 
-# Set the units to something predictable for the API (the API uses the same units as the UI)
-units.set_US_API_units() # meters, degrees, Newtons, kilograms, seconds, Celsius
+# CHECK THE TAKEDOWN CACHE
 
-# Set the signs to something appropriate for the user (if this was an existing file you would assume the units are ok)
-signs = model.signs
-#signs.set_standard_signs()
+# a level that has not changed since it was last taken down with the same settings is answered without RAM Concept
+settings = get_settings()
+takedown_cache = TakedownCache()
+takedown_tbl = None
+streamed = False
+if not generate_mesh and not include_pt:
+    with profiler.span("cache lookup"):
+        takedown_tbl = takedown_cache.get(model_path, settings, local_combos)
 
-# Save the signs, as you are about to change them and want to restore them before saving the file
-saved_signs = signs.get_signs()
+if takedown_tbl is None:
 
-# Set the signs to somethign predictable for the API (the API uses the same units as the UI)
-signs.set_positive_signs()
+    # STARTUP RAM CONCEPT AND CREATE A FILE
 
-# XXXXXXXXXXXX INTERESTING WORK STARTS HERE XXXXXXXXXXXXXXXX
+    # The first thing to do is always to start a RAM Concept process to act as a server.
+    # In production, you will normally want to use a headless server, but for debugging you might want to run RAM Concept with a GUI.
+    # (api_replay.start_concept records or replays the API calls when RAM2TD_RECORD / RAM2TD_REPLAY is set)
+    #concept = Concept.start_concept(headless=True)
+    with profiler.span("start-up"):
+        concept = start_concept(headless=False)
 
- # The structure created is a simple 16m x 16m square, with 8m spans:
+    # XXXXXXXXXXXX INTERESTING WORK STARTS HERE XXXXXXXXXXXXXXXX
 
- #  cbbbbbbbcbbbbbbbc
-#  |               |
-#  |               |
-#  w       c       w
-#  w               w
-#  w               w
-#  wwwwwwwwwwwwwwwww
+    # The structure created is a simple 16m x 16m square, with 8m spans:
 
- # add_materials(model)
-# add_structure(model)
-# add_loads(model)
-# if include_pt:
-#     add_pt(model)
+    #  cbbbbbbbcbbbbbbbc
+    #  |               |
+    #  |               |
+    #  w       c       w
+    #  w               w
+    #  w               w
+    #  wwwwwwwwwwwwwwwww
 
-if generate_mesh == True:
-    model.generate_mesh()
+    # add_materials(model)
+    # add_structure(model)
+    # add_loads(model)
+    # if include_pt:
+    #     add_pt(model)
 
-model.calc_all()
+    # open, analyse, take down and save the model (see run_model.py)
+    takedown_tbl = run_model(concept, model_path, generate_mesh, include_pt, settings, local_combos, on_row=print_row if stream_rows else None, labels=True, shard_workers=shard_workers, tendon_format=tendon_format, tendon_tolerance=tendon_tolerance)
+    streamed = stream_rows
 
-takedown_tbl = get_reactions(model)
+    # XXXXXXXXXXXX INTERESTING WORK ENDS HERE XXXXXXXXXXXXXXXX
 
-if include_pt:
-    get_tendon_profiles(model)
+    # SHUT DOWN RAM CONCEPT
 
-# XXXXXXXXXXXX INTERESTING WORK ENDS HERE XXXXXXXXXXXXXXXX
+    with profiler.span("shutdown"):
+        concept.shut_down()
+    close_recordings()
 
-# RESTORE THE UNITS AND SIGNS
-
-# restore the units to the initial user-friendly units
-units.set_units(saved_units)
-
-# restore the signs to the initial user-friendly signs
-signs.set_signs(saved_signs)
-
-# SAVE THE FILE
-
-model.save_file(model_path)
-
-# SHUT DOWN RAM CONCEPT
-
-concept.shut_down()
+    takedown_cache.put(model_path, settings, takedown_tbl, local_combos)
 
 # Print for VBA to read
-if 'not found' in takedown_tbl:
-    print(takedown_tbl)
+if output_format == "workbook" and type(takedown_tbl) != str:
+    try:
+        write_levels(workbook_path, [(int(settings["start_level"]), takedown_tbl)], settings["loading_type"])
+        print(workbook_path)
+    except PermissionError as error:
+        print(error)
+elif output_format != "string" and type(takedown_tbl) != str:
+    print(write_takedown(model_path, takedown_tbl, output_format))
+elif stream_rows and type(takedown_tbl) != str:
+    # rows already printed one per line while they were read, unless they came from the cache
+    if not streamed:
+        for row in takedown_tbl:
+            print_row(row)
 else:
-    output = ""
-    for sublist in takedown_tbl:
-        output += ','.join(map(str, sublist)) + ';'
-    output = output[:-1]        # Remove last ;
-    print(output)
-
+    print(format_takedown(takedown_tbl))
 
+write_profile(profile_path)
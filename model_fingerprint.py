@@ -0,0 +1,111 @@
+
+# Fingerprints of a model file and its input, kept in a sidecar next to the model.
+# They let the takedown skip generate_mesh/calc_all/save_file when a level is re-imported without changes.
+
+import enum
+import hashlib
+import json
+import os
+
+from ram_concept.model import Model
+
+
+# properties hashed for each kind of entity; anything missing on an entity is simply skipped
+STRUCTURE_PROPERTIES = {
+    "slab_areas": ["location", "thickness", "toc", "behavior", "priority", "r_axis"],
+    "beams": ["location", "thickness", "toc", "width", "behavior", "priority", "mesh_as_slab"],
+    "columns": ["location", "b", "d", "height", "angle", "below_slab", "compressible", "fixed_near", "fixed_far", "roller"],
+    "walls": ["location", "thickness", "height", "below_slab", "compressible", "fixed_near", "fixed_far", "shear_wall"],
+}
+LOAD_PROPERTIES = {
+    "area_loads": ["location", "elevation", "Fx", "Fy", "Fz", "Mx", "My"],
+    "line_loads": ["location", "elevation", "Fx", "Fy", "Fz", "Mx", "My"],
+    "point_loads": ["location", "elevation", "Fx", "Fy", "Fz", "Mx", "My"],
+}
+
+
+def file_hash(path):
+    """sha256 of the file contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _value(value):
+    """Plain JSON-able version of a property value (points, segments and polygons become coordinate lists)."""
+
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    if isinstance(value, enum.Enum):
+        return value.name
+    if hasattr(value, "points"):
+        return [_value(point) for point in value.points]
+    if hasattr(value, "start_point"):
+        return [_value(value.start_point), _value(value.end_point)]
+    if hasattr(value, "x"):
+        return [value.x, value.y, getattr(value, "z", None)]
+    if hasattr(value, "name"):
+        return value.name
+    return str(value)
+
+
+def _describe(entities, properties):
+    return [[_value(getattr(entity, name, None)) for name in properties] for entity in entities]
+
+
+def content_hash(model: Model):
+    """Hash of the structure layer and force loading layer contents of the model, used to key the element table cache.
+
+    Load combination factors, analysis options, slab openings and springs are not included, so it cannot tell
+    on its own whether the results are current.
+    """
+
+    cad_manager = model.cad_manager
+    structure_layer = cad_manager.structure_layer
+
+    contents = {}
+    for kind, properties in STRUCTURE_PROPERTIES.items():
+        contents[kind] = _describe(getattr(structure_layer, kind, []), properties)
+
+    for loading in cad_manager.force_loading_layers:
+        contents[loading.name] = {kind: _describe(getattr(loading, kind, []), properties) for kind, properties in LOAD_PROPERTIES.items()}
+
+    data = json.dumps(contents, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def fingerprint_path(model_path):
+    return os.path.splitext(model_path)[0] + ".fingerprint.json"
+
+
+def load_fingerprint(model_path):
+    """The fingerprint recorded after the last analysed save of model_path, or None."""
+    try:
+        with open(fingerprint_path(model_path), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_fingerprint(model_path, model_hash):
+    """Record that model_path was just saved with current results for the given content hash."""
+    with open(fingerprint_path(model_path), "w") as file:
+        json.dump({"file_hash": file_hash(model_path), "content_hash": model_hash}, file)
+
+
+def results_current(model: Model, model_path, file_hash_before):
+    """Check whether the open model still has the results of the last analysed save.
+
+    file_hash_before is the hash of the file taken before it was opened. Returns (current, content hash).
+    Results are only current when the file is byte for byte the one last saved with them: any save since
+    (e.g. of combo factors or analysis options edited in the GUI) needs a new analysis. The content hash is
+    only recomputed when the file changed.
+    """
+
+    fingerprint = load_fingerprint(model_path)
+    if fingerprint is not None and fingerprint.get("file_hash") == file_hash_before and "content_hash" in fingerprint:
+        return True, fingerprint["content_hash"]
+
+    return False, content_hash(model)
@@ -0,0 +1,99 @@
+
+# Per-phase timing of takedown runs.
+#
+# Set the RAM2TD_PROFILE environment variable to a file path (or set profile_path in main.py) and a JSON report
+# with the time spent and the number of RAM Concept server calls made in each named span is written there.
+# When profiling is off, spans and call counts cost next to nothing.
+#
+# Server calls are measured when a call counter is attached (api_replay.start_concept attaches one: a counting proxy
+# around the Concept, or the replayed call count). Otherwise the report falls back to the counts each module
+# declares with profiler.calls(), which are estimates, and says so in its "call_counts" field.
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+PROFILE_ENVIRONMENT_VARIABLE = "RAM2TD_PROFILE"
+
+
+class Profiler:
+    """Named spans with their total time, number of entries and number of server calls.
+
+    Spans can be nested; server calls are counted against the innermost open span.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {}
+        self.open_spans = []
+        self.start_time = time.perf_counter()
+        self.counter = None
+        self.counted = 0
+
+    def count_calls(self, counter):
+        """Measure server calls with counter, a function returning the number of calls made so far."""
+        self.counter = counter
+        self.counted = counter()
+
+    def _take_counted(self):
+        """Give the calls measured since the last span entry or exit to the innermost open span."""
+        if self.counter is not None:
+            now = self.counter()
+            if self.open_spans:
+                self.open_spans[-1]["calls"] += now - self.counted
+            self.counted = now
+
+    def _span_totals(self, name):
+        if name not in self.spans:
+            self.spans[name] = {"seconds": 0.0, "entries": 0, "calls": 0}
+        return self.spans[name]
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        totals = self._span_totals(name)
+        self._take_counted()
+        self.open_spans.append(totals)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            totals["seconds"] += time.perf_counter() - start
+            totals["entries"] += 1
+            self._take_counted()
+            self.open_spans.pop()
+
+    def calls(self, count=1):
+        """Declare server calls made in the innermost open span; only used when no call counter is attached."""
+        if self.enabled and self.open_spans and self.counter is None:
+            self.open_spans[-1]["calls"] += count
+
+    def report(self):
+        return {"total_seconds": time.perf_counter() - self.start_time,
+                "call_counts": "estimated" if self.counter is None else "measured",
+                "spans": [dict(name=name, **totals) for name, totals in self.spans.items()]}
+
+    def write(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+
+# the profiler shared by all the takedown modules
+profiler = Profiler(enabled=os.environ.get(PROFILE_ENVIRONMENT_VARIABLE) is not None)
+
+
+def enable_profiling():
+    profiler.enabled = True
+
+
+def write_profile(path=None):
+    """Write the report to path (or to the RAM2TD_PROFILE path) if profiling is on."""
+
+    path = path or os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    if profiler.enabled and path:
+        profiler.write(path)
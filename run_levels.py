@@ -0,0 +1,160 @@
+
+# Runs the takedown for several level models at once.
+# Each worker process owns its own headless RAM Concept server, so the number of workers is capped by MAX_WORKERS
+# to stay within the available license seats.
+# Workers still running after the run's deadline (e.g. stuck on a license dialog) are stopped, and their levels
+# are reported as not finished.
+
+import math
+import multiprocessing
+import queue
+import sys
+import time
+
+# Takedown imports
+from api_replay import close_recordings
+from api_replay import start_concept
+from get_reactions import get_settings
+from run_model import format_takedown
+from run_model import run_model
+from write_excel import write_levels
+
+
+# maximum number of RAM Concept servers running at the same time
+MAX_WORKERS = 2
+
+# seconds allowed per level a worker takes down (the run's deadline is this times the levels per worker)
+LEVEL_TIMEOUT = 30 * 60
+
+# seconds a worker is given to shut its server down once its levels are done
+SHUTDOWN_TIMEOUT = 60
+
+
+def level_models(start_level, end_level, model_path_pattern):
+    """[(level, model path)] for start_level..end_level, where "{level}" in model_path_pattern is replaced by the level."""
+    return [(level, model_path_pattern.format(level=level)) for level in range(int(start_level), int(end_level) + 1)]
+
+
+def _worker(task_queue, result_queue, settings, generate_mesh, include_pt, local_combos, headless):
+    """Start a RAM Concept server and take down levels from task_queue until it hands out None."""
+
+    concept = start_concept(headless=headless)
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            index, level, model_path = task
+            level_settings = dict(settings, start_level=level, end_level=level, model_filepath=model_path)
+            try:
+                takedown_tbl = run_model(concept, model_path, generate_mesh, include_pt, level_settings, local_combos)
+            except Exception as error:
+                takedown_tbl = "Level " + str(level) + " failed: " + str(error)
+            result_queue.put((index, level, takedown_tbl))
+    finally:
+        concept.shut_down()
+        close_recordings()
+
+
+def run_levels(level_models, settings=None, max_workers=MAX_WORKERS, generate_mesh=False, include_pt=False, local_combos=None, headless=True, level_timeout=LEVEL_TIMEOUT):
+    """Take down every (level, model path) in level_models in parallel.
+
+    Returns [(level, takedown list)] in the order of level_models. A level that could not be processed
+    gets a message string instead of its takedown list, the same way a missing combo does.
+    The run stops waiting level_timeout seconds per level per worker after it starts (None waits for ever);
+    workers still running then are terminated and their unfinished levels say so.
+    """
+
+    if settings is None:
+        settings = get_settings()
+
+    task_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+
+    for index, (level, model_path) in enumerate(level_models):
+        task_queue.put((index, level, model_path))
+
+    num_workers = max(1, min(max_workers, len(level_models)))
+    for i in range(num_workers):
+        task_queue.put(None)
+
+    workers = [multiprocessing.Process(target=_worker, args=(task_queue, result_queue, settings, generate_mesh, include_pt, local_combos, headless))
+               for i in range(num_workers)]
+    for worker in workers:
+        worker.start()
+
+    timeout = None if level_timeout is None else level_timeout * math.ceil(len(level_models) / num_workers)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    timed_out = False
+
+    results = [None] * len(level_models)
+    remaining = len(level_models)
+    while remaining > 0:
+        if deadline is not None and time.monotonic() > deadline:
+            timed_out = True
+            break
+        try:
+            index, level, takedown_tbl = result_queue.get(timeout=1)
+        except queue.Empty:
+            # stop waiting if every server has gone (e.g. no license seat was available)
+            if not any(worker.is_alive() for worker in workers) and result_queue.empty():
+                break
+            continue
+        results[index] = (level, takedown_tbl)
+        remaining -= 1
+
+    if timed_out:
+        stop_workers(workers, 0)
+    else:
+        stop_workers(workers, None if deadline is None else max(SHUTDOWN_TIMEOUT, deadline - time.monotonic()))
+
+    for index, (level, model_path) in enumerate(level_models):
+        if results[index] is None:
+            if timed_out:
+                results[index] = (level, "Level " + str(level) + " failed: not finished within " + str(timeout) + " s, its RAM Concept worker was stopped.")
+            else:
+                results[index] = (level, "Level " + str(level) + " failed: RAM Concept worker stopped.")
+
+    return results
+
+
+def stop_workers(processes, timeout):
+    """Wait up to timeout seconds in all (None waits for ever, 0 not at all) for the processes to end, then terminate any still running."""
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for process in processes:
+        process.join(None if deadline is None else max(0, deadline - time.monotonic()))
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+def format_levels(results):
+    """One "level|x,y,DL,LL,H,b,d,Trib;..." line per level, in level order."""
+    return "\n".join(str(level) + "|" + format_takedown(takedown_tbl) for level, takedown_tbl in results)
+
+
+if __name__ == "__main__":
+    # same arguments as main.py when run from VBA, the debugging settings without them
+    settings = get_settings(sys.argv) if len(sys.argv) > 9 else get_settings()
+
+    # the userform model path names the level models with "{level}", e.g. "...\Tower L{level}.cpt"
+    generate_mesh = len(sys.argv) > 10 and "True" in sys.argv[10]
+    max_workers = int(sys.argv[11]) if len(sys.argv) > 11 else MAX_WORKERS
+    write_workbook = len(sys.argv) > 12 and sys.argv[12] == "workbook"
+
+    models = level_models(settings["start_level"], settings["end_level"], settings["model_filepath"])
+    results = run_levels(models, settings, max_workers, generate_mesh)
+
+    # Print for VBA to read
+    if write_workbook:
+        # every level goes into the workbook with one open and one save; only problems are printed
+        try:
+            messages = write_levels(sys.argv[1], results, settings["loading_type"])
+        except PermissionError as error:
+            messages = [str(error)]
+        print("\n".join(messages))
+    else:
+        print(format_levels(results))
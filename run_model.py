@@ -0,0 +1,159 @@
+
+# RAM Concept API imports
+from ram_concept.concept import Concept
+from ram_concept.model import Model
+
+# Takedown imports
+from element_table import get_element_table
+from get_reactions import get_reactions
+from get_reactions import get_takedown_table
+from get_tendon_profiles import get_tendon_profiles
+from model_fingerprint import file_hash
+from model_fingerprint import results_current
+from model_fingerprint import save_fingerprint
+from profiling import profiler
+from sharded_reactions import get_sharded_takedown_table
+from tendon_output import write_tendon_profiles
+
+import os
+
+
+def element_table_path(model_path):
+    """Sidecar file that keeps the element table of model_path between runs."""
+    return os.path.splitext(model_path)[0] + ".elements.json"
+
+
+def set_api_units(model: Model):
+    """Switch the model to the units and signs the takedown expects and return the user's units and signs."""
+
+    # Set the units to something appropriate for the user (if this was an existing file you would assume the units are ok)
+    units = model.units
+    #units.set_SI_user_units()
+
+    # Save the units, as you are about to change them and want to restore them before saving the file
+    saved_units = units.get_units()
+
+    # Set the units to something predictable for the API (the API uses the same units as the UI)
+    units.set_US_API_units() # meters, degrees, Newtons, kilograms, seconds, Celsius
+
+    # Set the signs to something appropriate for the user (if this was an existing file you would assume the units are ok)
+    signs = model.signs
+    #signs.set_standard_signs()
+
+    # Save the signs, as you are about to change them and want to restore them before saving the file
+    saved_signs = signs.get_signs()
+
+    # Set the signs to somethign predictable for the API (the API uses the same units as the UI)
+    signs.set_positive_signs()
+
+    return saved_units, saved_signs
+
+
+def restore_user_units(model: Model, saved_units, saved_signs):
+    """Put back the units and signs returned by set_api_units (before saving the file)."""
+
+    # restore the units to the initial user-friendly units
+    model.units.set_units(saved_units)
+
+    # restore the signs to the initial user-friendly signs
+    model.signs.set_signs(saved_signs)
+
+
+def run_model(concept: Concept, model_path, generate_mesh=False, include_pt=False, settings=None, local_combos=None, force=False, on_row=None, labels=False, shard_workers=1, tendon_format=None, tendon_tolerance=None):
+    """Open, analyse and save model_path in the running concept and return its takedown list.
+
+    Meshing, analysis and the save are skipped when the model has not changed since its last analysed save
+    (see model_fingerprint.py), unless force is set. on_row and labels are passed to get_reactions
+    (to stream rows before the save, and to add the kind/id of each row).
+    With shard_workers above 1 the reactions of a large level are read by that many extra servers at once
+    (see sharded_reactions.py); streamed rows are always read by this server.
+    With include_pt the tendon profiles are printed, or with tendon_format ("csv" or "npy") written next to the model
+    instead (see tendon_output.py); tendon_tolerance samples them adaptively (see get_tendon_profiles.simplify_profiles).
+    The return value is a list of rows when streaming, otherwise a TakedownTable (see takedown_table.py), which is
+    used the same way; it is a "not found" message instead when a combo is missing.
+    """
+
+    # hash the file before RAM Concept touches it
+    file_hash_before = file_hash(model_path)
+
+    # You'll either want to open a file or create a new one.
+    #model = concept.new_model()
+    with profiler.span("open_file"):
+        model = concept.open_file(model_path)
+        profiler.calls()
+
+    # If this is a new file/model, you will want to initialize it for the desired code, structure type and unit system.
+    # The bare-bones file/model created by new_model() is extremely minimal (almost useless)
+    #model.setup_new_model(DesignCode.ACI318_14SI, StructureType.ELEVATED)
+
+    saved_units, saved_signs = set_api_units(model)
+
+    # XXXXXXXXXXXX INTERESTING WORK STARTS HERE XXXXXXXXXXXXXXXX
+
+    # results are current when the file is the one last saved with them
+    with profiler.span("fingerprint"):
+        current, model_hash = results_current(model, model_path, file_hash_before)
+    if force:
+        current = False
+
+    if not current:
+        if generate_mesh == True:
+            with profiler.span("generate_mesh"):
+                model.generate_mesh()
+                profiler.calls()
+
+        with profiler.span("calc_all"):
+            model.calc_all()
+            profiler.calls()
+
+    # element properties are snapshotted next to the model and reused while the mesh is unchanged
+    element_table = get_element_table(model.cad_manager.element_layer, cache_path=element_table_path(model_path), mesh_key=model_hash, refresh=generate_mesh and not current)
+
+    # rows are only built one at a time when they are streamed, otherwise the takedown is built as one table
+    if on_row is not None:
+        takedown_tbl = get_reactions(model, element_table, local_combos, settings, on_row, labels)
+    elif shard_workers > 1:
+        takedown_tbl = get_sharded_takedown_table(model, element_table, local_combos, settings, labels, workers=shard_workers)
+    else:
+        takedown_tbl = get_takedown_table(model, element_table, local_combos, settings, labels)
+
+    if include_pt:
+        with profiler.span("tendon profiles"):
+            profiles = get_tendon_profiles(model, report=tendon_format is None, tolerance=tendon_tolerance)
+            if tendon_format is not None:
+                write_tendon_profiles(model_path, profiles, tendon_format)
+
+    # XXXXXXXXXXXX INTERESTING WORK ENDS HERE XXXXXXXXXXXXXXXX
+
+    restore_user_units(model, saved_units, saved_signs)
+
+    # SAVE THE FILE (only if it was analysed, otherwise nothing changed)
+
+    if not current:
+        with profiler.span("save"):
+            model.save_file(model_path)
+            profiler.calls()
+            save_fingerprint(model_path, model_hash)
+
+    return takedown_tbl
+
+
+
+def format_takedown(takedown_tbl):
+    """The takedown list as the "x,y,DL,LL,H,b,d,Trib;..." string VBA reads (a "not found" message is passed through)."""
+
+    if isinstance(takedown_tbl, str):
+        return takedown_tbl
+
+    # one join, so large models format in linear time
+    return ';'.join(format_row(sublist) for sublist in takedown_tbl)
+
+
+def format_row(row):
+    """One takedown row as "x,y,DL,LL,H,b,d,Trib" (any kind/id labels are left off)."""
+    return ','.join(map(str, row[:8]))
+
+
+def print_row(row):
+    """Print one takedown row on its own line straight away, for VBA to read while the run continues."""
+    print(format_row(row), flush=True)
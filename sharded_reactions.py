@@ -0,0 +1,236 @@
+
+# Sharded reaction extraction: the reactions of one large level read by several RAM Concept servers at once.
+#
+# The analysed model is saved to a temporary folder and copied once per worker; each worker process starts its own
+# headless server, opens its copy (never saved) and reads the reactions of shards of the column elements and wall
+# element groups. The shards are contiguous runs of the element layer's order, so putting them back together
+# gives the same takedown as get_reactions.get_takedown_table, row for row.
+#
+# Every worker takes a license seat, like the run_levels.py workers. A shard that no worker returns (e.g. no seat
+# was available, or the workers were stopped at the deadline) is read by the calling process's own server instead,
+# and reported on stderr.
+
+import math
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ram_concept.model import Model
+
+from api_replay import close_recordings
+from api_replay import start_concept
+from combo_engine import TRIB_COMBO
+from combo_engine import BaseReactions
+from combo_engine import evaluate_combos
+from combo_engine import fetch_base_reactions
+from combo_engine import referenced_loadings
+from element_table import ElementTable
+from get_reactions import get_takedown_table
+from get_reactions import prepare_takedown
+from get_reactions import takedown_columns
+from get_reactions import walls_within_height
+from loading_registry import LoadingRegistry
+from profiling import profiler
+from trib_area import local_trib_reactions
+
+
+# maximum number of extra RAM Concept servers for one level
+MAX_SHARD_WORKERS = 4
+
+# smallest number of supports worth starting another server for
+MIN_SHARD_SUPPORTS = 500
+
+# shards handed out per worker, so a slow server holds back less of the level
+SHARDS_PER_WORKER = 4
+
+# seconds allowed per shard a worker reads (the deadline is this times the shards per worker, plus start-up)
+SHARD_TIMEOUT = 5 * 60
+START_UP_TIMEOUT = 5 * 60
+
+# seconds a worker is given to shut its server down once its shards are done
+SHUTDOWN_TIMEOUT = 60
+
+COMBO = "combo"
+LOADING = "loading"
+
+
+def shard_ranges(count, shards):
+    """[(start, stop)] splitting range(count) into shards contiguous runs of near-equal length."""
+    bounds = np.linspace(0, count, shards + 1).round().astype(int).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _layer_names(registry: LoadingRegistry, layers):
+    """[(COMBO or LOADING, name)] of loadings or load combos of registry, so a worker can find them in its copy."""
+    combo_ids = {id(combo) for combo in registry.load_combos}
+    return [(COMBO if id(layer) in combo_ids else LOADING, registry.name(layer)) for layer in layers]
+
+
+def _shard_worker(task_queue, result_queue, model_path, layer_names, headless):
+    """Start a RAM Concept server, open model_path and read the reactions of shards from task_queue until it hands out None."""
+
+    concept = start_concept(headless=headless)
+    try:
+        model = concept.open_file(model_path)
+        registry = LoadingRegistry.from_model(model)
+        layers = [registry.combo(name) if kind == COMBO else registry.loading(name) for kind, name in layer_names]
+
+        element_layer = model.cad_manager.element_layer
+        column_elements = element_layer.column_elements_below
+        wall_groups = element_layer.wall_element_groups_below
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            index, (column_start, column_stop), wall_indices = task
+            base = fetch_base_reactions(layers, column_elements[column_start:column_stop], [wall_groups[i] for i in wall_indices])
+            result_queue.put((index, base.column_reactions, base.wall_reactions))
+    finally:
+        concept.shut_down()
+        close_recordings()
+
+
+def fetch_sharded_reactions(model: Model, registry: LoadingRegistry, layers, column_elements, wall_groups, wall_indices, workers=MAX_SHARD_WORKERS, headless=True, shard_timeout=SHARD_TIMEOUT):
+    """BaseReactions (see combo_engine.py) of the loadings or load combos in layers, for every column element
+    and the wall element groups wall_indices, read by workers servers at once.
+
+    The model must be analysed and have the API units set (as run_model does); the copies are saved with them.
+    Workers still running START_UP_TIMEOUT plus shard_timeout seconds per shard per worker after they start
+    (None waits for ever) are terminated, and the shards they did not return are read here.
+    """
+
+    column_ranges = shard_ranges(len(column_elements), workers * SHARDS_PER_WORKER)
+    wall_ranges = shard_ranges(len(wall_indices), workers * SHARDS_PER_WORKER)
+    tasks = [(index, column_range, wall_indices[wall_start:wall_stop]) for index, (column_range, (wall_start, wall_stop)) in enumerate(zip(column_ranges, wall_ranges))]
+
+    column_reactions = np.zeros((len(column_elements), len(layers), 6))
+    wall_reactions = np.zeros((len(wall_indices), len(layers), 6))
+    done = [False] * len(tasks)
+
+    folder = tempfile.mkdtemp(prefix="ram2td_shards_")
+    try:
+        with profiler.span("shard copies"):
+            model_copy = os.path.join(folder, "level.cpt")
+            model.save_file(model_copy)
+            profiler.calls()
+            model_copies = [model_copy] + [shutil.copyfile(model_copy, os.path.join(folder, "level " + str(i) + ".cpt")) for i in range(1, workers)]
+
+        task_queue = multiprocessing.Queue()
+        result_queue = multiprocessing.Queue()
+        for task in tasks:
+            task_queue.put(task)
+        for i in range(workers):
+            task_queue.put(None)
+
+        layer_names = _layer_names(registry, layers)
+        processes = [multiprocessing.Process(target=_shard_worker, args=(task_queue, result_queue, model_copies[i], layer_names, headless))
+                     for i in range(workers)]
+
+        timeout = None if shard_timeout is None else START_UP_TIMEOUT + shard_timeout * math.ceil(len(tasks) / workers)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        timed_out = False
+
+        with profiler.span("sharded reactions"):
+            for process in processes:
+                process.start()
+
+            remaining = len(tasks)
+            while remaining > 0:
+                if deadline is not None and time.monotonic() > deadline:
+                    timed_out = True
+                    break
+                try:
+                    index, shard_columns, shard_walls = result_queue.get(timeout=1)
+                except queue.Empty:
+                    # stop waiting if every server has gone
+                    if not any(process.is_alive() for process in processes) and result_queue.empty():
+                        break
+                    continue
+                (column_start, column_stop), wall_start = column_ranges[index], wall_ranges[index][0]
+                column_reactions[column_start:column_stop] = shard_columns
+                wall_reactions[wall_start:wall_start + len(shard_walls)] = shard_walls
+                done[index] = True
+                remaining -= 1
+
+            # imported here, as run_levels imports run_model, which imports this module
+            from run_levels import stop_workers
+            if timed_out:
+                stop_workers(processes, 0)
+            else:
+                stop_workers(processes, None if deadline is None else max(SHUTDOWN_TIMEOUT, deadline - time.monotonic()))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    unfinished = [index for index in range(len(tasks)) if not done[index]]
+    if unfinished:
+        reason = "not finished within " + str(timeout) + " s, the workers were stopped" if timed_out else "their workers stopped"
+        print("Shards " + ", ".join(str(index + 1) + " of " + str(len(tasks)) for index in unfinished) + " " + reason + "; read by this server instead.",
+              file=sys.stderr)
+
+    # shards no worker returned are read here
+    for index, (column_start, column_stop), shard_wall_indices in tasks:
+        if not done[index]:
+            base = fetch_base_reactions(layers, column_elements[column_start:column_stop], [wall_groups[i] for i in shard_wall_indices])
+            wall_start = wall_ranges[index][0]
+            column_reactions[column_start:column_stop] = base.column_reactions
+            wall_reactions[wall_start:wall_start + len(shard_wall_indices)] = base.wall_reactions
+
+    return BaseReactions([registry.name(layer) for layer in layers], column_reactions, wall_reactions)
+
+
+def get_sharded_takedown_table(model: Model, element_table: ElementTable = None, combo_factors=None, settings=None, labels=False, registry: LoadingRegistry = None, workers=MAX_SHARD_WORKERS, headless=True):
+    """The takedown as a TakedownTable, like get_reactions.get_takedown_table, with the reactions read by up to workers
+    extra RAM Concept servers at once (see fetch_sharded_reactions).
+
+    Levels with too few supports to share out (MIN_SHARD_SUPPORTS per worker) are read by the model's own server.
+    Returns the "... not found in model." messages instead when combos or loadings are missing.
+    See get_reactions.iter_reactions for the other arguments.
+    """
+
+    try:
+        element_table, registry, combo_dead, combo_live, combo_trib, max_height = prepare_takedown(model, element_table, combo_factors, settings, registry)
+
+        if combo_factors is None:
+            takedown_factors = {"DL": {registry.name(combo_dead): 1.0}, "LL": {registry.name(combo_live): 1.0}}
+        else:
+            takedown_factors = registry.model_factors(combo_factors)
+        if combo_trib is not None:
+            takedown_factors[TRIB_COMBO] = {registry.name(combo_trib): 1.0}
+
+        # the model's combos are read as they are, local combos are combined from their base loadings
+        if combo_factors is None:
+            layers = [layer for layer in [combo_dead, combo_live, combo_trib] if layer is not None]
+        else:
+            layers = registry.loadings_named(referenced_loadings(takedown_factors))
+    except LookupError as error:
+        return str(error)
+
+    walls = walls_within_height(element_table, max_height)
+    workers = min(workers, (len(element_table.column_elements) + len(walls)) // MIN_SHARD_SUPPORTS)
+    if workers < 2:
+        return get_takedown_table(model, element_table, combo_factors, settings, labels, registry)
+
+    wall_index = {id(wall_element_group): i for i, wall_element_group in enumerate(element_table.wall_groups)}
+    wall_indices = [wall_index[id(wall_element_group)] for wall_element_group, wall in walls]
+
+    base = fetch_sharded_reactions(model, registry, layers, element_table.column_elements, element_table.wall_groups, wall_indices, workers, headless)
+    combos = evaluate_combos(base, takedown_factors)
+
+    # z component of each combo, columns then walls
+    combo_reactions = {name: np.concatenate([column_reactions[:, 2], wall_reactions[:, 2]]) for name, (column_reactions, wall_reactions) in combos.items()}
+    reactions = [combo_reactions["DL"], combo_reactions["LL"]]
+    if combo_trib is not None:
+        reactions.append(combo_reactions.pop(TRIB_COMBO))
+    else:
+        reactions.append(np.concatenate(local_trib_reactions(model, element_table, walls)))
+
+    # the model's own combos are only read for DL, LL and Trib, so only local combos are kept
+    return takedown_columns(element_table, walls, reactions, labels, combo_reactions if combo_factors is not None else None)
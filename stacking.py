@@ -0,0 +1,245 @@
+
+# Stacking: matching the supports of each level to the supports of the level below.
+#
+# Columns are matched to the nearest column (or wall) below within TOLERANCE, found through a grid hash so each
+# level pair costs about linear time. Walls are matched to the parallel walls below that they overlap.
+# Every support of the upper level is reported as
+#   matched       sits on a support of the level below (walls: at least MIN_OVERLAP of their length)
+#   offset        the nearest support below is within MAX_OFFSET but not directly under it (a transfer)
+#   unsupported   nothing below within MAX_OFFSET
+#
+# Levels are takedown tables in ft (see takedown_table.py). Rows need their kind/id labels to tell walls from
+# columns, and wall angles are only known from a TakedownTable (as run_model and the takedown cache return), so
+# plain row lists can only be stacked when they hold no walls.
+
+import math
+
+import numpy as np
+
+from takedown_table import TakedownTable
+
+
+# ft
+TOLERANCE = 0.5
+MAX_OFFSET = 5.0
+
+# wall lengths (d) are left in API units (in) by the takedown
+WALL_LENGTH_PER_FT = 12
+
+# degrees between walls that still count as parallel
+ANGLE_TOLERANCE = 5.0
+
+# fraction of a wall's length that must sit on walls below for it to be matched
+MIN_OVERLAP = 0.5
+
+MATCHED = "matched"
+OFFSET = "offset"
+UNSUPPORTED = "unsupported"
+
+
+class LevelSupports:
+    """Positions of the supports (table rows) of one level, with walls as segments along their reaction angle."""
+
+    def __init__(self, level, takedown_tbl):
+        table = takedown_tbl if isinstance(takedown_tbl, TakedownTable) else TakedownTable.from_rows(takedown_tbl)
+        if not isinstance(takedown_tbl, TakedownTable) and np.any(table.column("kind") == "wall"):
+            raise ValueError("Level " + str(level) + ": the wall angles are not in a plain takedown list, so its walls cannot be stacked. "
+                             "Stack the TakedownTable returned by run_model or the takedown cache instead.")
+
+        self.level = level
+        self.table = table
+        self.x = table.column("x")
+        self.y = table.column("y")
+        self.ids = table.column("id")
+        self.is_wall = table.column("kind") == "wall"
+        self.column_rows = np.flatnonzero(~self.is_wall)
+        self.wall_rows = np.flatnonzero(self.is_wall)
+
+        # wall end points (columns get a zero length segment)
+        angle = np.radians(table.column("angle"))
+        half_length = np.where(self.is_wall, table.column("d") / WALL_LENGTH_PER_FT / 2, 0.0)
+        self.ux = np.cos(angle)
+        self.uy = np.sin(angle)
+        self.x1 = self.x - half_length * self.ux
+        self.y1 = self.y - half_length * self.uy
+        self.x2 = self.x + half_length * self.ux
+        self.y2 = self.y + half_length * self.uy
+        self.length = 2 * half_length
+
+    def __len__(self):
+        return len(self.x)
+
+
+class LevelMatch:
+    """For every support of the upper level: the row of the support below it (-1 for none), its status,
+    the distance to that support and, for walls, the fraction of the wall's length that sits on walls below."""
+
+    def __init__(self, upper: LevelSupports, lower: LevelSupports):
+        self.upper = upper
+        self.lower = lower
+        self.support = np.full(len(upper), -1)
+        self.status = np.full(len(upper), UNSUPPORTED, dtype="U11")
+        self.offset = np.full(len(upper), np.inf)
+        self.overlap = np.zeros(len(upper))
+
+    def counts(self):
+        return {status: int(np.count_nonzero(self.status == status)) for status in [MATCHED, OFFSET, UNSUPPORTED]}
+
+
+def _nearest_points(qx, qy, px, py, radius):
+    """Row of, and distance to, the nearest point (px, py) within radius of each query point (-1 and inf where none).
+
+    The points are hashed into square cells of side radius; each query only looks at its own and the 8 neighbouring
+    cells, all queries at once.
+    """
+
+    nearest = np.full(len(qx), -1)
+    distance = np.full(len(qx), np.inf)
+    if len(qx) == 0 or len(px) == 0:
+        return nearest, distance
+
+    pi, pj = np.floor(px / radius).astype(np.int64), np.floor(py / radius).astype(np.int64)
+    qi, qj = np.floor(qx / radius).astype(np.int64), np.floor(qy / radius).astype(np.int64)
+
+    # one integer key per cell, with room for the neighbouring cells of every query
+    i0 = min(pi.min(), qi.min()) - 1
+    j0 = min(pj.min(), qj.min()) - 1
+    width = max(pj.max(), qj.max()) - j0 + 2
+
+    keys = (pi - i0) * width + (pj - j0)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    most_per_cell = np.unique(sorted_keys, return_counts=True)[1].max()
+
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            query_keys = (qi + di - i0) * width + (qj + dj - j0)
+            first = np.searchsorted(sorted_keys, query_keys, side="left")
+            last = np.searchsorted(sorted_keys, query_keys, side="right")
+            for k in range(most_per_cell):
+                present = first + k < last
+                candidates = order[np.minimum(first + k, len(order) - 1)]
+                d = np.hypot(px[candidates] - qx, py[candidates] - qy)
+                better = present & (d < distance) & (d <= radius)
+                nearest[better] = candidates[better]
+                distance[better] = d[better]
+
+    return nearest, distance
+
+
+def segment_distance(x, y, x1, y1, x2, y2):
+    """Distance from the point (x, y) to each segment."""
+
+    dx, dy = x2 - x1, y2 - y1
+    length_squared = dx * dx + dy * dy
+    t = np.clip(((x - x1) * dx + (y - y1) * dy) / np.where(length_squared > 0, length_squared, 1.0), 0.0, 1.0)
+    return np.hypot(x1 + t * dx - x, y1 + t * dy - y)
+
+
+def _wall_grid(supports: LevelSupports, cell):
+    """{cell: rows of the walls passing within cell of it}, so one cell holds every wall near a point in it."""
+
+    grid = {}
+    for row in supports.wall_rows:
+        i1 = math.floor((min(supports.x1[row], supports.x2[row]) - cell) / cell)
+        i2 = math.floor((max(supports.x1[row], supports.x2[row]) + cell) / cell)
+        j1 = math.floor((min(supports.y1[row], supports.y2[row]) - cell) / cell)
+        j2 = math.floor((max(supports.y1[row], supports.y2[row]) + cell) / cell)
+        for i in range(i1, i2 + 1):
+            for j in range(j1, j2 + 1):
+                grid.setdefault((i, j), []).append(row)
+    return grid
+
+
+def _walls_near(grid, x, y, cell):
+    return np.array(grid.get((math.floor(x / cell), math.floor(y / cell)), []), dtype=np.int64)
+
+
+def _wall_overlap(upper: LevelSupports, row, lower: LevelSupports, candidates, tolerance):
+    """Length of the upper wall sitting on each candidate wall below (0 unless parallel and in line within tolerance)."""
+
+    # positions of the candidates' ends along, and of their centres across, the upper wall
+    ux, uy = upper.ux[row], upper.uy[row]
+    t1 = (lower.x1[candidates] - upper.x[row]) * ux + (lower.y1[candidates] - upper.y[row]) * uy
+    t2 = (lower.x2[candidates] - upper.x[row]) * ux + (lower.y2[candidates] - upper.y[row]) * uy
+    across = np.abs((lower.x[candidates] - upper.x[row]) * uy - (lower.y[candidates] - upper.y[row]) * ux)
+
+    parallel = np.abs(lower.ux[candidates] * uy - lower.uy[candidates] * ux) <= math.sin(math.radians(ANGLE_TOLERANCE))
+    half_length = upper.length[row] / 2
+    overlap = np.minimum(np.maximum(t1, t2), half_length) - np.maximum(np.minimum(t1, t2), -half_length)
+    return np.where(parallel & (across <= tolerance), np.maximum(overlap, 0.0), 0.0)
+
+
+def match_levels(upper: LevelSupports, lower: LevelSupports, tolerance=TOLERANCE, max_offset=MAX_OFFSET, min_overlap=MIN_OVERLAP):
+    """LevelMatch of the supports of upper onto the supports of lower."""
+
+    match = LevelMatch(upper, lower)
+    wall_grid = _wall_grid(lower, max_offset)
+
+    # nearest column below every upper column and wall centre, all at once
+    nearest, distance = _nearest_points(upper.x, upper.y, lower.x[lower.column_rows], lower.y[lower.column_rows], max_offset)
+    support = np.full(len(upper), -1)
+    support[nearest >= 0] = lower.column_rows[nearest[nearest >= 0]]
+
+    # walls below can be nearer than any column (only looked for where no column is directly below)
+    for row in np.flatnonzero(distance > tolerance):
+        candidates = _walls_near(wall_grid, upper.x[row], upper.y[row], max_offset)
+        if len(candidates):
+            wall_distance = segment_distance(upper.x[row], upper.y[row], lower.x1[candidates], lower.y1[candidates], lower.x2[candidates], lower.y2[candidates])
+            nearest_wall = np.argmin(wall_distance)
+            if wall_distance[nearest_wall] < distance[row] and wall_distance[nearest_wall] <= max_offset:
+                support[row] = candidates[nearest_wall]
+                distance[row] = wall_distance[nearest_wall]
+
+    match.support = support
+    match.offset = distance
+    match.status[distance <= max_offset] = OFFSET
+    match.status[(distance <= tolerance) & ~upper.is_wall] = MATCHED
+    match.overlap[(distance <= tolerance) & ~upper.is_wall] = 1.0
+
+    # walls: parallel walls below along their length
+    for row in upper.wall_rows:
+        candidates = set()
+        for x, y in [(upper.x1[row], upper.y1[row]), (upper.x[row], upper.y[row]), (upper.x2[row], upper.y2[row])]:
+            candidates.update(_walls_near(wall_grid, x, y, max_offset).tolist())
+        candidates = np.array(sorted(candidates), dtype=np.int64)
+        if len(candidates) == 0 or upper.length[row] == 0:
+            continue
+
+        overlap = _wall_overlap(upper, row, lower, candidates, tolerance)
+        match.overlap[row] = min(1.0, overlap.sum() / upper.length[row])
+        if overlap.max() > 0:
+            match.support[row] = candidates[np.argmax(overlap)]
+            match.offset[row] = np.hypot(lower.x[match.support[row]] - upper.x[row], lower.y[match.support[row]] - upper.y[row])
+            match.status[row] = MATCHED if match.overlap[row] >= min_overlap else OFFSET
+
+    return match
+
+
+def stack_levels(level_tables, tolerance=TOLERANCE, max_offset=MAX_OFFSET, min_overlap=MIN_OVERLAP):
+    """[LevelMatch] of each level onto the level below, from the top level down.
+
+    level_tables is [(level, takedown table)] as returned by run_levels.run_levels, in any order; levels whose
+    takedown is a message string are left out.
+    """
+
+    levels = sorted(((level, LevelSupports(level, takedown_tbl)) for level, takedown_tbl in level_tables if not isinstance(takedown_tbl, str)),
+                    key=lambda level_supports: float(level_supports[0]), reverse=True)
+
+    return [match_levels(upper, lower, tolerance, max_offset, min_overlap) for (level, upper), (lower_level, lower) in zip(levels, levels[1:])]
+
+
+def format_stacking(matches):
+    """Report of the stacking: counts per level, then every offset and unsupported support."""
+
+    lines = []
+    for match in matches:
+        counts = match.counts()
+        lines.append("Level " + str(match.upper.level) + " on level " + str(match.lower.level) + ": " +
+                     ", ".join(str(count) + " " + status for status, count in counts.items()))
+        for row in np.flatnonzero(match.status != MATCHED):
+            line = "    {0:<12} {1:<8} ({2:.2f}, {3:.2f})".format(match.status[row], match.upper.ids[row], match.upper.x[row], match.upper.y[row])
+            if match.support[row] >= 0:
+                line += "  {0:.2f} ft from {1}".format(match.offset[row], match.lower.ids[match.support[row]])
+            lines.append(line)
+    return "\n".join(lines)
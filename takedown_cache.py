@@ -0,0 +1,119 @@
+
+# On-disk cache of takedown lists.
+# Entries are keyed by the model file hash and the settings that change the takedown, so a level that is
+# requested again without changes is answered without starting RAM Concept.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from model_fingerprint import file_hash
+from takedown_table import TakedownTable
+
+
+# units of the cached takedown lists; part of the key so a change of output units never serves old entries
+UNITS = "ft-kip"
+
+# total size of the cache directory before the least recently used entries are removed
+MAX_BYTES = 200 * 1024 * 1024
+
+# bump when the layout of the stored rows changes (2: rows carry the kind/id labels, 3: wall angles and local combos kept)
+CACHE_VERSION = 3
+
+
+def default_directory():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "RAM2Takedown", "takedown_cache")
+
+
+def _short_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:20]
+
+
+class TakedownCache:
+    """Takedown lists stored as one JSON file per (model, settings) in directory.
+
+    File names start with a hash of the model path so all entries of a model can be invalidated together.
+    """
+
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path_prefix(self, model_path):
+        return _short_hash(os.path.normcase(os.path.abspath(model_path)))
+
+    def _entry_path(self, model_path, model_hash, settings, local_combos):
+        key = {"model_hash": model_hash, "name_DL": settings["name_DL"], "name_LL": settings["name_LL"], "name_trib": settings["name_trib"],
+               "max_height": float(settings["max_height"]), "units": UNITS, "local_combos": local_combos, "version": CACHE_VERSION}
+        key_hash = _short_hash(json.dumps(key, sort_keys=True))
+        return os.path.join(self.directory, self._path_prefix(model_path) + "_" + key_hash + ".json")
+
+    def get(self, model_path, settings, local_combos=None):
+        """The stored takedown for the model file as it is now, or None.
+
+        Takedowns stored from a TakedownTable come back as one, with their wall angles and local combos;
+        streamed row lists come back as row lists.
+        """
+
+        # a model file that cannot be read is a miss: opening it in RAM Concept reports the problem
+        try:
+            entry_path = self._entry_path(model_path, file_hash(model_path), settings, local_combos)
+            with open(entry_path, "r") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # touch the entry so eviction sees it as recently used
+        os.utime(entry_path)
+        if entry["angles"] is None:
+            return entry["rows"]
+        return TakedownTable.from_rows(entry["rows"], angles=entry["angles"], combos=entry["combos"])
+
+    def put(self, model_path, settings, takedown_tbl, local_combos=None):
+        """Store the takedown list for the model file as it is now (after any save)."""
+
+        # messages such as "... not found in model." are not cached
+        if isinstance(takedown_tbl, str):
+            return
+
+        if isinstance(takedown_tbl, TakedownTable):
+            entry = {"rows": takedown_tbl.tolist(), "angles": takedown_tbl.column("angle").tolist(),
+                     "combos": {name: np.asarray(values).tolist() for name, values in takedown_tbl.combos.items()}}
+        else:
+            entry = {"rows": [list(row) for row in takedown_tbl], "angles": None, "combos": {}}
+
+        entry_path = self._entry_path(model_path, file_hash(model_path), settings, local_combos)
+        temp_path = entry_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(entry, file)
+        os.replace(temp_path, entry_path)
+
+        self.evict()
+
+    def invalidate(self, model_path):
+        """Remove every entry stored for model_path."""
+
+        prefix = self._path_prefix(model_path) + "_"
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix):
+                os.remove(os.path.join(self.directory, name))
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is within max_bytes."""
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for mtime, size, name in entries)
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
@@ -0,0 +1,90 @@
+
+# Thin client for takedown_server.py.
+# Called from VBA with the same arguments as main.py; starts the server the first time it is needed.
+
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+# Takedown imports
+from get_reactions import get_settings
+from run_model import format_takedown
+from takedown_server import read_server_file
+
+
+# seconds to wait for a newly started server (RAM Concept start-up is slow)
+START_TIMEOUT = 120
+
+
+def start_server():
+    """Start takedown_server.py in the background, detached from this process."""
+
+    server_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "takedown_server.py")
+    if sys.platform == "win32":
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        subprocess.Popen([sys.executable, server_path], creationflags=flags, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+    else:
+        subprocess.Popen([sys.executable, server_path], start_new_session=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+
+
+def _client():
+    """Connection to the user's server, at the address and with the authkey it recorded (see takedown_server.SERVER_FILE)."""
+
+    server = read_server_file()
+    if server is None:
+        raise ConnectionRefusedError("No takedown server is running.")
+    address, authkey = server
+    try:
+        return Client(address, authkey=authkey)
+    except (AuthenticationError, EOFError, ConnectionResetError):
+        # a stale server file whose port is now used by something else
+        raise ConnectionRefusedError("No takedown server is running.")
+
+
+def connect(start=True):
+    try:
+        return _client()
+    except ConnectionRefusedError:
+        if not start:
+            raise
+
+    start_server()
+    deadline = time.time() + START_TIMEOUT
+    while True:
+        time.sleep(0.5)
+        try:
+            return _client()
+        except ConnectionRefusedError:
+            if time.time() > deadline:
+                raise
+
+
+def send(request, start=True):
+    """Send one request dict to the server and return its response dict."""
+    with connect(start) as connection:
+        connection.send(request)
+        return connection.recv()
+
+
+def takedown(settings, generate_mesh=False, local_combos=None):
+    """Takedown list (or message string) for the model named in settings."""
+
+    response = send({"command": "takedown", "settings": settings, "generate_mesh": generate_mesh, "local_combos": local_combos})
+    if not response["ok"]:
+        return "Takedown server error: " + response["error"]
+    return response["takedown"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("shutdown", "ping"):
+        print(send({"command": sys.argv[1]}, start=False))
+    else:
+        # same arguments as main.py when run from VBA
+        settings = get_settings(sys.argv)
+        generate_mesh = bool("True" in sys.argv[10])
+
+        # Print for VBA to read
+        print(format_takedown(takedown(settings, generate_mesh)))
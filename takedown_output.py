@@ -0,0 +1,97 @@
+
+# File formats for takedown lists.
+#
+# Both formats hold one row per column/wall with these fields:
+#   x, y   location (ft)               DL, LL   reactions (kip)
+#   H      height (ft)                 b, d     column size / wall thickness and length (as in the model)
+#   Trib   Trib loading reaction (kip) kind     "column" or "wall"
+#   id     C1, C2... for columns in element order, the wall element group name for walls
+#
+# CSV: a header line with the field names, then one line per row, numbers at a fixed precision.
+# NPY: a NumPy structured array with dtype TAKEDOWN_DTYPE, read with numpy.load(path). It also holds each wall's
+#      reaction angle in degrees (0 for columns).
+
+import os
+
+import numpy as np
+
+from takedown_table import LABEL_FIELDS
+from takedown_table import TAKEDOWN_DTYPE
+from takedown_table import TAKEDOWN_FIELDS
+from takedown_table import TAKEDOWN_UNITS
+from takedown_table import TakedownTable
+
+# decimal places written to CSV
+PRECISION = 3
+
+
+def _number_format(precision):
+    return ",".join(["{:." + str(precision) + "f}"] * len(TAKEDOWN_FIELDS))
+
+
+def format_csv(takedown_tbl, precision=PRECISION):
+    """The takedown list as CSV text, built in a single pass.
+
+    Rows may carry the kind and id labels (get_reactions(..., labels=True)); otherwise those columns are left empty.
+    """
+
+    number_format = _number_format(precision)
+    lines = [",".join(TAKEDOWN_FIELDS + LABEL_FIELDS)]
+
+    # a TakedownTable is read a column at a time, a list a row at a time
+    if isinstance(takedown_tbl, TakedownTable):
+        array = takedown_tbl.array
+        columns = [array[field].tolist() for field in TAKEDOWN_FIELDS]
+        labels = [array[field].tolist() for field in LABEL_FIELDS] if takedown_tbl.labels else [[""] * len(array)] * len(LABEL_FIELDS)
+        rows = zip(*columns, *labels)
+    else:
+        rows = (list(row[:10]) if len(row) >= 10 else list(row[:8]) + ["", ""] for row in takedown_tbl)
+
+    for row in rows:
+        lines.append(number_format.format(*row[:8]) + "," + str(row[8]) + "," + str(row[9]))
+    return "\n".join(lines) + "\n"
+
+
+def write_csv(path, takedown_tbl, precision=PRECISION):
+    with open(path, "w", newline="") as file:
+        file.write(format_csv(takedown_tbl, precision))
+
+
+def to_array(takedown_tbl):
+    """The takedown list as a structured array with dtype TAKEDOWN_DTYPE (a TakedownTable's own array, without copying)."""
+
+    if isinstance(takedown_tbl, TakedownTable):
+        return takedown_tbl.to_units(TAKEDOWN_UNITS).array if takedown_tbl.units != TAKEDOWN_UNITS else takedown_tbl.array
+
+    array = np.zeros(len(takedown_tbl), dtype=TAKEDOWN_DTYPE)
+    if len(takedown_tbl) == 0:
+        return array
+
+    values = np.array([row[:8] for row in takedown_tbl], dtype="f8")
+    for j, field in enumerate(TAKEDOWN_FIELDS):
+        array[field] = values[:, j]
+
+    if len(takedown_tbl[0]) >= 10:
+        array["kind"] = [row[8] for row in takedown_tbl]
+        array["id"] = [row[9] for row in takedown_tbl]
+    return array
+
+
+def write_npy(path, takedown_tbl):
+    np.save(path, to_array(takedown_tbl))
+
+
+# output format name -> (file extension, writer)
+WRITERS = {
+    "csv": (".csv", write_csv),
+    "npy": (".npy", write_npy),
+}
+
+
+def write_takedown(model_path, takedown_tbl, output_format):
+    """Write the takedown list next to the model in output_format ("csv" or "npy") and return the file path."""
+
+    extension, writer = WRITERS[output_format]
+    path = os.path.splitext(model_path)[0] + ".takedown" + extension
+    writer(path, takedown_tbl)
+    return path
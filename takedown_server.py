@@ -0,0 +1,258 @@
+
+# Resident takedown server.
+# Keeps one RAM Concept server running and recently used models open, so a takedown request only pays for the
+# reaction extraction instead of start_concept/open_file/shut_down. Requests come from takedown_client.py.
+#
+# Each user gets their own server. It listens on this machine only, on a port picked when it starts, with a random
+# authkey; both are written to a file in the user's profile that only they can read (see SERVER_FILE), so other
+# users and processes (e.g. on a shared terminal server) can neither connect to it nor send it anything to unpickle.
+
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.connection import Listener
+
+# RAM Concept API imports
+from ram_concept.concept import Concept
+
+# Takedown imports
+from api_replay import close_recordings
+from api_replay import start_concept
+from element_table import get_element_table
+from get_reactions import get_reactions
+from loading_registry import LoadingRegistry
+from model_fingerprint import file_hash
+from model_fingerprint import results_current
+from model_fingerprint import save_fingerprint
+from run_model import element_table_path
+from run_model import restore_user_units
+from run_model import set_api_units
+
+
+# the server only listens on this machine
+HOST = "localhost"
+
+# address and authkey of the user's running server
+SERVER_FILE = os.path.join(os.path.expanduser("~"), ".ram2takedown", "server.json")
+
+# models kept open at once (set to 1 for RAM Concept versions that only hold a single open model)
+MAX_MODELS = 4
+
+# seconds a model stays open without any request
+MAX_IDLE = 30 * 60
+
+
+def write_server_file(address, authkey, path=SERVER_FILE):
+    """Record the address and authkey of this server where only the current user can read them."""
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    temp_path = path + "." + str(os.getpid())
+    with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as file:
+        json.dump({"host": address[0], "port": address[1], "authkey": authkey.hex(), "pid": os.getpid()}, file)
+    os.replace(temp_path, path)
+
+
+def read_server_file(path=SERVER_FILE):
+    """(address, authkey) of the user's server, or None when no server has recorded one."""
+    try:
+        with open(path, "r") as file:
+            server = json.load(file)
+        return (server["host"], server["port"]), bytes.fromhex(server["authkey"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def remove_server_file(path=SERVER_FILE):
+    """Remove the server file if it is still this server's."""
+    try:
+        with open(path, "r") as file:
+            owner = json.load(file).get("pid")
+        if owner == os.getpid():
+            os.remove(path)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+class OpenModel:
+    """A model held open by the server, already switched to API units and signs."""
+
+    def __init__(self, model, model_path, file_hash_before):
+        self.model = model
+        self.model_path = model_path
+        self.saved_units, self.saved_signs = set_api_units(model)
+        self.mtime = os.path.getmtime(model_path)
+        self.last_used = time.time()
+        self.file_hash_before = file_hash_before
+        self.analysed = False
+        self.model_hash = None
+        self.element_table = None
+        self.registry = None
+
+    def save(self):
+        """Save the file with the user's units and signs, then go back to API units."""
+        restore_user_units(self.model, self.saved_units, self.saved_signs)
+        self.model.save_file(self.model_path)
+        save_fingerprint(self.model_path, self.model_hash)
+        self.saved_units, self.saved_signs = set_api_units(self.model)
+        self.mtime = os.path.getmtime(self.model_path)
+
+
+class ModelCache:
+    """Open models by path, least recently used first.
+
+    Models are closed when there are more than max_models open, when they have been idle for max_idle
+    seconds, or when the file was saved by someone else since it was opened.
+    """
+
+    def __init__(self, concept: Concept, max_models=MAX_MODELS, max_idle=MAX_IDLE):
+        self.concept = concept
+        self.max_models = max_models
+        self.max_idle = max_idle
+        self.models = OrderedDict()
+
+    def get(self, model_path):
+        key = os.path.normcase(os.path.abspath(model_path))
+
+        entry = self.models.get(key)
+        if entry is not None and os.path.getmtime(model_path) != entry.mtime:
+            # the file changed on disk, so the open copy is stale
+            self.close(key)
+            entry = None
+
+        if entry is None:
+            file_hash_before = file_hash(model_path)
+            entry = OpenModel(self.concept.open_file(model_path), model_path, file_hash_before)
+            self.models[key] = entry
+
+        self.models.move_to_end(key)
+        entry.last_used = time.time()
+        self.evict()
+        return entry
+
+    def evict(self):
+        while len(self.models) > self.max_models:
+            self.close(next(iter(self.models)))
+
+        now = time.time()
+        for key in [key for key, entry in self.models.items() if now - entry.last_used > self.max_idle]:
+            self.close(key)
+
+    def close(self, key):
+        entry = self.models.pop(key, None)
+        if entry is not None:
+            entry.model.close_model()
+
+    def close_all(self):
+        for key in list(self.models):
+            self.close(key)
+
+
+def takedown(cache: ModelCache, settings, generate_mesh=False, local_combos=None):
+    """Takedown list for the model named in settings.
+
+    The first request for an open model analyses (and saves) it unless its results are already current
+    (see model_fingerprint.py), as run_model does. After that it is only analysed again when a request
+    asks for a new mesh, which is then always generated.
+    """
+
+    entry = cache.get(settings["model_filepath"])
+    model = entry.model
+
+    if not entry.analysed:
+        current, entry.model_hash = results_current(model, entry.model_path, entry.file_hash_before)
+        remesh = generate_mesh == True and not current
+    else:
+        current = True
+        remesh = generate_mesh == True
+
+    if remesh or not current:
+        if remesh:
+            model.generate_mesh()
+        model.calc_all()
+        entry.save()
+
+    if remesh or not entry.analysed:
+        entry.analysed = True
+        entry.element_table = get_element_table(model.cad_manager.element_layer, cache_path=element_table_path(entry.model_path), mesh_key=entry.model_hash, refresh=remesh)
+
+    # the loading and combo names are read once per open model
+    if entry.registry is None:
+        entry.registry = LoadingRegistry.from_model(model)
+
+    return get_reactions(model, entry.element_table, local_combos, settings, registry=entry.registry)
+
+
+def handle(cache: ModelCache, request):
+    """Answer one request dict with a response dict."""
+
+    command = request.get("command")
+    try:
+        if command == "takedown":
+            return {"ok": True, "takedown": takedown(cache, request["settings"], request.get("generate_mesh", False), request.get("local_combos"))}
+        elif command == "close":
+            cache.close(os.path.normcase(os.path.abspath(request["model_path"])))
+            return {"ok": True}
+        elif command in ("ping", "shutdown"):
+            return {"ok": True}
+        else:
+            return {"ok": False, "error": "Unknown command " + str(command) + "."}
+    except Exception as error:
+        return {"ok": False, "error": str(error)}
+
+
+def serve(headless=True, max_models=MAX_MODELS, max_idle=MAX_IDLE, server_file=SERVER_FILE):
+    """Run the server until a shutdown request arrives, with a new port and authkey recorded in server_file."""
+
+    concept = start_concept(headless=headless)
+    cache = ModelCache(concept, max_models, max_idle)
+
+    # RAM Concept calls are made from one thread at a time
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    # idle models are closed even when no requests arrive
+    def evict_idle():
+        while not stop.wait(60):
+            with lock:
+                cache.evict()
+
+    threading.Thread(target=evict_idle, daemon=True).start()
+
+    authkey = secrets.token_bytes(32)
+
+    try:
+        with Listener((HOST, 0), authkey=authkey) as listener:
+            write_server_file(listener.address, authkey, server_file)
+            while not stop.is_set():
+                try:
+                    connection = listener.accept()
+                except Exception:
+                    # e.g. a client with the wrong authkey
+                    continue
+
+                with connection:
+                    try:
+                        request = connection.recv()
+                    except EOFError:
+                        continue
+                    with lock:
+                        response = handle(cache, request)
+                    connection.send(response)
+
+                if request.get("command") == "shutdown":
+                    stop.set()
+    finally:
+        stop.set()
+        remove_server_file(server_file)
+        with lock:
+            cache.close_all()
+            concept.shut_down()
+            close_recordings()
+
+
+if __name__ == "__main__":
+    serve(headless="--gui" not in sys.argv)
@@ -0,0 +1,156 @@
+
+# Column-backed takedown table.
+#
+# The rows of a takedown are held in one NumPy structured array (dtype TAKEDOWN_DTYPE), filled a column at a time,
+# with the units of each column declared alongside. Unit conversion is one vectorised division per column, and
+# aggregation or export can use the columns directly (takedown_output.to_array returns the array itself).
+#
+# A TakedownTable still behaves like the list of [x, y, DL, LL, H, b, d, Trib(, kind, id)] rows the rest of the
+# project expects: len(), indexing and iteration give TakedownRow views that index and slice like those lists,
+# and slicing the table gives a TakedownTable of those rows.
+# The table also keeps each wall's reaction angle (degrees, 0 for columns) for stacking; it is not part of the rows.
+# Tables built from local combos also hold the z reaction of every evaluated combo (service, ultimate, pattern...)
+# in combos, by combo name, in the units of DL.
+
+import operator
+
+import numpy as np
+
+
+TAKEDOWN_FIELDS = ["x", "y", "DL", "LL", "H", "b", "d", "Trib"]
+LABEL_FIELDS = ["kind", "id"]
+
+ROW_FIELDS = TAKEDOWN_FIELDS + LABEL_FIELDS
+
+TAKEDOWN_DTYPE = np.dtype([(field, "f8") for field in TAKEDOWN_FIELDS] + [("kind", "U6"), ("id", "U32"), ("angle", "f8")])
+
+# units of each field as read from the API and as written to the takedown
+# b and d stay as they are in the model (column size / wall thickness and length)
+API_UNITS = {"x": "in", "y": "in", "DL": "lb", "LL": "lb", "H": "in", "b": "model", "d": "model", "Trib": "lb", "angle": "deg"}
+TAKEDOWN_UNITS = {"x": "ft", "y": "ft", "DL": "kip", "LL": "kip", "H": "ft", "b": "model", "d": "model", "Trib": "kip", "angle": "deg"}
+
+# (from unit, to unit) -> divisor
+CONVERSIONS = {
+    ("in", "ft"): 12,
+    ("lb", "kip"): 1000,
+}
+
+
+class TakedownRow:
+    """View of one row of a TakedownTable that indexes, slices and compares like a takedown list row."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def tolist(self):
+        values = list(self.table.array[self.index].item())
+        return values[:len(TAKEDOWN_FIELDS) + (len(LABEL_FIELDS) if self.table.labels else 0)]
+
+    def __len__(self):
+        return len(TAKEDOWN_FIELDS) + (len(LABEL_FIELDS) if self.table.labels else 0)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.tolist()[key]
+
+        # one element read straight from its field
+        key = operator.index(key)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("takedown row index out of range")
+        return self.table.array[ROW_FIELDS[key]][self.index].item()
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other):
+        return self.tolist() == list(other) if isinstance(other, (list, tuple, TakedownRow)) else NotImplemented
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class TakedownTable:
+    """Takedown rows in a structured array, with the units of each numeric column.
+
+    labels says whether rows carry the kind and id fields (as with get_reactions(..., labels=True)).
+    combos is {combo name: z reaction of every row} for combos evaluated along with DL and LL.
+    """
+
+    __slots__ = ("array", "units", "labels", "combos")
+
+    def __init__(self, array, units, labels=False, combos=None):
+        self.array = array
+        self.units = dict(units)
+        self.labels = labels
+        self.combos = dict(combos or {})
+
+    @classmethod
+    def from_columns(cls, columns, kinds=None, ids=None, units=API_UNITS, labels=False, combos=None):
+        """Fill a table from one array-like per field in TAKEDOWN_FIELDS, optionally "angle" (and kinds/ids for the labels)."""
+
+        array = np.zeros(len(columns[TAKEDOWN_FIELDS[0]]), dtype=TAKEDOWN_DTYPE)
+        for field in TAKEDOWN_FIELDS + ["angle"]:
+            if field in columns:
+                array[field] = columns[field]
+        if kinds is not None:
+            array["kind"] = kinds
+        if ids is not None:
+            array["id"] = ids
+        return cls(array, units, labels, {name: np.asarray(values, dtype="f8") for name, values in (combos or {}).items()})
+
+    @classmethod
+    def from_rows(cls, takedown_tbl, units=TAKEDOWN_UNITS, angles=None, combos=None):
+        """Table from a takedown list (rows with or without labels).
+
+        Wall angles are not in the rows: give them as angles (one per row), otherwise they are 0.
+        """
+
+        labels = len(takedown_tbl) > 0 and len(takedown_tbl[0]) >= len(TAKEDOWN_FIELDS) + len(LABEL_FIELDS)
+        values = np.array([row[:len(TAKEDOWN_FIELDS)] for row in takedown_tbl], dtype="f8").reshape(-1, len(TAKEDOWN_FIELDS))
+        columns = {field: values[:, j] for j, field in enumerate(TAKEDOWN_FIELDS)}
+        kinds = [row[8] for row in takedown_tbl] if labels else None
+        ids = [row[9] for row in takedown_tbl] if labels else None
+        if angles is not None:
+            columns["angle"] = angles
+        return cls.from_columns(columns, kinds, ids, units, labels, combos)
+
+    def column(self, field):
+        """One field of every row, as a view into the table."""
+        return self.array[field]
+
+    def to_units(self, units=TAKEDOWN_UNITS):
+        """Copy of the table in the given units, converted a column at a time."""
+
+        array = self.array.copy()
+        for field, unit in units.items():
+            if self.units[field] != unit:
+                array[field] /= CONVERSIONS[(self.units[field], unit)]
+
+        divisor = CONVERSIONS[(self.units["DL"], units["DL"])] if self.units["DL"] != units["DL"] else 1
+        combos = {name: values / divisor for name, values in self.combos.items()}
+        return TakedownTable(array, units, self.labels, combos)
+
+    def tolist(self):
+        return [TakedownRow(self, index).tolist() for index in range(len(self.array))]
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TakedownTable(self.array[index], self.units, self.labels, {name: values[index] for name, values in self.combos.items()})
+
+        index = operator.index(index)
+        if index < 0:
+            index += len(self.array)
+        if not 0 <= index < len(self.array):
+            raise IndexError("takedown row index out of range")
+        return TakedownRow(self, index)
+
+    def __iter__(self):
+        return (TakedownRow(self, index) for index in range(len(self.array)))
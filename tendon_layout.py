@@ -0,0 +1,172 @@
+
+# Table-driven tendon layout: banded and uniform tendons from rows of span coordinates, profiles and strand counts.
+#
+# One run of identical tendons per row, with a header row naming these columns (in any order, names are not case sensitive):
+#   layer         "longitude" (tendons along x) or "latitude" (tendons along y)
+#   coordinates   "c1 c2 c3 ..." - positions of the profile points along the tendons (supports and mid-spans)
+#   profiles      "z1 z2 z3 ..." - profile value at each profile point
+#   strands       strands per tendon
+#   offset        position across the span set of the first tendon (y for longitude, x for latitude tendons)
+#   count         number of tendons: 1 for a band (missing or empty cells are 1)
+#   spacing       distance between neighbouring tendons of the run (missing or empty cells are 0)
+#
+# Each tendon runs high to low between its profile points, with a jack at its first point. The segments of every
+# run are laid out as arrays first and sorted by (strands, elevation 1, elevation 2): the cad manager's default
+# tendon segment is then only changed where that property set changes and every segment is added with a single
+# call, into whichever tendon layer its row names. The other default tendon segment and jack properties (PT system,
+# elevation references...) are left as the caller set them.
+
+import numpy as np
+
+from ram_concept.enums import GeneratedBy
+from ram_concept.enums import SpanSet
+from ram_concept.line_segment_2D import LineSegment2D
+from ram_concept.model import Model
+from ram_concept.point_2D import Point2D
+
+from load_import import field_rows
+from load_import import read_rows
+from profiling import profiler
+
+
+LAYOUT_FIELDS = ["layer", "coordinates", "profiles", "strands", "offset", "count", "spacing"]
+
+SPAN_SETS = {"longitude": SpanSet.LONGITUDE, "latitude": SpanSet.LATITUDE}
+
+# one row per tendon segment, in the order the segments are added
+SEGMENT_FIELDS = ["layer", "x1", "y1", "x2", "y2", "z1", "z2", "strands"]
+SEGMENT_DTYPE = np.dtype([("layer", "i8"), ("x1", "f8"), ("y1", "f8"), ("x2", "f8"), ("y2", "f8"), ("z1", "f8"), ("z2", "f8"), ("strands", "i8")])
+
+
+class TendonRun:
+    """One row of a tendon layout: count tendons through the same profile points, spacing apart from offset."""
+
+    def __init__(self, layer, coordinates, profiles, strands, offset, count=1, spacing=0.0):
+        self.layer = layer
+        self.coordinates = list(coordinates)
+        self.profiles = list(profiles)
+        self.strands = strands
+        self.offset = offset
+        self.count = count
+        self.spacing = spacing
+
+
+def parse_values(text):
+    """[float] from "v1 v2 v3 ..." (commas or semicolons may separate the values too)."""
+    return [float(value) for value in str(text).replace(",", " ").replace(";", " ").split()]
+
+
+def _number(value, default):
+    return default if value is None or str(value).strip() == "" else float(value)
+
+
+def tendon_run(row, row_number):
+    """TendonRun from a {field: cell value} row; raises ValueError naming the row when it is not a valid run."""
+
+    layer = str(row.get("layer") or "").strip().lower()
+    if layer not in SPAN_SETS:
+        raise ValueError("Row " + str(row_number) + ": tendon layer must be longitude or latitude, not \"" + str(row.get("layer")) + "\".")
+    try:
+        coordinates = parse_values(row.get("coordinates") or "")
+        profiles = parse_values(row.get("profiles") or "")
+        strands = _number(row.get("strands"), 0.0)
+        offset = _number(row.get("offset"), 0.0)
+        count = _number(row.get("count"), 1.0)
+        spacing = _number(row.get("spacing"), 0.0)
+    except ValueError:
+        raise ValueError("Row " + str(row_number) + ": coordinates, profiles and tendon values must be numbers.")
+    if len(coordinates) < 2 or len(profiles) != len(coordinates):
+        raise ValueError("Row " + str(row_number) + ": a tendon needs two or more coordinates and one profile value for each.")
+    if strands != int(strands) or strands < 1 or count != int(count) or count < 1:
+        raise ValueError("Row " + str(row_number) + ": strands and count must be whole numbers of at least 1.")
+
+    return TendonRun(layer, coordinates, profiles, int(strands), offset, int(count), spacing)
+
+
+def read_tendon_layout(path, sheet_name=None):
+    """[TendonRun] of every row of a tendon layout table in a .csv file or an Excel workbook."""
+    return [tendon_run(row, row_number) for row_number, row in field_rows(read_rows(path, sheet_name), LAYOUT_FIELDS)]
+
+
+def run_segments(run: TendonRun, layer=0):
+    """Array of SEGMENT_DTYPE with every segment of the run's tendons, tendon by tendon, each running high to low."""
+
+    coordinates = np.asarray(run.coordinates, dtype="f8")
+    profiles = np.asarray(run.profiles, dtype="f8")
+
+    # even segments run forwards and odd segments backwards, so every segment starts at its high end
+    s = np.arange(len(coordinates) - 1)
+    i = s + s % 2
+    j = s + 1 - s % 2
+
+    along_1 = np.tile(coordinates[i], run.count)
+    along_2 = np.tile(coordinates[j], run.count)
+    across = np.repeat(run.offset + run.spacing * np.arange(run.count), len(s))
+
+    segments = np.zeros(len(along_1), dtype=SEGMENT_DTYPE)
+    segments["layer"] = layer
+    if run.layer == "longitude":
+        segments["x1"], segments["y1"], segments["x2"], segments["y2"] = along_1, across, along_2, across
+    else:
+        segments["x1"], segments["y1"], segments["x2"], segments["y2"] = across, along_1, across, along_2
+    segments["z1"] = np.tile(profiles[i], run.count)
+    segments["z2"] = np.tile(profiles[j], run.count)
+    segments["strands"] = run.strands
+    return segments
+
+
+def run_jacks(run: TendonRun):
+    """(x, y) arrays of the jack of each of the run's tendons, at its first profile point."""
+
+    across = run.offset + run.spacing * np.arange(run.count)
+    along = np.full(run.count, float(run.coordinates[0]))
+    return (along, across) if run.layer == "longitude" else (across, along)
+
+
+def layout_segments(runs, layer_names):
+    """Array of SEGMENT_DTYPE with the segments of every run, layer given as the index of its run's layer in layer_names,
+    sorted so segments with the same strands and elevations are together (runs and tendons otherwise keep their order)."""
+
+    tables = [run_segments(run, layer_names.index(run.layer)) for run in runs]
+    segments = np.concatenate(tables) if tables else np.zeros(0, dtype=SEGMENT_DTYPE)
+    return segments[np.lexsort((segments["z2"], segments["z1"], segments["strands"]))]
+
+
+def add_tendon_layout(model: Model, runs):
+    """Add the tendons of runs to the model's user tendon layers; returns (segments added, jacks added)."""
+
+    cad_manager = model.cad_manager
+    layer_names = list(dict.fromkeys(run.layer for run in runs))
+    segments = layout_segments(runs, layer_names)
+
+    with profiler.span("add tendons"):
+        tendon_layers = [cad_manager.tendon_layer(SPAN_SETS[name], GeneratedBy.USER) for name in layer_names]
+        default_tendon_segment = cad_manager.default_tendon_segment
+        profiler.calls(len(tendon_layers) + 1)
+
+        # the default's strands and elevations only change between property sets
+        current = {}
+        columns = [segments[field].tolist() for field in SEGMENT_FIELDS]
+        for layer, x1, y1, x2, y2, z1, z2, strands in zip(*columns):
+            for name, value in [("strand_count", strands), ("elevation_value_1", z1), ("elevation_value_2", z2)]:
+                if current.get(name) != value:
+                    setattr(default_tendon_segment, name, value)
+                    current[name] = value
+                    profiler.calls()
+            tendon_layers[layer].add_tendon_segment(LineSegment2D(Point2D(x1, y1), Point2D(x2, y2)))
+        profiler.calls(len(segments))
+
+        jacks = 0
+        for run in runs:
+            tendon_layer = tendon_layers[layer_names.index(run.layer)]
+            for x, y in zip(*(values.tolist() for values in run_jacks(run))):
+                tendon_layer.add_jack(Point2D(x, y))
+                jacks += 1
+        profiler.calls(jacks)
+
+    return len(segments), jacks
+
+
+def import_tendon_layout(model: Model, path, sheet_name=None):
+    """Add the tendons of a CSV or Excel tendon layout table (see read_tendon_layout) to the model; returns (segments, jacks) added."""
+    return add_tendon_layout(model, read_tendon_layout(path, sheet_name))
@@ -0,0 +1,54 @@
+# File formats for tendon profile tables (see get_tendon_profiles.tendon_profile_table).
+#
+# Both formats hold one row per point along a tendon segment with these fields:
+#   layer     tendon layer name            segment   tendon segment number
+#   ratio     position along the segment   x, y, z   point location and elevation (API units)
+#   strands   strand count of the segment
+#
+# CSV: a header line with the field names, then one line per row, numbers at a fixed precision.
+# NPY: a NumPy structured array with dtype TENDON_DTYPE, read with numpy.load(path).
+
+import os
+
+import numpy as np
+
+from get_tendon_profiles import TENDON_DTYPE
+from get_tendon_profiles import TENDON_FIELDS
+
+# decimal places written to CSV
+PRECISION = 3
+
+
+def format_csv(profiles, precision=PRECISION):
+    """The profile table as CSV text, built in a single pass."""
+
+    number = "{:." + str(precision) + "f}"
+    row_format = "{0},{1}," + ",".join(number.replace("{", "{" + str(j)) for j in range(2, len(TENDON_FIELDS)))
+    lines = [",".join(TENDON_FIELDS)]
+    lines += [row_format.format(*row) for row in profiles.tolist()]
+    return "\n".join(lines) + "\n"
+
+
+def write_csv(path, profiles, precision=PRECISION):
+    with open(path, "w", newline="") as file:
+        file.write(format_csv(profiles, precision))
+
+
+def write_npy(path, profiles):
+    np.save(path, np.asarray(profiles, dtype=TENDON_DTYPE))
+
+
+# output format name -> (file extension, writer)
+WRITERS = {
+    "csv": (".csv", write_csv),
+    "npy": (".npy", write_npy),
+}
+
+
+def write_tendon_profiles(model_path, profiles, output_format):
+    """Write the profile table next to the model in output_format ("csv" or "npy") and return the file path."""
+
+    extension, writer = WRITERS[output_format]
+    path = os.path.splitext(model_path)[0] + ".tendons" + extension
+    writer(path, profiles)
+    return path
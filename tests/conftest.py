@@ -0,0 +1,10 @@
+
+# The tests run against the in-memory RAM Concept stand-in (standin_concept.py) unless the real API is installed.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import standin_concept
+standin_concept.install()
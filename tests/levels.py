@@ -0,0 +1,25 @@
+
+# Takedown tables of small made-up levels, in takedown units (ft, kip).
+
+from takedown_table import TAKEDOWN_UNITS
+from takedown_table import TakedownTable
+
+
+def level_table(supports):
+    """TakedownTable from [(kind, x, y, DL, LL, Trib, d, angle)]; wall lengths d are in inches as in a takedown."""
+
+    kinds = [support[0] for support in supports]
+    columns = {field: [support[j] for support in supports] for j, field in enumerate(["kind", "x", "y", "DL", "LL", "Trib", "d", "angle"]) if j}
+    columns["H"] = [10.0] * len(supports)
+    columns["b"] = [12.0] * len(supports)
+    ids = [kind + " " + str(i) for i, kind in enumerate(kinds)]
+    return TakedownTable.from_columns(columns, kinds, ids, TAKEDOWN_UNITS, labels=True)
+
+
+# a 2 x 2 bay of columns with a wall along x and a wall along y
+FLOOR = [("column", 0.0, 0.0, 20.0, 8.0, 0.1, 12.0, 0.0),
+         ("column", 30.0, 0.0, 22.0, 9.0, 0.1, 12.0, 0.0),
+         ("column", 0.0, 30.0, 24.0, 10.0, 0.1, 12.0, 0.0),
+         ("column", 30.0, 30.0, 26.0, 11.0, 0.1, 12.0, 0.0),
+         ("wall", 15.0, -5.0, 40.0, 12.0, 0.2, 240.0, 0.0),
+         ("wall", 40.0, 15.0, 42.0, 13.0, 0.2, 240.0, 90.0)]
@@ -0,0 +1,17 @@
+
+# Small generated models on the RAM Concept stand-in, analysed and saved like a level model.
+
+from ram_concept.concept import Concept
+
+from generate_model import generate_model
+
+
+def saved_model(directory, columns_x=3, columns_y=3):
+    """(concept, path) of an analysed grid model saved in directory."""
+
+    concept = Concept.start_concept()
+    model, supports = generate_model(concept, columns_x, columns_y, span=300)
+    model.calc_all()
+    path = str(directory / "level.cpt")
+    model.save_file(path)
+    return concept, path
@@ -0,0 +1,37 @@
+
+import pytest
+
+import benchmark
+from api_replay import Player
+from api_replay import Recorder
+from api_replay import ReplayError
+from api_replay import replay
+from api_replay import takedown_session
+from models import saved_model
+
+
+def record_takedown(tmp_path, include_pt=False):
+    concept, path = saved_model(tmp_path)
+    log_path = str(tmp_path / "takedown.jsonl.gz")
+    recorder = Recorder(log_path, {"model_path": path, "settings": benchmark.SETTINGS, "include_pt": include_pt})
+    try:
+        takedown_tbl = takedown_session(recorder.wrap(concept), path, benchmark.SETTINGS, include_pt)
+    finally:
+        recorder.close()
+    return log_path, takedown_tbl
+
+
+def test_replay_gives_the_recorded_takedown(tmp_path):
+    log_path, recorded = record_takedown(tmp_path, include_pt=True)
+    replayed, seconds, calls = replay(log_path)
+
+    assert replayed == recorded
+    assert calls > len(recorded)
+
+
+def test_calls_that_were_not_recorded_are_refused(tmp_path):
+    log_path, recorded = record_takedown(tmp_path)
+    concept = Player(log_path).root()
+
+    with pytest.raises(ReplayError):
+        concept.open_file(str(tmp_path / "other.cpt"))
@@ -0,0 +1,81 @@
+
+import numpy as np
+import pytest
+
+from ram_concept.concept import Concept
+
+import benchmark
+from combo_engine import BaseReactions
+from combo_engine import check_combo_factors
+from combo_engine import evaluate_combos
+from combo_engine import factor_matrix
+from combo_engine import referenced_loadings
+from generate_model import generate_model
+from get_reactions import get_takedown_table
+
+
+COMBO_FACTORS = {"DL": {"Self-Dead": 1.0, "Other Dead": 1.0},
+                 "1.2D+1.6L": {"Self-Dead": 1.2, "Other Dead": 1.2, "Live": 1.6},
+                 "Roof": {"Roof Live": 1.0}}
+
+
+def test_referenced_loadings_in_first_use_order():
+    assert referenced_loadings(COMBO_FACTORS) == ["Self-Dead", "Other Dead", "Live", "Roof Live"]
+
+
+def test_unlisted_loadings_have_no_factor():
+    combo_names, factors = factor_matrix(COMBO_FACTORS, ["Live", "Self-Dead", "Other Dead", "Roof Live", "Wind"])
+
+    assert combo_names == ["DL", "1.2D+1.6L", "Roof"]
+    assert factors.tolist() == [[0.0, 1.0, 1.0, 0.0, 0.0], [1.6, 1.2, 1.2, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0, 0.0]]
+
+
+def test_combos_are_linear_in_the_base_reactions():
+    random = np.random.default_rng(7)
+    names = referenced_loadings(COMBO_FACTORS)
+    base = BaseReactions(names, random.normal(size=(5, len(names), 6)), random.normal(size=(3, len(names), 6)))
+
+    combos = evaluate_combos(base, COMBO_FACTORS)
+
+    assert list(combos) == list(COMBO_FACTORS)
+    for reactions, combo in [(base.column_reactions, 0), (base.wall_reactions, 1)]:
+        dead = reactions[:, 0] + reactions[:, 1]
+        assert np.allclose(combos["DL"][combo], dead)
+        assert np.allclose(combos["1.2D+1.6L"][combo], 1.2 * dead + 1.6 * reactions[:, 2])
+        assert np.allclose(combos["Roof"][combo], reactions[:, 3])
+
+
+def test_combo_factors_need_dl_and_ll():
+    with pytest.raises(LookupError, match="Local combo LL not found"):
+        check_combo_factors({"DL": {"Self-Dead": 1.0}})
+    with pytest.raises(LookupError, match="Trib is kept for the trib loading"):
+        check_combo_factors(dict(COMBO_FACTORS, LL={"Live": 1.0}, Trib={"Live": 1.0}))
+    check_combo_factors(dict(COMBO_FACTORS, LL={"Live": 1.0}))
+
+
+MODEL_FACTORS = {"DL": {"Self-Dead Loading": 1.0, "Other Dead Loading": 1.0},
+                 "LL": {"Live (Reducible) Loading": 1.0},
+                 "1.2D+1.6L": {"Self-Dead Loading": 1.2, "Other Dead Loading": 1.2, "Live (Reducible) Loading": 1.6}}
+
+
+@pytest.fixture(scope="module")
+def model():
+    model, supports = generate_model(Concept.start_concept(), 3, 3, span=300)
+    model.calc_all()
+    return model
+
+
+def test_local_combos_come_back_with_the_takedown(model):
+    table = get_takedown_table(model, combo_factors=MODEL_FACTORS, settings=benchmark.SETTINGS)
+
+    assert sorted(table.combos) == ["1.2D+1.6L", "DL", "LL"]
+    assert np.allclose(table.combos["1.2D+1.6L"], 1.2 * table.column("DL") + 1.6 * table.column("LL"))
+
+
+def test_bad_combo_factors_are_reported(model):
+    missing_ll = {"DL": MODEL_FACTORS["DL"]}
+    assert get_takedown_table(model, combo_factors=missing_ll, settings=benchmark.SETTINGS) == "Local combo LL not found in combo factors."
+
+    named_trib = dict(MODEL_FACTORS, Trib={"Self-Dead Loading": 1.0})
+    message = get_takedown_table(model, combo_factors=named_trib, settings=benchmark.SETTINGS)
+    assert isinstance(message, str) and "Trib" in message
@@ -0,0 +1,38 @@
+
+import numpy as np
+
+from cumulative import CumulativeTakedown
+from levels import FLOOR
+from levels import level_table
+from stacking import stack_levels
+
+
+def test_identical_levels_add_up():
+    cumulative = CumulativeTakedown(stack_levels([(level, level_table(FLOOR)) for level in [1, 2, 3]]))
+    own = np.array([[dl, ll, trib] for kind, x, y, dl, ll, trib, d, angle in FLOOR])
+
+    for floors, totals in enumerate(cumulative.evaluate(), start=1):
+        assert np.allclose(totals, floors * own)
+    assert np.allclose(cumulative.floors()[-1], 3)
+
+
+def test_transfers_conserve_load():
+    # neither upper column has a support below it, but both are within the transfer radius of the lower columns
+    upper = [("column", 10.0, 0.0, 30.0, 12.0, 0.4, 12.0, 0.0),
+             ("column", 20.0, 3.0, 50.0, 20.0, 0.6, 12.0, 0.0)]
+    cumulative = CumulativeTakedown(stack_levels([(2, level_table(upper)), (1, level_table(FLOOR))]))
+
+    for transfer in cumulative.transfers:
+        assert np.allclose(transfer.delivered_fraction(), 1.0)
+
+    totals = cumulative.evaluate()
+    assert np.allclose(totals[-1].sum(axis=0), sum(totals_of_level.sum(axis=0) for totals_of_level in cumulative.loads))
+    for level, lost in cumulative.lost_loads():
+        assert lost == {"DL": 0.0, "LL": 0.0, "Trib": 0.0}
+
+
+def test_loads_beyond_the_transfer_radius_are_lost():
+    upper = [("column", 200.0, 200.0, 30.0, 12.0, 0.4, 12.0, 0.0)]
+    cumulative = CumulativeTakedown(stack_levels([(2, level_table(upper)), (1, level_table(FLOOR))]))
+
+    assert cumulative.lost_loads() == [(1, {"DL": 30.0, "LL": 12.0, "Trib": 0.4})]
@@ -0,0 +1,53 @@
+
+import json
+
+from ram_concept.concept import Concept
+
+from element_table import get_element_table
+from generate_model import generate_model
+
+
+def grid_model():
+    model, supports = generate_model(Concept.start_concept(), 3, 3, span=300)
+    return model
+
+
+def test_saved_table_is_reused_while_the_mesh_is_unchanged(tmp_path):
+    element_layer = grid_model().cad_manager.element_layer
+    cache_path = str(tmp_path / "model.elements.json")
+
+    first = get_element_table(element_layer, cache_path, mesh_key="key")
+    with open(cache_path) as file:
+        saved = json.load(file)
+    saved["fingerprint"] = "saved"
+    with open(cache_path, "w") as file:
+        json.dump(saved, file)
+
+    second = get_element_table(element_layer, cache_path, mesh_key="key")
+    assert second.fingerprint == "saved"
+    assert second.columns == first.columns and second.walls == first.walls
+
+
+def test_renumbered_mesh_is_read_again_under_the_same_key(tmp_path):
+    element_layer = grid_model().cad_manager.element_layer
+    cache_path = str(tmp_path / "model.elements.json")
+    first = get_element_table(element_layer, cache_path, mesh_key="key")
+
+    # a remesh from the GUI: same structure, so the same key, but the elements come back in another order
+    element_layer._column_elements.reverse()
+    element_layer._wall_groups.reverse()
+
+    second = get_element_table(element_layer, cache_path, mesh_key="key")
+    assert second.columns == first.columns[::-1]
+    assert second.walls == first.walls[::-1]
+
+
+def test_saved_table_with_another_key_is_not_reused(tmp_path):
+    element_layer = grid_model().cad_manager.element_layer
+    cache_path = str(tmp_path / "model.elements.json")
+    get_element_table(element_layer, cache_path, mesh_key="old")
+
+    table = get_element_table(element_layer, cache_path, mesh_key="new")
+    with open(cache_path) as file:
+        assert json.load(file)["mesh_key"] == "new"
+    assert table.mesh_key == "new"
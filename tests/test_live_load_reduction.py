@@ -0,0 +1,58 @@
+
+import numpy as np
+
+from cumulative import CumulativeTakedown
+from levels import FLOOR
+from levels import level_table
+from live_load_reduction import HEAVY_RULE
+from live_load_reduction import NO_REDUCTION
+from live_load_reduction import STANDARD_RULE
+from live_load_reduction import occupancy_rule
+from live_load_reduction import reduce_live_loads
+from live_load_reduction import reduction_factors
+from stacking import stack_levels
+
+
+def test_factor_at_an_influence_area_of_1600():
+    # K_LL A_T = 1600 ft2 for an interior column with 400 ft2 and a wall with 1600 ft2: 0.25 + 15 / 40
+    factors = reduction_factors(np.array([400.0, 1600.0]), np.array([2.0, 2.0]), np.array(["column", "wall"]), STANDARD_RULE)
+    assert np.allclose(factors, 0.625)
+
+
+def test_small_influence_areas_are_not_reduced():
+    factors = reduction_factors(np.array([99.0, 399.0]), np.array([1.0, 1.0]), np.array(["column", "wall"]), STANDARD_RULE)
+    assert np.allclose(factors, 1.0)
+
+
+def test_factors_are_limited_by_floors_carried():
+    area = np.array([1e6, 1e6])
+    floors = np.array([1.0, 3.0])
+    kinds = np.array(["column", "column"])
+
+    assert np.allclose(reduction_factors(area, floors, kinds, STANDARD_RULE), [0.5, 0.4])
+    assert np.allclose(reduction_factors(area, floors, kinds, HEAVY_RULE), [1.0, 0.8])
+    assert np.allclose(reduction_factors(area, floors, kinds, NO_REDUCTION), [1.0, 1.0])
+
+
+def test_occupancy_rules():
+    assert occupancy_rule("office") is STANDARD_RULE
+    assert occupancy_rule("Parking") is HEAVY_RULE
+    assert occupancy_rule("OFFICE", live_load=125.0) is HEAVY_RULE
+    assert occupancy_rule("ASSEMBLY", live_load=125.0) is NO_REDUCTION
+
+
+def test_accumulated_live_loads_are_reduced_down_the_building():
+    cumulative = CumulativeTakedown(stack_levels([(level, level_table(FLOOR)) for level in [1, 2, 3]]))
+    reduction = reduce_live_loads(cumulative, "OFFICE")
+
+    assert [level for level, level_reduction in reduction] == [3, 2, 1]
+    for floors, (level, level_reduction) in enumerate(reduction, start=1):
+        # the Trib loading is 1 psf, so each floor adds its Trib reaction (kip) x 1000 ft2
+        area = floors * np.array([support[5] for support in FLOOR]) * 1000
+        element_factor = np.array([4.0 if support[0] == "column" else 1.0 for support in FLOOR])
+        factor = np.maximum(np.minimum(0.25 + 15 / np.sqrt(element_factor * area), 1.0), 0.5 if floors == 1 else 0.4)
+
+        assert np.allclose(level_reduction["floors"], floors)
+        assert np.allclose(level_reduction["area"], area)
+        assert np.allclose(level_reduction["factor"], factor)
+        assert np.allclose(level_reduction["LL_reduced"], factor * floors * np.array([support[4] for support in FLOOR]))
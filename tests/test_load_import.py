@@ -0,0 +1,78 @@
+
+import openpyxl
+import pytest
+from ram_concept.concept import Concept
+
+from generate_model import generate_model
+from load_import import LOAD_FIELDS
+from load_import import add_load_records
+from load_import import import_loads
+from load_import import read_load_table
+
+
+ROWS = [["Layer", "KIND", "points", "elevation", "Fz", "Mx"],
+        ["Other Dead Loading", "area", "0 0; 120 0; 120 120; 0 120", 0, -0.2, ""],
+        ["live (reducible) loading", "line", "0,0; 120,0; 120,120", 10, -1.5, 0.5],
+        ["", "", "", "", "", ""],
+        ["Other Dead Loading", "point", "60 60", "", -100, ""]]
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "loads.csv"
+    path.write_text("\n".join(",".join('"' + str(cell) + '"' for cell in row) for row in rows) + "\n")
+    return str(path)
+
+
+def write_xlsx(tmp_path, rows):
+    path = str(tmp_path / "loads.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Other"
+    ws = wb.create_sheet("Loads")
+    for row in rows:
+        ws.append([None if cell == "" else cell for cell in row])
+    wb.save(path)
+    return path
+
+
+def empty_model():
+    model, supports = generate_model(Concept.start_concept(), 2, 2, span=300, loads=False, pt=False)
+    return model
+
+
+def test_csv_and_excel_tables_read_the_same(tmp_path):
+    from_csv = read_load_table(write_csv(tmp_path, ROWS))
+    from_xlsx = read_load_table(write_xlsx(tmp_path, ROWS), "Loads")
+
+    for records in [from_csv, from_xlsx]:
+        assert [(record.layer, record.kind, record.points, record.elevation, record.values) for record in records] == [
+            ("Other Dead Loading", "area", [(0.0, 0.0), (120.0, 0.0), (120.0, 120.0), (0.0, 120.0)], 0.0, (0.0, 0.0, -0.2, 0.0, 0.0)),
+            ("live (reducible) loading", "line", [(0.0, 0.0), (120.0, 0.0), (120.0, 120.0)], 10.0, (0.0, 0.0, -1.5, 0.5, 0.0)),
+            ("Other Dead Loading", "point", [(60.0, 60.0)], 0.0, (0.0, 0.0, -100.0, 0.0, 0.0))]
+
+
+def test_bad_rows_are_named(tmp_path):
+    with pytest.raises(ValueError, match="Row 3: wrong number of points for a area load"):
+        read_load_table(write_csv(tmp_path, [LOAD_FIELDS, ["L", "point", "1 1"] + [0] * 6, ["L", "area", "0 0; 1 1"] + [0] * 6]))
+    with pytest.raises(ValueError, match="Row 2: load kind"):
+        read_load_table(write_csv(tmp_path, [LOAD_FIELDS, ["L", "surface", "1 1"] + [0] * 6]))
+
+
+def test_loads_go_into_their_layers_with_their_values(tmp_path):
+    model = empty_model()
+    assert import_loads(model, write_csv(tmp_path, ROWS)) == 4
+
+    cad_manager = model.cad_manager
+    layers = {layer.name: layer for layer in cad_manager.force_loading_layers}
+    dead, live = layers["Other Dead Loading"], layers["Live (Reducible) Loading"]
+    assert [(load.Fz, load.elevation) for load in dead.area_loads] == [(-0.2, 0.0)]
+    assert [(load.Fz, load.Mx, load.elevation) for load in live.line_loads] == [(-1.5, 0.5, 10.0)] * 2
+    assert [load.Fz for load in dead.point_loads] == [-100.0]
+
+
+def test_missing_layers_stop_the_import_before_any_load_is_added(tmp_path):
+    model = empty_model()
+    records = read_load_table(write_csv(tmp_path, ROWS + [["No Such Loading", "point", "1 1", 0, -1, 0]]))
+
+    with pytest.raises(LookupError, match="Loading No Such Loading not found in model."):
+        add_load_records(model, records)
+    assert all(not layer.area_loads and not layer.line_loads and not layer.point_loads for layer in model.cad_manager.force_loading_layers)
@@ -0,0 +1,76 @@
+
+import numpy as np
+import pytest
+
+from ram_concept.concept import Concept
+
+import benchmark
+from generate_model import generate_model
+from get_reactions import get_takedown_table
+from loading_registry import DEAD_NOT_FOUND
+from loading_registry import LIVE_NOT_FOUND
+from loading_registry import LoadingRegistry
+from sharded_reactions import get_sharded_takedown_table
+
+
+MODEL_FACTORS = {"DL": {"Self-Dead Loading": 1.0, "Other Dead Loading": 1.0}, "LL": {"Live (Reducible) Loading": 1.0}}
+USER_FACTORS = {"DL": {"self-dead loading": 1.0, "OTHER DEAD LOADING": 1.0}, "LL": {"live (reducible) loading": 1.0}}
+
+
+def analysed_model(columns_x=3, columns_y=3):
+    model, supports = generate_model(Concept.start_concept(), columns_x, columns_y, span=300, pt=False)
+    model.calc_all()
+    return model
+
+
+@pytest.fixture(scope="module")
+def model():
+    return analysed_model()
+
+
+def test_names_match_exactly_or_ignoring_case(model):
+    registry = LoadingRegistry.from_model(model)
+
+    loading = registry.loading("Self-Dead Loading")
+    assert registry.loading("SELF-DEAD LOADING") is loading
+    assert registry.name(loading) == "Self-Dead Loading"
+    assert registry.combo(benchmark.SETTINGS["name_DL"].lower()) is registry.combo(benchmark.SETTINGS["name_DL"])
+    assert registry.loading("No Such Loading") is None
+
+
+def test_missing_names_are_all_reported(model):
+    registry = LoadingRegistry.from_model(model)
+
+    with pytest.raises(LookupError) as error:
+        registry.resolve("No Dead", "No Live", benchmark.SETTINGS["name_trib"])
+    assert str(error.value) == DEAD_NOT_FOUND + " " + LIVE_NOT_FOUND
+
+    # a trib name that is not in the model falls back to the first loading named like one
+    assert registry.resolve(benchmark.SETTINGS["name_DL"], benchmark.SETTINGS["name_LL"], "Tributary")[2] is registry.trib_loading("Trib")
+
+    with pytest.raises(LookupError, match="Loading A not found in model. Loading B not found in model."):
+        registry.model_factors({"DL": {"A": 1.0}, "LL": {"B": 1.0, "Self-Dead Loading": 1.0}})
+
+
+def test_factors_use_the_model_spelling(model):
+    registry = LoadingRegistry.from_model(model)
+    factors = registry.model_factors({"DL": {"self-dead loading": 1.0, "Self-Dead Loading": 0.5}, "LL": {"live (reducible) loading": 1.6}})
+    assert factors == {"DL": {"Self-Dead Loading": 1.5}, "LL": {"Live (Reducible) Loading": 1.6}}
+
+
+def test_local_combos_ignore_the_case_of_loading_names(model):
+    expected = get_takedown_table(model, combo_factors=MODEL_FACTORS, settings=benchmark.SETTINGS)
+    table = get_takedown_table(model, combo_factors=USER_FACTORS, settings=benchmark.SETTINGS)
+
+    assert not isinstance(table, str)
+    assert table.tolist() == expected.tolist()
+
+
+def test_sharded_local_combos_ignore_the_case_of_loading_names():
+    # enough supports for two shard workers
+    model = analysed_model(32, 32)
+    expected = get_takedown_table(model, combo_factors=MODEL_FACTORS, settings=benchmark.SETTINGS)
+    table = get_sharded_takedown_table(model, combo_factors=USER_FACTORS, settings=benchmark.SETTINGS, workers=2)
+
+    assert not isinstance(table, str)
+    assert np.allclose(table.column("DL"), expected.column("DL")) and np.allclose(table.column("LL"), expected.column("LL"))
@@ -0,0 +1,49 @@
+
+import benchmark
+from model_fingerprint import content_hash
+from model_fingerprint import file_hash
+from model_fingerprint import load_fingerprint
+from model_fingerprint import results_current
+from model_fingerprint import save_fingerprint
+from models import saved_model
+from run_model import run_model
+
+
+def test_results_are_current_only_for_the_file_last_saved(tmp_path):
+    concept, path = saved_model(tmp_path)
+    model = concept.open_file(path)
+    save_fingerprint(path, content_hash(model))
+
+    assert results_current(model, path, file_hash(path)) == (True, content_hash(model))
+
+    # any save since, even one that leaves the structure and loads as they were
+    with open(path, "ab") as file:
+        file.write(b"\0")
+    assert results_current(model, path, file_hash(path)) == (False, content_hash(model))
+
+
+def test_content_hash_follows_the_structure(tmp_path):
+    concept, path = saved_model(tmp_path)
+    model = concept.open_file(path)
+    before = content_hash(model)
+
+    model.cad_manager.structure_layer.columns[0].b += 1
+    assert content_hash(model) != before
+
+
+def test_unchanged_model_is_not_analysed_again(tmp_path, monkeypatch):
+    concept, path = saved_model(tmp_path)
+    first = run_model(concept, path, settings=benchmark.SETTINGS)
+    assert load_fingerprint(path)["file_hash"] == file_hash(path)
+
+    analyses = []
+    model_class = type(concept.open_file(path))
+    calc_all = model_class.calc_all
+    monkeypatch.setattr(model_class, "calc_all", lambda model: analyses.append(model) or calc_all(model))
+
+    second = run_model(concept, path, settings=benchmark.SETTINGS)
+    assert analyses == []
+    assert second.tolist() == first.tolist()
+
+    run_model(concept, path, settings=benchmark.SETTINGS, force=True)
+    assert len(analyses) == 1
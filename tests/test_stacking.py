@@ -0,0 +1,69 @@
+
+import numpy as np
+import pytest
+
+from levels import FLOOR
+from levels import level_table
+from cumulative import CumulativeTakedown
+from stacking import MATCHED
+from stacking import OFFSET
+from stacking import UNSUPPORTED
+from stacking import LevelSupports
+from stacking import stack_levels
+
+
+def test_identical_levels_all_match():
+    matches = stack_levels([(level, level_table(FLOOR)) for level in [1, 2, 3]])
+
+    assert len(matches) == 2
+    for match in matches:
+        assert np.all(match.status == MATCHED)
+        assert match.support.tolist() == list(range(len(FLOOR)))
+        assert np.allclose(match.overlap, 1.0)
+
+
+def test_levels_stack_from_the_top_down():
+    matches = stack_levels([(1, level_table(FLOOR)), (3, level_table(FLOOR)), (2, level_table(FLOOR))])
+    assert [(match.upper.level, match.lower.level) for match in matches] == [(3, 2), (2, 1)]
+
+
+def test_walls_are_matched_along_their_angle():
+    # the same wall turned to run along x no longer sits on the wall below, which runs along y
+    turned = list(FLOOR)
+    turned[5] = turned[5][:7] + (0.0,)
+    match = stack_levels([(2, level_table(turned)), (1, level_table(FLOOR))])[0]
+
+    assert match.status[5] != MATCHED
+    assert np.all(match.status[:5] == MATCHED)
+
+
+def test_plain_rows_with_walls_are_refused():
+    with pytest.raises(ValueError):
+        LevelSupports(1, level_table(FLOOR).tolist())
+
+    columns_only = LevelSupports(1, level_table(FLOOR[:4]).tolist())
+    assert len(columns_only) == 4
+
+
+def test_columns_can_land_on_a_level_of_walls_only():
+    # the walls of the floor above, and a wall along y under the columns at x = 0
+    walls_only = [support for support in FLOOR if support[0] == "wall"] + [("wall", 0.0, 15.0, 50.0, 20.0, 0.3, 600.0, 90.0)]
+    match = stack_levels([(2, level_table(FLOOR)), (1, level_table(walls_only))])[0]
+
+    assert match.status.tolist() == [MATCHED, UNSUPPORTED, MATCHED, UNSUPPORTED, MATCHED, MATCHED]
+    assert match.support.tolist() == [2, -1, 2, -1, 0, 1]
+
+    # moved 3 ft off the wall, the columns become transfers onto it
+    moved = [("column", 3.0) + support[2:] if support[1] == 0.0 else support for support in FLOOR]
+    assert stack_levels([(2, level_table(moved)), (1, level_table(walls_only))])[0].status.tolist()[:4] == [OFFSET, UNSUPPORTED, OFFSET, UNSUPPORTED]
+
+
+def test_empty_levels_stack():
+    empty = level_table([])
+
+    above = stack_levels([(2, level_table(FLOOR)), (1, empty)])[0]
+    assert np.all(above.status == UNSUPPORTED) and np.all(above.support == -1)
+    assert len(stack_levels([(2, empty), (1, level_table(FLOOR))])[0].status) == 0
+
+    lost = CumulativeTakedown(stack_levels([(2, level_table(FLOOR)), (1, empty)])).lost_loads()
+    assert lost[0][1]["DL"] == sum(support[3] for support in FLOOR)
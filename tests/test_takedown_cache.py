@@ -0,0 +1,67 @@
+
+import os
+
+import numpy as np
+
+import benchmark
+from get_reactions import get_takedown_table
+from models import saved_model
+from takedown_cache import TakedownCache
+from takedown_table import TakedownTable
+
+
+def level_takedown(tmp_path):
+    concept, path = saved_model(tmp_path)
+    return path, get_takedown_table(concept.open_file(path), settings=benchmark.SETTINGS, labels=True)
+
+
+def test_stored_takedown_comes_back_with_its_wall_angles(tmp_path):
+    path, takedown_tbl = level_takedown(tmp_path)
+    cache = TakedownCache(str(tmp_path / "cache"))
+    cache.put(path, benchmark.SETTINGS, takedown_tbl)
+
+    cached = cache.get(path, benchmark.SETTINGS)
+    assert isinstance(cached, TakedownTable)
+    assert cached.tolist() == takedown_tbl.tolist()
+    assert np.array_equal(cached.column("angle"), takedown_tbl.column("angle"))
+
+
+def test_entries_are_keyed_by_file_and_settings(tmp_path):
+    path, takedown_tbl = level_takedown(tmp_path)
+    cache = TakedownCache(str(tmp_path / "cache"))
+    cache.put(path, benchmark.SETTINGS, takedown_tbl)
+
+    assert cache.get(path, dict(benchmark.SETTINGS, max_height=1)) is None
+    assert cache.get(path, benchmark.SETTINGS, local_combos={"DL": {}, "LL": {}}) is None
+
+    with open(path, "ab") as file:
+        file.write(b"\0")
+    assert cache.get(path, benchmark.SETTINGS) is None
+
+
+def test_messages_are_not_stored_and_missing_models_miss(tmp_path):
+    path, takedown_tbl = level_takedown(tmp_path)
+    cache = TakedownCache(str(tmp_path / "cache"))
+
+    cache.put(path, benchmark.SETTINGS, "Dead load combo not found in model.")
+    assert cache.get(path, benchmark.SETTINGS) is None
+    assert cache.get(str(tmp_path / "missing.cpt"), benchmark.SETTINGS) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    path, takedown_tbl = level_takedown(tmp_path)
+    cache = TakedownCache(str(tmp_path / "cache"))
+    cache.put(path, benchmark.SETTINGS, takedown_tbl)
+    cache.put(path, dict(benchmark.SETTINGS, max_height=1), takedown_tbl)
+    entry_size = max(os.path.getsize(os.path.join(cache.directory, name)) for name in os.listdir(cache.directory))
+
+    # the first entry is read again, so the second is the one to go
+    old = os.path.getmtime(os.path.join(cache.directory, sorted(os.listdir(cache.directory))[0])) - 100
+    for name in os.listdir(cache.directory):
+        os.utime(os.path.join(cache.directory, name), (old, old))
+    cache.get(path, benchmark.SETTINGS)
+    cache.max_bytes = entry_size
+    cache.evict()
+
+    assert cache.get(path, benchmark.SETTINGS) is not None
+    assert cache.get(path, dict(benchmark.SETTINGS, max_height=1)) is None
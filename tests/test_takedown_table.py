@@ -0,0 +1,60 @@
+
+import numpy as np
+import pytest
+
+import benchmark
+from get_reactions import get_reactions
+from get_reactions import get_takedown_table
+from models import saved_model
+from takedown_output import format_csv
+from takedown_table import API_UNITS
+from takedown_table import TAKEDOWN_UNITS
+from takedown_table import TakedownTable
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    concept, path = saved_model(tmp_path_factory.mktemp("model"))
+    model = concept.open_file(path)
+    return get_takedown_table(model, settings=benchmark.SETTINGS, labels=True), get_reactions(model, settings=benchmark.SETTINGS, labels=True)
+
+
+def test_table_rows_are_the_takedown_list(tables):
+    table, rows = tables
+
+    assert len(table) == len(rows)
+    assert table.tolist() == rows
+    assert [list(row) for row in table] == rows
+    assert all(table[i] == rows[i] for i in range(len(rows)))
+
+
+def test_rows_index_and_slice_like_lists(tables):
+    table, rows = tables
+    row = table[-1]
+
+    assert [row[i] for i in range(len(row))] == rows[-1]
+    assert row[-2:] == rows[-1][-2:] and row[2] == rows[-1][2] and row[-1] == rows[-1][-1]
+    assert isinstance(row[0], float) and isinstance(row[8], str)
+    with pytest.raises(IndexError):
+        row[len(row)]
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+def test_table_slices_are_tables(tables):
+    table, rows = tables
+    part = table[1:-1:2]
+
+    assert isinstance(part, TakedownTable)
+    assert part.tolist() == rows[1:-1:2]
+    assert format_csv(part) == format_csv(rows[1:-1:2])
+
+
+def test_units_convert_a_column_at_a_time():
+    table = TakedownTable.from_columns({"x": [24.0], "y": [-12.0], "DL": [1500.0], "LL": [500.0], "H": [120.0], "b": [10.0], "d": [20.0], "Trib": [250.0]},
+                                       combos={"1.2D": [1800.0]})
+    converted = table.to_units(TAKEDOWN_UNITS)
+
+    assert converted.tolist() == [[2.0, -1.0, 1.5, 0.5, 10.0, 10.0, 20.0, 0.25]]
+    assert np.allclose(converted.combos["1.2D"], [1.8])
+    assert table.units == API_UNITS and table.tolist()[0][0] == 24.0
@@ -0,0 +1,65 @@
+
+import numpy as np
+import pytest
+from ram_concept.concept import Concept
+from ram_concept.enums import GeneratedBy
+from ram_concept.enums import SpanSet
+
+from generate_model import generate_model
+from tendon_layout import TendonRun
+from tendon_layout import add_tendon_layout
+from tendon_layout import read_tendon_layout
+from tendon_layout import run_jacks
+from tendon_layout import run_segments
+
+
+BAND = TendonRun("longitude", [0, 150, 300], [7.0, 2.0, 7.0], strands=12, offset=0.0)
+UNIFORM = TendonRun("latitude", [0, 150, 300], [6.5, 2.5, 6.5], strands=4, offset=30.0, count=3, spacing=60.0)
+
+
+def test_segments_run_high_to_low_between_profile_points():
+    segments = run_segments(BAND)
+    assert segments[["x1", "y1", "x2", "y2", "z1", "z2"]].tolist() == [(0.0, 0.0, 150.0, 0.0, 7.0, 2.0), (300.0, 0.0, 150.0, 0.0, 7.0, 2.0)]
+
+    segments = run_segments(UNIFORM, layer=1)
+    assert len(segments) == 6 and np.all(segments["layer"] == 1) and np.all(segments["strands"] == 4)
+    assert segments["x1"].tolist() == [30.0, 30.0, 90.0, 90.0, 150.0, 150.0]
+    assert np.all(segments["z1"] >= segments["z2"])
+    assert [values.tolist() for values in run_jacks(UNIFORM)] == [[30.0, 90.0, 150.0], [0.0, 0.0, 0.0]]
+
+
+def test_layout_table_is_read_from_csv(tmp_path):
+    path = tmp_path / "tendons.csv"
+    path.write_text("Layer,Coordinates,Profiles,Strands,Offset,Count,Spacing\n"
+                    "Longitude,0 150 300,7 2 7,12,0,,\n"
+                    "latitude,\"0, 150, 300\",6.5 2.5 6.5,4,30,3,60\n")
+
+    runs = read_tendon_layout(str(path))
+    assert [vars(run) for run in runs] == [vars(BAND), vars(UNIFORM)]
+
+
+def test_bad_runs_are_named(tmp_path):
+    path = tmp_path / "tendons.csv"
+    path.write_text("layer,coordinates,profiles,strands,offset\nlongitude,0 150,7 2,12,0\nlongitude,0 150,7,12,0\n")
+    with pytest.raises(ValueError, match="Row 3: a tendon needs two or more coordinates"):
+        read_tendon_layout(str(path))
+
+
+def test_tendons_are_added_to_their_layers():
+    model, supports = generate_model(Concept.start_concept(), 2, 2, span=300, pt=False)
+    assert add_tendon_layout(model, [BAND, UNIFORM]) == (8, 4)
+
+    cad_manager = model.cad_manager
+    longitude = cad_manager.tendon_layer(SpanSet.LONGITUDE, GeneratedBy.USER)
+    latitude = cad_manager.tendon_layer(SpanSet.LATITUDE, GeneratedBy.USER)
+
+    def added(layer):
+        return sorted((segment.location.start_point.x, segment.location.start_point.y, segment.location.end_point.x, segment.location.end_point.y,
+                       segment.elevation_value_1, segment.elevation_value_2, segment.strand_count) for segment in layer.tendon_segments)
+
+    expected = run_segments(BAND)[["x1", "y1", "x2", "y2", "z1", "z2", "strands"]].tolist()
+    assert added(longitude) == sorted(expected)
+    expected = run_segments(UNIFORM)[["x1", "y1", "x2", "y2", "z1", "z2", "strands"]].tolist()
+    assert added(latitude) == sorted(expected)
+    assert [(jack.location.x, jack.location.y) for jack in latitude.jacks] == [(30.0, 0.0), (90.0, 0.0), (150.0, 0.0)]
+    assert len(longitude.jacks) == 1
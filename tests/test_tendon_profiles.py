@@ -0,0 +1,54 @@
+
+import numpy as np
+from ram_concept.concept import Concept
+
+from generate_model import generate_model
+from get_tendon_profiles import ADAPTIVE_GRID_POINTS
+from get_tendon_profiles import get_tendon_profiles
+from get_tendon_profiles import simplify_profiles
+
+
+FRACTIONS = np.linspace(0.0, 1.0, 41)
+
+
+def test_simplified_profiles_stay_within_tolerance():
+    t = FRACTIONS
+    elevations = np.array([4 * 6.0 * t * (1 - t) + 1.0,                   # parabolic drape
+                           2.0 + 3.0 * np.sin(3 * np.pi * t) * t,         # reversed curves
+                           np.where(t < 0.3, 7.0 - 10 * t, 4.0)])         # kink at 0.3
+    for tolerance in [0.01, 0.05, 0.25]:
+        kept = simplify_profiles(FRACTIONS, elevations, tolerance)
+
+        assert np.all(kept[:, [0, -1]])
+        for row, row_kept in zip(elevations, kept):
+            drawn = np.interp(FRACTIONS, FRACTIONS[row_kept], row[row_kept])
+            assert np.max(np.abs(drawn - row)) <= tolerance
+
+
+def test_straight_profiles_keep_only_their_ends():
+    elevations = np.array([1.0 + 2.0 * FRACTIONS, np.full(len(FRACTIONS), 3.5)])
+    kept = simplify_profiles(FRACTIONS, elevations, 0.001)
+    assert kept.sum(axis=1).tolist() == [2, 2]
+
+
+def test_tighter_tolerances_keep_more_points():
+    elevations = np.array([4 * 6.0 * FRACTIONS * (1 - FRACTIONS)])
+    counts = [simplify_profiles(FRACTIONS, elevations, tolerance).sum() for tolerance in [0.5, 0.05, 0.005]]
+    assert counts == sorted(counts) and counts[0] < counts[-1]
+
+
+def test_model_profiles_sampled_to_a_tolerance():
+    model, supports = generate_model(Concept.start_concept(), 3, 3, span=300)
+    full = get_tendon_profiles(model, points=ADAPTIVE_GRID_POINTS, report=False)
+    sampled = get_tendon_profiles(model, report=False, tolerance=0.1)
+
+    assert len(sampled) < len(full)
+    assert set(zip(sampled["layer"].tolist(), sampled["segment"].tolist())) == set(zip(full["layer"].tolist(), full["segment"].tolist()))
+
+    # the first segments of every layer
+    for key in sorted(set(zip(full["layer"].tolist(), full["segment"].tolist())), key=lambda key: key[1])[:40]:
+        segment = full[(full["layer"] == key[0]) & (full["segment"] == key[1])]
+        kept = sampled[(sampled["layer"] == key[0]) & (sampled["segment"] == key[1])]
+
+        assert kept["ratio"][0] == 0.0 and kept["ratio"][-1] == 1.0
+        assert np.max(np.abs(np.interp(segment["ratio"], kept["ratio"], kept["z"]) - segment["z"])) <= 0.1 + 1e-9
@@ -0,0 +1,45 @@
+
+import numpy as np
+from ram_concept.concept import Concept
+
+import benchmark
+from generate_model import generate_model
+from get_reactions import get_takedown_table
+from trib_area import LOCAL_TRIB
+from trib_area import SQ_IN_PER_SQ_FT
+from trib_area import slab_polygons
+from trib_area import tributary_areas
+
+
+SQUARE = [np.array([[0.0, 0.0], [20.0, 0.0], [20.0, 20.0], [0.0, 20.0]])]
+
+
+def test_symmetric_bay_splits_into_quadrants():
+    point_areas, segment_areas = tributary_areas(SQUARE, [[0.0, 0.0], [20.0, 0.0], [20.0, 20.0], [0.0, 20.0]], cell_size=0.5)
+
+    assert np.allclose(point_areas, 100.0)
+    assert len(segment_areas) == 0
+
+
+def test_areas_cover_the_slab_once():
+    # overlapping slab areas count once, and every cell goes to some support
+    polygons = SQUARE + [np.array([[10.0, 10.0], [30.0, 10.0], [30.0, 20.0], [10.0, 20.0]])]
+    point_areas, segment_areas = tributary_areas(polygons, [[5.0, 5.0], [15.0, 15.0], [25.0, 15.0]], [(0.0, 20.0, 20.0, 20.0)], cell_size=0.5)
+
+    assert np.isclose(point_areas.sum() + segment_areas.sum(), 400.0 + 100.0)
+    assert np.all(point_areas > 0) and np.all(segment_areas > 0)
+
+
+def test_local_trib_takedown_carries_the_whole_slab():
+    model, supports = generate_model(Concept.start_concept(), 3, 3, span=300)
+    model.calc_all()
+    analysed = get_takedown_table(model, settings=benchmark.SETTINGS)
+    local = get_takedown_table(model, settings=dict(benchmark.SETTINGS, name_trib=LOCAL_TRIB))
+
+    # 1 psf over every slab area, in kip (the generated slab areas do not overlap)
+    slab_area = sum(0.5 * abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1))) for x, y in (polygon.T for polygon in slab_polygons(model)))
+    assert np.isclose(local.column("Trib").sum(), slab_area / SQ_IN_PER_SQ_FT / 1000)
+
+    # only Trib changes, and every support gets some
+    assert np.array_equal(local.column("DL"), analysed.column("DL")) and np.array_equal(local.column("LL"), analysed.column("LL"))
+    assert np.all(local.column("Trib") > 0)
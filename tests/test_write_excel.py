@@ -0,0 +1,58 @@
+
+import openpyxl
+import pytest
+
+from write_excel import FIRST_DATA_ROW
+from write_excel import SHEET_NAME
+from write_excel import write_levels
+
+
+def rows(count, start=0.0):
+    return [[start + i, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, "column", "C" + str(i + 1)] for i in range(count)]
+
+
+def takedown_workbook(tmp_path):
+    path = str(tmp_path / "takedown.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = SHEET_NAME
+    wb.save(path)
+    return path
+
+
+def block(path, column, count):
+    ws = openpyxl.load_workbook(path)[SHEET_NAME]
+    return [[ws.cell(row=row, column=column + j).value for j in range(8)] for row in range(FIRST_DATA_ROW, FIRST_DATA_ROW + count)]
+
+
+def test_levels_go_into_their_blocks(tmp_path):
+    path = takedown_workbook(tmp_path)
+    messages = write_levels(path, [(3, rows(2)), (4, rows(3, 10.0)), (5, "Dead load combo not found in model.")], "OFFICE")
+
+    assert messages == ["5: Dead load combo not found in model."]
+    ws = openpyxl.load_workbook(path)[SHEET_NAME]
+    assert [ws.cell(row=row, column=1).value for row in [5, 6, 7]] == [3, 4, None]
+    assert [ws.cell(row=1, column=3).value, ws.cell(row=1, column=4).value, ws.cell(row=1, column=11).value] == [3, "OFFICE", 4]
+    assert block(path, 3, 2) == [row[:8] for row in rows(2)]
+    assert block(path, 11, 3) == [row[:8] for row in rows(3, 10.0)]
+
+
+def test_shorter_import_clears_only_its_old_rows(tmp_path):
+    path = takedown_workbook(tmp_path)
+    write_levels(path, [(3, rows(5))], "OFFICE")
+
+    # a note the user keeps below the takedown, after a blank row
+    wb = openpyxl.load_workbook(path)
+    wb[SHEET_NAME].cell(row=FIRST_DATA_ROW + 6, column=3).value = "note"
+    wb.save(path)
+
+    write_levels(path, [(3, rows(2, 20.0))], "OFFICE")
+    assert block(path, 3, 5) == [row[:8] for row in rows(2, 20.0)] + [[None] * 8] * 3
+    assert block(path, 3, 7)[6][0] == "note"
+
+
+def test_open_workbook_is_refused(tmp_path):
+    path = takedown_workbook(tmp_path)
+    (tmp_path / "~$takedown.xlsx").write_text("owner")
+
+    with pytest.raises(PermissionError, match="open in Excel"):
+        write_levels(path, [(3, rows(2))], "OFFICE")
@@ -0,0 +1,179 @@
+
+# Local tributary areas, in place of the model's Trib loading.
+#
+# The slab outline is rasterised into square cells and each cell inside it is given to its nearest support:
+# a column point or the nearest point along a wall segment. This is a discrete Voronoi / medial-axis partition,
+# clipped to the slab; each support's tributary area is the area of its cells.
+#
+# The supports are hashed into a grid of search cells (walls into every search cell they pass through), so each
+# slab cell only measures the supports in its own and the 8 neighbouring search cells, all slab cells at once.
+#
+# Enter LOCAL_TRIB as the trib loading name on the takedown userform to use these areas instead of the Trib
+# loading's reactions. They are returned as the reaction a TRIB_LOAD psf load would give, so the Trib column of
+# the takedown keeps its meaning.
+
+import math
+
+import numpy as np
+
+from ram_concept.model import Model
+
+from profiling import profiler
+from stacking import segment_distance
+
+
+# trib loading name that selects the local calculation
+LOCAL_TRIB = "local"
+
+# psf of the Trib loading (and of the local equivalent)
+TRIB_LOAD = 1.0
+
+# cells the slab is split into when no cell size is given
+TARGET_CELLS = 250000
+
+# square inches per square foot (API units are inches)
+SQ_IN_PER_SQ_FT = 144
+
+
+def slab_polygons(model: Model):
+    """[(n, 2) array] of the outline points of every slab area, in API units."""
+
+    with profiler.span("slab outlines"):
+        slab_areas = model.cad_manager.structure_layer.slab_areas
+        polygons = [np.array([[point.x, point.y] for point in slab_area.location.points]) for slab_area in slab_areas]
+        profiler.calls(1 + 2 * len(slab_areas))
+    return polygons
+
+
+def _inside(x, y, polygon):
+    """Whether each point is inside the polygon (even-odd rule)."""
+
+    inside = np.zeros(len(x), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def _nearest_segments(x, y, segments, radius):
+    """Row of the nearest segment within radius of each point (x, y), -1 where none. Ties go to the first segment."""
+
+    nearest = np.full(len(x), -1)
+    distance = np.full(len(x), np.inf)
+    x1, y1, x2, y2 = segments.T
+
+    # every search cell each segment passes through (its bounding box of cells)
+    i1, i2 = np.floor(np.minimum(x1, x2) / radius).astype(np.int64), np.floor(np.maximum(x1, x2) / radius).astype(np.int64)
+    j1, j2 = np.floor(np.minimum(y1, y2) / radius).astype(np.int64), np.floor(np.maximum(y1, y2) / radius).astype(np.int64)
+    rows, cols = i2 - i1 + 1, j2 - j1 + 1
+    cells = rows * cols
+    segment_rows = np.repeat(np.arange(len(segments)), cells)
+    k = np.arange(cells.sum()) - np.repeat(np.cumsum(cells) - cells, cells)
+    si = np.repeat(i1, cells) + k // np.repeat(cols, cells)
+    sj = np.repeat(j1, cells) + k % np.repeat(cols, cells)
+
+    qi, qj = np.floor(x / radius).astype(np.int64), np.floor(y / radius).astype(np.int64)
+
+    # one integer key per search cell, with room for the neighbouring cells of every point
+    i0 = min(si.min(), qi.min()) - 1
+    j0 = min(sj.min(), qj.min()) - 1
+    width = max(sj.max(), qj.max()) - j0 + 2
+
+    keys = (si - i0) * width + (sj - j0)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            query_keys = (qi + di - i0) * width + (qj + dj - j0)
+            first = np.searchsorted(sorted_keys, query_keys, side="left")
+            counts = np.searchsorted(sorted_keys, query_keys, side="right") - first
+
+            # one (point, segment) pair per segment in the search cell
+            queries = np.repeat(np.arange(len(x)), counts)
+            within = np.arange(len(queries)) - np.repeat(np.cumsum(counts) - counts, counts)
+            candidates = segment_rows[order[np.repeat(first, counts) + within]]
+            d = segment_distance(x[queries], y[queries], x1[candidates], y1[candidates], x2[candidates], y2[candidates])
+
+            best = np.full(len(x), np.inf)
+            np.minimum.at(best, queries, d)
+            better = (d == best[queries]) & (d < distance[queries]) & (d <= radius)
+            better_queries, first_better = np.unique(queries[better], return_index=True)
+            nearest[better_queries] = candidates[better][first_better]
+            distance[better_queries] = d[better][first_better]
+
+    return nearest
+
+
+def tributary_areas(polygons, points, segments=(), cell_size=None):
+    """Tributary areas of the support points ((n, 2)) and segments ([(x1, y1, x2, y2)]), in the units of the polygons.
+
+    Returns (point areas, segment areas). Slab areas may overlap; a cell inside any of them counts once.
+    """
+
+    points = np.asarray(points, dtype="f8").reshape(-1, 2)
+    segments = np.asarray(segments, dtype="f8").reshape(-1, 4)
+    point_areas = np.zeros(len(points))
+    segment_areas = np.zeros(len(segments))
+    if not polygons or len(points) + len(segments) == 0:
+        return point_areas, segment_areas
+
+    outline = np.concatenate(polygons)
+    x_min, y_min = outline.min(axis=0)
+    x_max, y_max = outline.max(axis=0)
+    if cell_size is None:
+        cell_size = math.sqrt((x_max - x_min) * (y_max - y_min) / TARGET_CELLS) or 1.0
+
+    # cells stretched slightly to fit the outline exactly
+    columns = max(1, int(math.ceil((x_max - x_min) / cell_size)))
+    rows = max(1, int(math.ceil((y_max - y_min) / cell_size)))
+    dx, dy = (x_max - x_min) / columns or cell_size, (y_max - y_min) / rows or cell_size
+
+    # cell centres inside the slab
+    x, y = np.meshgrid(x_min + dx * (np.arange(columns) + 0.5), y_min + dy * (np.arange(rows) + 0.5))
+    x, y = x.ravel(), y.ravel()
+    inside = np.zeros(len(x), dtype=bool)
+    for polygon in polygons:
+        inside |= _inside(x, y, polygon)
+    x, y = x[inside], y[inside]
+
+    # columns are zero length segments
+    supports = np.concatenate([np.column_stack([points, points]), segments])
+
+    # nearest support of every cell, widening the search until every cell has one
+    nearest = np.full(len(x), -1)
+    radius = 2 * math.sqrt((x_max - x_min) * (y_max - y_min) / len(supports)) + max(dx, dy)
+    unresolved = np.arange(len(x))
+    while len(unresolved):
+        found = _nearest_segments(x[unresolved], y[unresolved], supports, radius)
+        nearest[unresolved[found >= 0]] = found[found >= 0]
+        unresolved = unresolved[found < 0]
+        radius *= 2
+
+    areas = np.bincount(nearest, minlength=len(supports)) * dx * dy
+    return areas[:len(points)], areas[len(points):]
+
+
+def local_trib_reactions(model: Model, element_table, walls, trib_load=TRIB_LOAD, cell_size=None):
+    """(column, wall) arrays of the reaction (API units, lb) a trib_load psf load would give each support.
+
+    element_table is the model's ElementTable and walls the [(wall element group, wall)] taking load
+    (see get_reactions.walls_within_height).
+    """
+
+    polygons = slab_polygons(model)
+
+    with profiler.span("local trib areas"):
+        points = [column[:2] for column in element_table.columns]
+        segments = []
+        for wall_element_group, (group_name, x, y, length, thickness, height, angle) in walls:
+            dx = length / 2 * math.cos(math.radians(angle))
+            dy = length / 2 * math.sin(math.radians(angle))
+            segments.append([x - dx, y - dy, x + dx, y + dy])
+
+        column_areas, wall_areas = tributary_areas(polygons, points, segments, cell_size)
+
+    return column_areas / SQ_IN_PER_SQ_FT * trib_load, wall_areas / SQ_IN_PER_SQ_FT * trib_load
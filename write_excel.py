@@ -0,0 +1,111 @@
+
+# Writes takedown lists straight into the AutoTD sheet of the takedown workbook.
+#
+# Layout of the AutoTD sheet:
+#   column 1, rows 5-105   levels already imported, in import order
+#   each level has a block of 8 columns starting at column 3 + 8 * (position of the level in that list)
+#   row 1 of the block     level number, loading type
+#   rows 4 onwards         one x, y, DL, LL, H, b, d, Trib row per column/wall, down to the first blank row
+#
+# The workbook must not be open in Excel while it is written: Excel locks the file, and would overwrite the
+# takedown the next time it saved its own copy. write_levels refuses with a PermissionError saying so.
+
+import os
+
+import openpyxl
+
+
+SHEET_NAME = "AutoTD"
+
+LEVEL_LIST_COLUMN = 1
+LEVEL_LIST_ROWS = range(5, 106)
+
+FIRST_BLOCK_COLUMN = 3
+BLOCK_WIDTH = 8
+FIRST_DATA_ROW = 4
+
+
+def level_slot(ws, level):
+    """Position of level in the sheet's level list, or of the first free slot if it has not been imported yet."""
+
+    for num_levels, row in enumerate(LEVEL_LIST_ROWS):
+        cell_value = ws.cell(row=row, column=LEVEL_LIST_COLUMN).value
+        if cell_value is None or cell_value == "" or str(cell_value) == str(level):
+            return num_levels
+
+    raise ValueError("No free level slot in the " + SHEET_NAME + " sheet for level " + str(level) + ".")
+
+
+def imported_rows(ws, start_column, end_column):
+    """Number of rows the previous import wrote into a column block: the rows from FIRST_DATA_ROW to the first blank one."""
+
+    count = 0
+    for values in ws.iter_rows(min_row=FIRST_DATA_ROW, max_row=max(ws.max_row, FIRST_DATA_ROW), min_col=start_column, max_col=end_column, values_only=True):
+        if all(value is None or value == "" for value in values):
+            break
+        count += 1
+    return count
+
+
+def write_level(ws, level, takedown_tbl, loading_type):
+    """Write one level's takedown list into its column block, clearing rows left over from a longer earlier import.
+
+    Anything below the first blank row of the block is left alone.
+    """
+
+    num_levels = level_slot(ws, level)
+    start_column = FIRST_BLOCK_COLUMN + BLOCK_WIDTH * num_levels
+    end_column = start_column + BLOCK_WIDTH - 1
+
+    # level headers
+    ws.cell(row=LEVEL_LIST_ROWS[num_levels], column=LEVEL_LIST_COLUMN).value = level
+    ws.cell(row=1, column=start_column).value = level
+    ws.cell(row=1, column=start_column + 1).value = loading_type
+
+    end_row = FIRST_DATA_ROW + max(imported_rows(ws, start_column, end_column), len(takedown_tbl)) - 1
+    if end_row < FIRST_DATA_ROW:
+        return
+    rows = ws.iter_rows(min_row=FIRST_DATA_ROW, max_row=end_row, min_col=start_column, max_col=end_column)
+    for i, cells in enumerate(rows):
+        values = takedown_tbl[i][:BLOCK_WIDTH] if i < len(takedown_tbl) else [None] * BLOCK_WIDTH
+        for cell, value in zip(cells, values):
+            cell.value = value
+
+
+def open_in_excel(workbook_path):
+    """Whether Excel has the workbook open, from the "~$" owner file it keeps next to it (long names lose their first 2 characters)."""
+    folder, name = os.path.split(os.path.abspath(workbook_path))
+    return any(os.path.exists(os.path.join(folder, "~$" + owner_name)) for owner_name in [name, name[2:]])
+
+
+def _workbook_open_error(workbook_path):
+    return PermissionError("The workbook " + workbook_path + " is open in Excel, so the takedown cannot be written into it. "
+                           "Close it and run again, or use the \"string\" output format.")
+
+
+def write_levels(workbook_path, level_tables, loading_type):
+    """Write [(level, takedown list)] into the workbook, opening and saving it once.
+
+    Levels whose takedown is a message string (e.g. a combo not found) are skipped; their messages are returned.
+    Raises PermissionError with a message to show the user when the workbook is open in Excel.
+    """
+
+    if open_in_excel(workbook_path):
+        raise _workbook_open_error(workbook_path)
+
+    # keep_vba keeps the macros of the .xlsm workbook
+    wb = openpyxl.load_workbook(workbook_path, keep_vba=True)
+    ws = wb[SHEET_NAME]
+
+    messages = []
+    for level, takedown_tbl in level_tables:
+        if type(takedown_tbl) == str:
+            messages.append(str(level) + ": " + takedown_tbl)
+            continue
+        write_level(ws, level, takedown_tbl, loading_type)
+
+    try:
+        wb.save(workbook_path)
+    except PermissionError:
+        raise _workbook_open_error(workbook_path)
+    return messages